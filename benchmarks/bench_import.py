@@ -0,0 +1,102 @@
+"""``odoo-gen import`` of one spec at different batch sizes.
+
+    python -m benchmarks.bench_import [--scale small|medium|large]
+        [--models B] [--fields F] [--batch-sizes 1,200]
+
+On a synthetic project (see bench_suite) a CSV spec of B models with F
+fields each, the last one a Many2one to the next model written without the
+module prefix, is imported once per batch size into a fresh copy of the
+target module. Prints the time and the files written of every run. Exits
+with 1 when the batch size changed what was generated: it bounds memory,
+the files must be the same.
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from benchmarks.bench_suite import SCALES, TARGET, build_project
+
+
+def _spec(path: Path, models: int, fields: int):
+    with path.open('w', newline='') as fp:
+        out = csv.writer(fp)
+        out.writerow(['model', 'name', 'type', 'relation'])
+        for i in range(models):
+            for j in range(fields - 1):
+                out.writerow([f'bench.m{i}', f'f{j}', 'Char', ''])
+            # a later batch when the batch is smaller than the spec
+            out.writerow([f'bench.m{i}', 'next_id', 'Many2one', f'bench.m{(i + 1) % models}'])
+
+
+def _files(root: Path) -> dict[str, bytes]:
+    return {
+        str(p.relative_to(root)): p.read_bytes()
+        for p in sorted(root.rglob('*')) if p.is_file()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--models', type=int, default=50)
+    parser.add_argument('--fields', type=int, default=5)
+    parser.add_argument('--batch-sizes', default='1,200')
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.batch_sizes.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.environ['ODOO_GEN_CACHE_DIR'] = str(tmp / 'cache')
+        from odoo_gen.cli import main as cli
+
+        root = tmp / 'project'
+        target = build_project(root, SCALES[args.scale])
+        pristine = tmp / 'pristine'
+        shutil.copytree(target, pristine)
+        spec = tmp / 'spec.csv'
+        _spec(spec, args.models, args.fields)
+
+        results, outputs = {}, {}
+        for size in sizes:
+            shutil.rmtree(target)
+            shutil.copytree(pristine, target)
+            start = time.perf_counter()
+            res = CliRunner().invoke(cli, [
+                'import', str(spec), '--batch-size', str(size), '--no-input',
+                '--addons', str(target.parent), '--module', TARGET,
+                '-p', str(root),
+            ])
+            ms = (time.perf_counter() - start) * 1000
+            if res.exit_code:
+                raise SystemExit(f'batch size {size} failed:\n{res.output}')
+            outputs[size] = _files(target)
+            results[size] = {'ms': round(ms, 2), 'output': res.output.strip()}
+
+    print(json.dumps({
+        'scale': args.scale, 'models': args.models, 'fields': args.fields,
+        'results': results,
+    }, indent=2))
+
+    base = sizes[0]
+    for size in sizes[1:]:
+        changed = sorted(
+            name for name in outputs[base].keys() | outputs[size].keys()
+            if outputs[base].get(name) != outputs[size].get(name)
+        )
+        if changed:
+            raise SystemExit(
+                f'batch size {size} generated other files than {base}: '
+                + ', '.join(changed)
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Keypress latency of the interactive menu picker.
+
+    python -m benchmarks.bench_menu_inserter [--items 3000] [--height 40]
+
+full     -- what a key used to cost: rebuild the visible list and render
+            every row
+viewport -- a cursor move now: render only the rows on screen
+toggle   -- collapse/expand: rebuild the visible list, render the viewport
+"""
+import argparse
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from odoo_gen.controllers.menu_inserter import InteractiveMenuInserter
+from odoo_gen.core.menu_tree import MenuTree
+from odoo_gen.core.storage import MemoryStorage
+
+
+def _menu_xml(items: int, fanout: int = 10) -> str:
+    lines = ['<odoo>']
+    for i in range(items):
+        parent = f' parent="m{(i - 1) // fanout}"' if i else ''
+        lines.append(f'    <menuitem id="m{i}" name="Menu {i}"{parent}/>')
+    lines.append('</odoo>')
+    return '\n'.join(lines)
+
+
+def _inserter(items: int) -> InteractiveMenuInserter:
+    path = Path('/bench/menu.xml')
+    storage = MemoryStorage()
+    storage.mkdir(path.parent)
+    storage.write_text(path, _menu_xml(items))
+    tree = MenuTree(path, storage=storage)
+    ctx = SimpleNamespace(menu_tree=tree, debug=False)
+    ins = InteractiveMenuInserter(ctx)
+    # worst case: the whole tree expanded
+    ins.expanded = set(tree.nodes_by_id)
+    ins._rebuild_visible()
+    return ins
+
+
+def _timeit(fn, n) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=3000)
+    parser.add_argument('--height', type=int, default=40)
+    parser.add_argument('-n', type=int, default=200)
+    args = parser.parse_args()
+
+    ins = _inserter(args.items)
+    everything = ins.row_count
+
+    def full():
+        ins._rebuild_visible()
+        ins._render(everything)
+
+    def viewport():
+        ins._move(1)
+        ins._render(args.height)
+
+    def toggle():
+        ins.cursor = 0
+        ins._toggle(expand=False)
+        ins._toggle(expand=True)
+        ins._render(args.height)
+
+    results = {
+        'full': _timeit(full, args.n),
+        'viewport': _timeit(viewport, args.n),
+        'toggle': _timeit(toggle, args.n) / 2,
+    }
+
+    for name, ms in results.items():
+        print(f'{name:<8} {ms:8.3f} ms / key ({args.items} items)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Adding one menuitem to a large menu.xml: full rewrite vs. in-place patch.
+
+    python -m benchmarks.bench_menu_patch [--items 3000]
+
+Prints the time of parse + insert + dump and the size of the resulting
+diff for both modes. Exits with 1 when an untouched file (declaration,
+comment before the root, trailing newline) doesn't dump back byte for
+byte, or when an insert next to a menu of another module gives the
+written item the sequence of that menu.
+"""
+import argparse
+import difflib
+import time
+
+from pathlib import Path
+
+from odoo_gen.core.menu_index import MenuEntry
+from odoo_gen.core.menu_tree import MenuNode, MenuTree
+from odoo_gen.core.storage import MemoryStorage
+from .bench_menu_inserter import _menu_xml
+
+
+def _run(storage, path, patch: bool) -> tuple[float, str]:
+    start = time.perf_counter()
+    tree = MenuTree(path, storage=storage)
+    parent = tree.nodes_by_id['m1']
+    node = MenuNode(id='new', attrs={'id': 'new', 'name': 'New', 'action': 'a'})
+    tree.insert(parent, 3, node)
+    out = tree.dump() if patch else tree.serialize()
+    return (time.perf_counter() - start) * 1000, out
+
+
+def _check_round_trip(source: str):
+    source = (
+        "<?xml version='1.0' encoding='utf-8'?>\n<!-- top comment -->\n"
+        + source.split('?>', 1)[-1].lstrip() + '<!-- tail -->\n'
+    )
+    out = MenuTree.parse(source.encode()).dump()
+    if out != source:
+        diff = difflib.unified_diff(
+            source.splitlines(), out.splitlines(), 'source', 'dump', lineterm='',
+        )
+        raise SystemExit('round trip changed the file:\n' + '\n'.join(diff))
+
+
+def _check_linked_sequence():
+    # ours at 9, another module's menu at 10 under the same parent
+    tree = MenuTree.parse(
+        b'<odoo>\n  <menuitem id="root" name="Root">\n'
+        b'    <menuitem id="a" name="A" sequence="9"/>\n  </menuitem>\n</odoo>\n'
+    )
+    tree.link({'other.b': MenuEntry('other.b', 'mod.root', 10, 'B', 'x.xml')}, 'mod')
+    root = tree.get('root')
+    tree.insert(root, 1, MenuNode(id='new', attrs={'id': 'new', 'name': 'New'}))
+
+    taken = {n.id: n.sequence for n in root.children}
+    written = MenuTree.parse(tree.dump().encode()).get('new').sequence
+    if taken['other.b'] != 10 or written in (9, 10):
+        raise SystemExit(f'sequence clashes with a linked menu: {taken}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=3000)
+    parser.add_argument('-n', type=int, default=20)
+    args = parser.parse_args()
+
+    path = Path('/bench/menu.xml')
+    storage = MemoryStorage()
+    storage.mkdir(path.parent)
+    source = _menu_xml(args.items) + '\n'
+    storage.write_text(path, source)
+    _check_round_trip(source)
+    _check_linked_sequence()
+
+    for name, patch in (('full', False), ('patch', True)):
+        runs = [_run(storage, path, patch) for _ in range(args.n)]
+        ms = sum(t for t, _ in runs) / len(runs)
+        diff = list(difflib.unified_diff(
+            source.splitlines(), runs[0][1].splitlines(), lineterm='', n=0,
+        ))
+        changed = sum(1 for line in diff if line[:1] in '+-') - 2
+        print(f'{name:<5} {ms:8.3f} ms   {changed:6d} diff lines ({args.items} items)')
+
+
+if __name__ == '__main__':
+    main()
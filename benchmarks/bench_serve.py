@@ -0,0 +1,114 @@
+"""Round trip of ``odoo-gen serve`` against a fresh CLI process.
+
+    python -m benchmarks.bench_serve [--scale small|medium|large] [-n 20]
+
+On a synthetic project (see bench_suite) times, in ms:
+
+cli             -- ``odoo-gen --dry-run --no-input`` in a new process,
+                   warm on-disk indexes
+serve_resolve   -- ``resolve`` over the socket
+serve_plan      -- ``plan``
+serve_diff      -- ``plan`` with ``diff`` (what --dry-run prints)
+serve_touched   -- ``plan`` after a file of the module was rewritten,
+                   the watcher invalidation included
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.bench_suite import SCALES, build_project
+
+
+MODEL = 'bench.thing'
+
+
+def _median(run, n: int) -> dict:
+    times = []
+    for _ in range(n):
+        t = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - t) * 1000)
+    return {'median_ms': round(statistics.median(times), 2), 'min_ms': round(min(times), 2)}
+
+
+def _wait_for(path: Path, proc, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        if proc.poll() is not None or time.monotonic() > deadline:
+            raise SystemExit(f'server did not start: {proc.stderr.read()}')
+        time.sleep(0.02)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('-n', type=int, default=20)
+    args = parser.parse_args()
+
+    from odoo_gen.server import Client
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        env = dict(os.environ, ODOO_GEN_CACHE_DIR=str(tmp / 'cache'))
+        target = build_project(tmp / 'project', SCALES[args.scale])
+        cli = [
+            sys.executable, '-c', 'from odoo_gen.cli import main; main()',
+            MODEL, '-p', str(target), '--dry-run', '--no-input',
+        ]
+        # warm the on-disk indexes for the CLI
+        subprocess.run(cli, env=env, capture_output=True, check=True)
+        results = {
+            'cli': _median(
+                lambda: subprocess.run(cli, env=env, capture_output=True, check=True),
+                max(3, args.n // 4),
+            ),
+        }
+
+        sock = tmp / 'og.sock'
+        server = subprocess.Popen(
+            [
+                sys.executable, '-c', 'from odoo_gen.cli import main; main()',
+                'serve', '--socket', str(sock),
+            ],
+            env=env, stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            _wait_for(sock, server)
+            client = Client(sock)
+            params = dict(models=[MODEL], path=str(target))
+            client.call('plan', **params)
+
+            results['serve_resolve'] = _median(lambda: client.call('resolve', **params), args.n)
+            results['serve_plan'] = _median(lambda: client.call('plan', **params), args.n)
+            results['serve_diff'] = _median(
+                lambda: client.call('plan', diff=True, **params), args.n
+            )
+
+            manifest = target / '__manifest__.py'
+            text = manifest.read_text()
+
+            def touched():
+                manifest.write_text(text)
+                client.call('plan', diff=True, **params)
+
+            results['serve_touched'] = _median(touched, args.n)
+            client.call('shutdown')
+            client.close()
+        finally:
+            try:
+                server.wait(5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    print(json.dumps({'scale': args.scale, 'n': args.n, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
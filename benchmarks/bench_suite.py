@@ -0,0 +1,429 @@
+"""End-to-end timings on a synthetic project, as JSON.
+
+    python -m benchmarks.bench_suite [--scale small|medium|large]
+        [--addons-dirs N] [--modules M] [--menu-items K] [--data-items D]
+        [--access-rows A] [--models B] [-n 5]
+        [--out results.json] [--baseline baseline.json] [--threshold 1.25]
+        [--noise-ms 0.5]
+
+Builds a project in a temp dir: N addons dirs listed in odoo.conf, M
+modules spread over them, and a target module with a K item menu.xml, a
+manifest with D data entries and an A row ir.model.access.csv. Then times:
+
+resolve_cold    -- ContextResolver with empty on-disk indexes
+resolve_warm    -- the same with the indexes of a previous run
+menu_parse      -- MenuTree of the target menu.xml
+menu_dump       -- insert one item and patch the document
+menu_serialize  -- insert one item and re-serialize the whole tree
+manifest_edit   -- ManifestEditor, B data entries and a depends, raw
+plan            -- generators + PlanOptimizer for B models
+execute         -- PlanExecutor writing the B models to disk
+
+Every scenario reports the median/min time of ``-n`` runs and the
+filesystem calls of one extra run (``os``/``open`` calls made from python,
+plus the kernel read/write syscall counts from /proc when available).
+With ``--baseline`` the results are compared to a stored run and the exit
+code is 1 when a scenario got slower than ``--threshold`` (and by more
+than ``--noise-ms``) or makes more filesystem calls.
+"""
+import argparse
+import builtins
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+
+
+SCALES = {
+    'small': dict(
+        addons_dirs=2, modules=20, menu_items=200, data_items=50,
+        access_rows=200, models=5,
+    ),
+    'medium': dict(
+        addons_dirs=4, modules=200, menu_items=2000, data_items=300,
+        access_rows=3000, models=20,
+    ),
+    'large': dict(
+        addons_dirs=8, modules=1000, menu_items=10000, data_items=1500,
+        access_rows=20000, models=100,
+    ),
+}
+TARGET = 'target'
+# counted calls, all of them are looked up on the module at call time
+OS_CALLS = (
+    'stat', 'lstat', 'scandir', 'listdir', 'open', 'mkdir', 'replace',
+    'rename', 'unlink', 'rmdir', 'utime',
+)
+
+
+# ---------- fixture ----------
+
+def build_project(root: Path, p: dict) -> Path:
+    dirs = [root / 'addons'] + [
+        root / 'src' / f'addons_{i}' for i in range(1, p['addons_dirs'])
+    ]
+    for d in dirs:
+        d.mkdir(parents=True)
+    (root / 'odoo.conf').write_text(
+        '[options]\naddons_path = '
+        + ', '.join(str(d.relative_to(root)) for d in dirs) + '\n'
+    )
+
+    for i in range(p['modules']):
+        _module(dirs[i % len(dirs)] / f'mod_{i}', f'mod_{i}', menus=10, data=5)
+
+    target = dirs[0] / TARGET
+    _module(
+        target, TARGET, menus=p['menu_items'], data=p['data_items'],
+        access=p['access_rows'],
+    )
+    return target
+
+
+def _module(path: Path, name: str, menus: int, data: int, access: int = 2):
+    for sub in ('models', 'views', 'security'):
+        (path / sub).mkdir(parents=True)
+
+    entries = ['security/ir.model.access.csv'] + [
+        f'views/{name}_view_{i}.xml' for i in range(data)
+    ] + ['views/menu.xml']
+    (path / '__manifest__.py').write_text(
+        '{\n'
+        f'    "name": "{name}",\n'
+        '    "version": "19.0.1.0",\n'
+        '    # synthetic module\n'
+        '    "depends": ["base"],\n'
+        '    "data": [\n'
+        + ''.join(f'        "{e}",\n' for e in entries)
+        + '    ],\n'
+        '}\n'
+    )
+    (path / '__init__.py').write_text('from . import models\n')
+    (path / 'models' / '__init__.py').write_text(f'from . import {name}_thing\n')
+    (path / 'models' / f'{name}_thing.py').write_text(
+        'from odoo import models, fields\n\n\n'
+        'class Thing(models.Model):\n'
+        f'    _name = "{name}.thing"\n'
+        '    _description = "Thing"\n\n'
+        '    name = fields.Char(required=True)\n'
+        '    qty = fields.Integer()\n'
+    )
+    (path / 'views' / 'menu.xml').write_text(_menu_xml(name, menus))
+    (path / 'security' / 'ir.model.access.csv').write_text(
+        'id,name,model_id:id,group_id:id,'
+        'perm_read,perm_write,perm_create,perm_unlink\n'
+        + ''.join(
+            f'access_{name}_{i},{name}.m{i},model_{name}_m{i},'
+            'base.group_user,1,1,1,1\n'
+            for i in range(access)
+        )
+    )
+
+
+def _menu_xml(module: str, items: int, fanout: int = 10) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<odoo>',
+        f'    <menuitem id="{module}_root" name="{module}"/>',
+    ]
+    for i in range(items):
+        parent = f'{module}_m{(i - 1) // fanout}' if i else f'{module}_root'
+        lines.append(
+            f'    <menuitem id="{module}_m{i}" name="Menu {i}"'
+            f' parent="{parent}" sequence="{i % fanout * 10}"/>'
+        )
+    lines.append('</odoo>')
+    return '\n'.join(lines) + '\n'
+
+
+# ---------- measuring ----------
+
+class FsCounter:
+    """Counts filesystem calls made through ``os`` and ``open``."""
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def _wrap(self, name, fn):
+        def wrapper(*args, **kwargs):
+            with self.lock:
+                self.counts[name] = self.counts.get(name, 0) + 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def count(self):
+        saved = {name: getattr(os, name) for name in OS_CALLS}
+        saved_open = builtins.open
+        before = _proc_io()
+        try:
+            for name, fn in saved.items():
+                setattr(os, name, self._wrap(f'os.{name}', fn))
+            builtins.open = io.open = self._wrap('open', saved_open)
+            yield self
+        finally:
+            for name, fn in saved.items():
+                setattr(os, name, fn)
+            builtins.open = io.open = saved_open
+        after = _proc_io()
+        if before and after:
+            for key in ('syscr', 'syscw'):
+                self.counts[f'kernel.{key}'] = after[key] - before[key]
+
+    @property
+    def total(self) -> int:
+        return sum(v for k, v in self.counts.items() if not k.startswith('kernel.'))
+
+
+def _proc_io() -> dict[str, int] | None:
+    try:
+        with open('/proc/self/io') as f:
+            return {
+                k: int(v) for k, v in (line.split(': ') for line in f)
+            }
+    except (OSError, ValueError):
+        return None
+
+
+def measure(run, setup=None, n: int = 5) -> dict:
+    """``run(state)`` is timed, ``setup()`` builds its state untimed."""
+    times = []
+    for _ in range(n):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        run(state)
+        times.append((time.perf_counter() - start) * 1000)
+
+    state = setup() if setup else None
+    counter = FsCounter()
+    with counter.count():
+        run(state)
+
+    return {
+        'ms': round(statistics.median(times), 3),
+        'ms_min': round(min(times), 3),
+        'fs_calls': counter.total,
+        'fs': dict(sorted(counter.counts.items())),
+    }
+
+
+# ---------- scenarios ----------
+
+class Scenarios:
+    def __init__(self, root: Path, target: Path, p: dict):
+        self.root = root
+        self.target = target
+        self.p = p
+        self.pristine = root.parent / 'pristine'
+        shutil.copytree(target, self.pristine)
+        self.model_names = [f'bench.model{i}' for i in range(p['models'])]
+
+    def _cache(self, name: str):
+        # a dir per scenario, the indexes of one don't warm the other
+        path = self.root.parent / 'cache' / name
+        os.environ['ODOO_GEN_CACHE_DIR'] = str(path)
+        return path
+
+    def _restore(self):
+        shutil.rmtree(self.target)
+        shutil.copytree(self.pristine, self.target)
+
+    def _app(self):
+        from odoo_gen.app import OdooGenApp
+        from odoo_gen.core.policy import Policy
+
+        policy = Policy(
+            addons=self.target.parent,
+            module=TARGET,
+            menu_parent=f'{TARGET}_root',
+        )
+        return OdooGenApp(
+            models=self.model_names,
+            path=self.root,
+            verbose=False,
+            menu=True,
+            no_views=False,
+            force=False,
+            skip_existing=False,
+            debug=True,
+            interactive=False,
+            policy=policy,
+        )
+
+    def _resolved(self):
+        app = self._app()
+        app._run_signal_loop()
+        return app
+
+    def resolve_cold(self):
+        def setup():
+            shutil.rmtree(self._cache('cold'), ignore_errors=True)
+            return self._app()
+        return measure(lambda app: app._run_signal_loop(), setup, self.n)
+
+    def resolve_warm(self):
+        self._cache('warm')
+        self._resolved()
+        return measure(
+            lambda app: app._run_signal_loop(), self._app, self.n
+        )
+
+    def menu_parse(self):
+        from odoo_gen.core.menu_tree import MenuTree
+
+        path = self.target / 'views' / 'menu.xml'
+        return measure(lambda _: MenuTree(path), n=self.n)
+
+    def _menu_insert(self):
+        from odoo_gen.core.menu_tree import MenuNode, MenuTree
+
+        tree = MenuTree(self.target / 'views' / 'menu.xml')
+        node = MenuNode(id='new', attrs={'id': 'new', 'name': 'New', 'action': 'a'})
+        tree.insert(tree.nodes_by_id[f'{TARGET}_m1'], 3, node)
+        return tree
+
+    def menu_dump(self):
+        return measure(lambda t: t.dump(), self._menu_insert, self.n)
+
+    def menu_serialize(self):
+        return measure(lambda t: t.serialize(), self._menu_insert, self.n)
+
+    def manifest_edit(self):
+        from odoo_gen.core.manifest import ManifestEditor
+
+        path = self.target / '__manifest__.py'
+
+        def run(_):
+            editor = ManifestEditor(path)
+            for name in self.model_names:
+                editor.ensure_data_item(f'views/{name}.xml', before='views/menu.xml')
+            editor.ensure_depends('sale', 'mail')
+            return editor.raw
+        return measure(run, n=self.n)
+
+    def plan(self):
+        self._cache('plan')
+        return measure(lambda app: app._build_plan(), self._resolved, self.n)
+
+    def execute(self):
+        self._cache('execute')
+
+        def setup():
+            self._restore()
+            app = self._resolved()
+            app._build_plan()
+            return app
+        try:
+            return measure(lambda app: app._execute(), setup, self.n)
+        finally:
+            self._restore()
+
+    def run(self, names: list[str], n: int) -> dict:
+        self.n = n
+        return {name: getattr(self, name)() for name in names}
+
+
+SCENARIOS = [
+    'resolve_cold', 'resolve_warm', 'menu_parse', 'menu_dump',
+    'menu_serialize', 'manifest_edit', 'plan', 'execute',
+]
+
+
+# ---------- baseline ----------
+
+def compare(
+    results: dict, baseline: dict, threshold: float, noise_ms: float
+) -> list[str]:
+    """Lines of the comparison table, regressions marked with ``!``.
+
+    Differences below ``noise_ms`` never count as slower.
+    """
+    lines = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f'  {name:<15} new')
+            continue
+        ratio = res['ms'] / base['ms'] if base['ms'] else 1.0
+        slower = ratio > threshold and res['ms'] - base['ms'] > noise_ms
+        more_fs = res['fs_calls'] > base['fs_calls']
+        mark = '!' if slower or more_fs else ' '
+        lines.append(
+            f'{mark} {name:<15} {base["ms"]:9.3f} -> {res["ms"]:9.3f} ms'
+            f' ({ratio:5.2f}x)  fs {base["fs_calls"]} -> {res["fs_calls"]}'
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    for key in SCALES['small']:
+        parser.add_argument('--' + key.replace('_', '-'), type=int)
+    parser.add_argument('-n', type=int, default=5)
+    parser.add_argument('--only', action='append', choices=SCENARIOS)
+    parser.add_argument('--out', type=Path, help='write the JSON here')
+    parser.add_argument('--baseline', type=Path, help='JSON of a previous run')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--noise-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+
+    cache_env = os.environ.get('ODOO_GEN_CACHE_DIR')
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'project'
+        target = build_project(root, params)
+        try:
+            results = Scenarios(root, target, params).run(
+                args.only or SCENARIOS, args.n
+            )
+        finally:
+            if cache_env is None:
+                os.environ.pop('ODOO_GEN_CACHE_DIR', None)
+            else:
+                os.environ['ODOO_GEN_CACHE_DIR'] = cache_env
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'params': params,
+            'runs': args.n,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get('meta', {}).get('params') != params:
+            print('baseline was run with other parameters', file=sys.stderr)
+        lines = compare(
+            results, baseline.get('results', {}), args.threshold, args.noise_ms
+        )
+        print('\n'.join(lines), file=sys.stderr)
+        if any(line.startswith('!') for line in lines):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
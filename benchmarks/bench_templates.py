@@ -0,0 +1,72 @@
+"""Cold vs. warm template rendering.
+
+    python -m benchmarks.bench_templates [-n 50]
+
+cold  -- new environment, empty bytecode cache (compile from source)
+warm  -- new environment, populated bytecode cache (a new process)
+hot   -- the shared environment, templates already loaded
+"""
+import argparse
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader
+
+
+TEMPLATES = {
+    'model.py.j2': dict(
+        model='mod.sale.thing', class_name='SaleThing', description='Thing'
+    ),
+    'view.xml.j2': dict(
+        model='mod.sale.thing', model_underscore='sale_thing',
+        model_str='sale.thing', action_id='action_sale_thing',
+    ),
+    '__manifest__.py.j2': dict(module_name='mod', file_names=['a.xml']),
+}
+
+
+def _env(bcc_dir=None) -> Environment:
+    return Environment(
+        loader=PackageLoader('odoo_gen', 'templates'),
+        bytecode_cache=FileSystemBytecodeCache(bcc_dir) if bcc_dir else None,
+    )
+
+
+def _render_all(env: Environment):
+    for name, params in TEMPLATES.items():
+        env.get_template(name).render(**params)
+
+
+def _timeit(fn, n) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=50)
+    args = parser.parse_args()
+
+    def cold():
+        with tempfile.TemporaryDirectory() as d:
+            _render_all(_env(d))
+
+    with tempfile.TemporaryDirectory() as warm_dir:
+        _render_all(_env(warm_dir))
+        shared = _env(warm_dir)
+        _render_all(shared)
+
+        results = {
+            'cold': _timeit(cold, args.n),
+            'warm': _timeit(lambda: _render_all(_env(warm_dir)), args.n),
+            'hot': _timeit(lambda: _render_all(shared), args.n),
+        }
+
+    for name, ms in results.items():
+        print(f'{name:<5} {ms:8.3f} ms / run ({len(TEMPLATES)} templates)')
+
+
+if __name__ == '__main__':
+    main()
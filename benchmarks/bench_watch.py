@@ -0,0 +1,118 @@
+"""Incremental passes of ``odoo-gen watch`` against a full rebuild.
+
+    python -m benchmarks.bench_watch [--scale small|medium|large]
+        [--models B] [--fields F] [-n 10]
+
+On a synthetic project (see bench_suite) a JSON spec of B models with F
+fields each is applied once, with menus, then every run edits one field
+of one model and times, in ms:
+
+edit        -- ``SpecWatch.update()``: model and view of the edited model
+full        -- ``update(full=True)``: every model re-planned, what did not
+               change elided by the executor (a template save)
+add         -- ``update()`` after a new model was appended: model, view,
+               access row, menu item and manifest entry
+
+Along with the written/unchanged files of the last run.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.bench_suite import SCALES, TARGET, build_project
+
+
+def _spec(models: int, fields: int, edit: int = 0, extra: int = 0) -> list[dict]:
+    """``edit`` renames a field of the first model, ``extra`` adds models."""
+    rows = []
+    for i in range(models + extra):
+        rows.append({
+            'model': f'bench.m{i}',
+            'fields': [
+                {'name': f'f{j}' + (f'_{edit}' if i == j == 0 else ''), 'type': 'char'}
+                for j in range(fields)
+            ],
+        })
+    return rows
+
+
+def _median(run, n: int) -> dict:
+    times, report = [], None
+    for k in range(n):
+        t = time.perf_counter()
+        report = run(k)
+        times.append((time.perf_counter() - t) * 1000)
+    return {
+        'median_ms': round(statistics.median(times), 2),
+        'min_ms': round(min(times), 2),
+        'written': report.written,
+        'unchanged': report.elided,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--models', type=int)
+    parser.add_argument('--fields', type=int, default=10)
+    parser.add_argument('-n', type=int, default=10)
+    args = parser.parse_args()
+    params = SCALES[args.scale]
+    models = args.models or params['models']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.environ['ODOO_GEN_CACHE_DIR'] = str(tmp / 'cache')
+        from odoo_gen.app import OdooGenApp
+        from odoo_gen.core.policy import Policy
+        from odoo_gen.spec_watch import SpecWatch
+
+        target = build_project(tmp / 'project', params)
+        spec = tmp / 'spec.json'
+
+        def write(**kw):
+            spec.write_text(json.dumps(_spec(models, args.fields, **kw)))
+
+        write()
+        app = OdooGenApp(
+            models=[f'bench.m{i}' for i in range(models)],
+            path=target, verbose=False, menu=True, no_views=False,
+            force=False, skip_existing=False, debug=False, interactive=False,
+            policy=Policy(menu_parent=f'{TARGET}_root'),
+        )
+        watch = SpecWatch(app, spec, 'json', menu=True)
+
+        t = time.perf_counter()
+        _, report = watch.update()
+        results = {'initial': {
+            'ms': round((time.perf_counter() - t) * 1000, 2),
+            'written': report.written,
+        }}
+
+        def edit(k, full=False):
+            write(edit=k + 1)
+            return watch.update(full)[1]
+
+        results['edit'] = _median(edit, args.n)
+        results['full'] = _median(lambda k: edit(args.n + k, full=True), args.n)
+
+        def add(k):
+            write(edit=2 * args.n, extra=k + 1)
+            return watch.update()[1]
+
+        results['add'] = _median(add, args.n)
+        app.controllers.close(app.ctx)
+
+    print(json.dumps({
+        'scale': args.scale, 'models': models, 'fields': args.fields,
+        'n': args.n, 'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
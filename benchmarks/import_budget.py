@@ -0,0 +1,69 @@
+"""Import-time budget of a non-interactive CLI run.
+
+    python -m benchmarks.import_budget [--budget-ms 120] [--repeat 5]
+
+Imports what a scripted ``odoo-gen`` call loads before the first prompt
+(``odoo_gen.cli`` and ``odoo_gen.app``) under ``python -X importtime``.
+Exits with 1 when any of the interactive/menu dependencies gets imported
+or the best cumulative import time exceeds the budget.
+"""
+import argparse
+import subprocess
+import sys
+
+
+STATEMENT = 'import odoo_gen.cli, odoo_gen.app'
+FORBIDDEN = ('prompt_toolkit', 'questionary', 'lxml')
+
+
+def measure() -> tuple[float, set[str]]:
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STATEMENT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line.removeprefix('import time:').split('|')
+        total_us += int(self_us)
+        modules.add(name.strip())
+
+    return total_us / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=120)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    best = min(ms for ms, _ in runs)
+    modules = runs[0][1]
+
+    leaked = sorted(
+        m for m in modules
+        if m.split('.', 1)[0] in FORBIDDEN
+    )
+
+    print(f'import time: {best:.1f} ms (budget {args.budget_ms:.0f} ms)')
+
+    failed = False
+    if leaked:
+        print('forbidden imports: ' + ', '.join(leaked[:10]))
+        failed = True
+
+    if best > args.budget_ms:
+        print('import budget exceeded')
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
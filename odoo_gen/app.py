@@ -1,130 +1,164 @@
+import json
 import click
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
 
-from odoo_gen.plan.executor import PlanExecutor
-from odoo_gen.plan.strategies import WriteStrategy
-
-from . import generators as gn
-from .errors import OdooGenError
-from .core.context import ProjectContext
-from .core.resolver import ContextResolver
-from .core.types import Ok, Err
+from .engine import Engine, GenRequest
+from .errors import OdooGenError, UnresolvedSignal
+from .core.policy import Policy
+from .core.storage import DiskStorage, MemoryStorage, Storage
+from .core.types import Err
 from .controllers import (
     ControllerChain,
+    HeadlessController,
     InteractiveController,
+    ProfilingController,
     VerboseController,
 )
-from .enums import MenuState
+
+if TYPE_CHECKING:
+    from .core.schema import ModelSpec
 
 
 class OdooGenApp:
+    """The CLI on top of :class:`Engine`: prompts, prints and exits."""
+
     def __init__(
         self,
         *,
-        model,
+        models: list[str],
         path,
         verbose,
         menu,
         no_views,
         force,
         skip_existing,
-        debug
+        debug,
+        interactive: bool = True,
+        policy: Policy | None = None,
+        scan_workers: int | None = None,
+        dry_run: bool = False,
+        storage: Storage | None = None,
+        jobs: int = 1,
+        inherit: bool = False,
+        profile: bool = False,
+        trace: Path | None = None,
+        engine: Engine | None = None,
+        spec_models: set[str] | None = None,
     ) -> None:
         self.debug = debug
-        self.ctx = ProjectContext(
-            cwd=Path(path).resolve() if path else Path.cwd(),
-            model=model,
-            menu_state=MenuState.NEED if menu else MenuState.SKIP,
+        self.jobs = jobs
+        self.report = None
+        self.dry_run = dry_run
+        if engine is None:
+            if storage is None:
+                # a dry run writes into an overlay on top of the real disk
+                storage = MemoryStorage(DiskStorage()) if dry_run else DiskStorage()
+            engine = Engine(storage, scan_workers=scan_workers)
+        self.engine = engine
+        self.storage = storage or engine.storage
+
+        self.policy = policy or Policy()
+        # the flags of the run, e.g. for passes of ``watch``
+        self.request = GenRequest(
+            models=models,
+            path=path,
+            policy=self.policy,
+            menu=menu,
             no_views=no_views,
-            debug=debug
+            inherit=inherit,
+            force=force,
+            skip_existing=skip_existing,
+            debug=debug,
+            spec_models=spec_models,
         )
+        self.ctx = engine.context(self.request)
 
         self.controllers = ControllerChain([
-            InteractiveController(),
+            # answers what the policy knows, the rest goes to the prompts
+            HeadlessController(self.policy, strict=not interactive),
+            InteractiveController() if interactive else None,
             VerboseController() if verbose else None,
+            ProfilingController(trace, summary=profile)
+            if profile or trace else None,
         ])
 
-        self.resolver = ContextResolver(self.controllers)
-        self.generators = [
-            gn.ModuleScaffoldGenerator(),
-            gn.ModelGenerator(),
-            gn.AccessGenerator(),
-            gn.ViewGenerator(),
-            # gn.MenuGenerator() if menu else None,
-            gn.MenuGenerator(),
-        ]
-        self.write_strategy = WriteStrategy(
-            force=force,
-            skip=skip_existing,
-        )
+    def run(self, batches: 'Iterable[list[ModelSpec]] | None' = None):
+        """Generate the models of the context, or of every batch of specs.
 
-    def run(self):
+        Batches are resolved, planned and written one after another on the
+        same context, so the project is looked up once and memory is bounded
+        by the batch, not by the spec.
+        """
         try:
-            self._run_signal_loop()
-            self._build_plan()
-            self._execute()
-        except OdooGenError as e:
-            click.secho(str(e), fg="red")
-            raise SystemExit(1)
+            if batches is None:
+                self._generate()
+            for batch in batches or ():
+                self._load_batch(batch)
+                self._generate()
+            if self.dry_run and isinstance(self.storage, MemoryStorage):
+                click.echo(self.storage.unified_diff(), nl=False)
+        except UnresolvedSignal as e:
+            # machine-readable reason for scripted runs
+            click.echo(json.dumps(e.to_dict()), err=True)
+            raise SystemExit(2)
         except FileExistsError as e:
             click.secho(
                 (
-                    f'file {str(e)} already exist, use flag:\n'
+                    f'{e}, use flag:\n'
                     '   --skip-existing\n'
                     '   -f or --force for overwrite existing files'
                 ), fg="red"
             )
+        except OdooGenError as e:
+            click.secho(str(e), fg="red")
+            raise SystemExit(1)
         except Exception as e:
             if self.debug:
                 raise
             click.secho("Unexpected error", fg="red")
             click.secho(str(e), fg="red")
             raise SystemExit(1)
+        finally:
+            self.controllers.close(self.ctx)
 
-    def _run_signal_loop(self):
-        while True:
-            result = self.resolver.resolve(self.ctx)
-
-            match result:
-                case Ok(value=ctx):
-                    self.ctx = ctx
-                    break
-
-                case Err(error=signal):
-                    if (
-                        signal.can_auto_resolve(self.ctx)
-                        and signal.auto_resolve(self.ctx)
-                    ):
-                        continue
+    def _generate(self):
+        self._run_signal_loop()
+        for model in self.ctx.unindexed_models or ():
+            click.secho(
+                f'{model} is not defined in the project, extending it '
+                'without adding a depends', fg='yellow', err=True,
+            )
+        self._build_plan()
+        self._execute()
+
+    def _load_batch(self, specs: 'list[ModelSpec]'):
+        ctx = self.ctx
+        ctx.specs = {spec.model: spec for spec in specs}
+        ctx.models = list(ctx.specs)
+        ctx.model = ctx.models[0]
+        # per batch state, resolved again
+        ctx.inherit_modules = None
+        ctx.depends = None
+        ctx.manifest = None
+        ctx.plan = None
 
-                    if self.controllers.handle_signal(signal, self.ctx):
-                        continue
+    def _run_signal_loop(self):
+        self.ctx = self._unwrap(self.engine.resolve(self.ctx, self.controllers))
 
-                    raise OdooGenError(str(signal))
+    def _build_plan(self):
+        return self._unwrap(self.engine.plan(self.ctx, self.controllers))
 
     def _execute(self):
-        self.controllers.before_generate(self.ctx)
-
-        executor = PlanExecutor(
+        report = self._unwrap(self.engine.apply(
+            self.ctx, storage=self.storage, jobs=self.jobs,
             controllers=self.controllers,
-            write_strategy=self.write_strategy,
-        )
-        executor.execute(self.ctx)
-
-        self.controllers.after_generate(self.ctx)
-
-    def _build_plan(self):
-        gens = [
-            (i, g)
-            for i, g in enumerate(self.generators)
-            if g and g.is_applicable(self.ctx)
-        ]
-
-        gens.sort(key=lambda x: (x[1].priority, x[0]))
-
-        plan = []
-        for _, gen in gens:
-            plan.extend(gen.plan(self.ctx))
-
-        self.ctx.plan = plan
-        return plan
+        ))
+        # the report adds up across batches
+        self.report = report if self.report is None else self.report + report
+
+    @staticmethod
+    def _unwrap(result):
+        if isinstance(result, Err):
+            raise result.error
+        return result.value
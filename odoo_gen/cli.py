@@ -1,32 +1,298 @@
+import contextlib
+import itertools
+import os
 import click
 
-from .app import OdooGenApp
+from pathlib import Path
 
 
-@click.command()
-@click.argument('model')
-@click.argument('path', required=False, type=click.Path())
-@click.option('-m', '--menu', is_flag=True, help='create an menu')
-@click.option('--no-views', is_flag=True, help="don't create views")
-@click.option('-v', '--verbose', is_flag=True)
-@click.option('-f', '--force', is_flag=True, help='overwrite existing files')
-@click.option('--skip-existing', is_flag=True, help='skip existing files')
-@click.option('--debug', is_flag=True, help='enable debug mode')
-def main(model, path, menu, no_views, verbose, force, skip_existing, debug):
-    app = OdooGenApp(
-        model=model,
+SPEC_FORMATS = ['csv', 'json', 'jsonl', 'yaml']
+
+
+def _read_spec(spec) -> list[str]:
+    """One model per line, blank lines and ``#`` comments are ignored."""
+    models = []
+    for line in spec:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            models.append(line)
+    return models
+
+
+def _split_path(args: tuple[str, ...], path: str | None):
+    """Keep ``odoo-gen MODEL PATH`` working next to variadic models.
+
+    The last positional is taken as the project path when it looks like one.
+    A name without dots that isn't a directory may be a model as well as a
+    module still to create, that is refused instead of guessed.
+    """
+    models = list(args)
+    if path is None and len(models) > 1:
+        last = models[-1]
+        if os.sep in last or last in ('.', '..') or os.path.isdir(last):
+            path = models.pop()
+        elif '.' not in last:
+            raise click.UsageError(
+                f'is {last!r} a model or a path? pass the path with -p/--path '
+                f'(e.g. -p {last} to create the module)'
+            )
+    return models, path
+
+
+class DefaultGroup(click.Group):
+    """Falls back to ``default_command`` when the first argument isn't a
+    subcommand, so ``odoo-gen MODEL`` keeps working next to
+    ``odoo-gen import SPEC``."""
+
+    def __init__(self, *args, default_command: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] != '--help':
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+def _project_options(f):
+    """Options shared by all commands that write into a project."""
+    options = [
+        click.option('-p', '--path', type=click.Path(), help='project path'),
+        click.option('--no-views', is_flag=True, help="don't create views"),
+        click.option(
+            '-i', '--inherit', is_flag=True,
+            help='extend existing models (_inherit) instead of creating new ones',
+        ),
+        click.option('-v', '--verbose', is_flag=True),
+        click.option('-f', '--force', is_flag=True, help='overwrite existing files'),
+        click.option('--skip-existing', is_flag=True, help='skip existing files'),
+        click.option('--debug', is_flag=True, help='enable debug mode'),
+        click.option(
+            '-j', '--jobs', type=click.IntRange(min=1), default=1,
+            show_default=True, help='write independent files in parallel',
+        ),
+        click.option(
+            '-n', '--dry-run', is_flag=True,
+            help='write nothing, print the diff of what would change',
+        ),
+        click.option(
+            '--no-input', is_flag=True,
+            help='never prompt, fail with a JSON reason instead',
+        ),
+        click.option(
+            '--policy', 'policy_file',
+            type=click.Path(exists=True, dir_okay=False),
+            help='TOML file with answers for --no-input runs',
+        ),
+        click.option('--addons', type=click.Path(), help='addons directory to use'),
+        click.option('--create-addons', is_flag=True, help='create addons if missing'),
+        click.option('--module', help='module name inside the addons directory'),
+        click.option('--create-module', is_flag=True, help='create module if missing'),
+        click.option(
+            '--scan-workers', type=click.IntRange(min=1),
+            help='threads used to scan addons directories',
+        ),
+        click.option(
+            '--profile', is_flag=True,
+            help='print where the time went (per phase) to stderr',
+        ),
+        click.option(
+            '--trace', type=click.Path(dir_okay=False),
+            help='write a Chrome trace (chrome://tracing, Perfetto) here',
+        ),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+def _make_app(
+    models, *, path, menu, no_views, verbose, force, skip_existing, debug,
+    no_input, policy_file, addons, create_addons, module, create_module,
+    menu_parent=None, menu_index=None, scan_workers, dry_run, jobs, inherit,
+    profile, trace, spec_models=None,
+):
+    # deferred so `--help` and usage errors don't pay for the app imports
+    from .app import OdooGenApp
+    from .core.policy import Policy
+    from .errors import OdooGenError
+
+    try:
+        policy = Policy.load(Path(policy_file)) if policy_file else Policy()
+        policy = policy.merge(
+            addons=Path(addons).resolve() if addons else None,
+            create_addons=create_addons,
+            module=module,
+            create_module=create_module,
+            menu_parent=menu_parent,
+            menu_index=Policy.parse_index(menu_index),
+        )
+    except OdooGenError as e:
+        raise click.UsageError(str(e))
+
+    return OdooGenApp(
+        models=models,
         path=path,
         verbose=verbose,
-        menu=menu,
+        menu=menu or bool(policy.menu_parent),
         no_views=no_views,
         force=force,
         skip_existing=skip_existing,
-        debug=debug
+        debug=debug,
+        interactive=not no_input,
+        policy=policy,
+        scan_workers=scan_workers,
+        dry_run=dry_run,
+        jobs=jobs,
+        inherit=inherit,
+        profile=profile,
+        trace=Path(trace) if trace else None,
+        spec_models=spec_models,
     )
+
+
+@contextlib.contextmanager
+def _seekable(fp):
+    """``fp``, or a temporary copy of it when it is a pipe."""
+    if fp.seekable():
+        yield fp
+        return
+    import shutil
+    import tempfile
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as tmp:
+        shutil.copyfileobj(fp, tmp)
+        tmp.seek(0)
+        yield tmp
+
+
+def _done(app):
+    click.secho(f"Done ({app.report})" if app.report else "Done", fg="green")
+
+
+@click.group(cls=DefaultGroup, default_command='generate')
+def main():
+    """Odoo code generator, `odoo-gen MODEL...` runs `generate`."""
+
+
+@main.command()
+@click.argument('models', nargs=-1)
+@click.option(
+    '--spec', type=click.File(), help='file with model names, one per line'
+)
+@click.option('-m', '--menu', is_flag=True, help='create an menu')
+@click.option('--menu-parent', help='xml id of the parent menu')
+@click.option('--menu-index', help='position under the parent, or "end"')
+@_project_options
+def generate(models, path, spec, **options):
+    """Create models with views, access rules and menu."""
+    models, path = _split_path(models, path)
+    if spec:
+        models.extend(_read_spec(spec))
+
+    # keep order, drop duplicates
+    models = list(dict.fromkeys(models))
+    if not models:
+        raise click.UsageError('at least one MODEL or --spec is required')
+
+    app = _make_app(models, path=path, **options)
     app.run()
+    _done(app)
+
+
+@main.command('import')
+@click.argument('spec', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option(
+    '--format', 'fmt', type=click.Choice(SPEC_FORMATS),
+    help='spec format, by default from the file extension',
+)
+@click.option(
+    '--batch-size', type=click.IntRange(min=1), default=200,
+    show_default=True, help='models resolved and written per pass',
+)
+@_project_options
+def import_spec(spec, fmt, batch_size, **options):
+    """Create models with fields from a CSV/JSON spec, one row per field.
+
+    CSV columns: model, name, type, string, required, readonly, index,
+    relation, inverse, selection (draft:Draft;done:Done), help. JSON is an
+    array (or JSON lines) of such rows or of {"model", "fields": [...]},
+    YAML (with PyYAML installed) the same list.
+    The rows of a model must be contiguous.
+    """
+    from .core.schema import batched, format_of, iter_models, model_names
+    from .errors import OdooGenError
+
+    fmt = fmt or format_of(spec)
+    with click.open_file(spec, encoding='utf-8-sig') as fp, _seekable(fp) as fp:
+        try:
+            # names only, so relations to later batches get the prefix too
+            names = model_names(fp, fmt)
+            fp.seek(0)
+            batches = batched(iter_models(fp, fmt), batch_size)
+            first = next(batches, None)
+        except OdooGenError as e:
+            raise click.UsageError(str(e))
+        if first is None:
+            raise click.UsageError(f'no models in {spec}')
+
+        app = _make_app(
+            [s.model for s in first], menu=False, spec_models=names, **options
+        )
+        app.run(itertools.chain([first], batches))
+    _done(app)
+
+
+@main.command()
+@click.option(
+    '--socket', 'socket_path', type=click.Path(dir_okay=False),
+    help='unix socket to listen on [default: $XDG_RUNTIME_DIR/odoo-gen-$UID.sock]',
+)
+def serve(socket_path):
+    """Keep templates and indexes warm and answer JSON-RPC 2.0 requests,
+    one per line, on a unix socket (see odoo_gen/server.py for methods).
+    """
+    from .errors import OdooGenError
+    from .server import default_socket, serve as run_server
+
+    path = Path(socket_path) if socket_path else default_socket()
+    try:
+        run_server(path, on_ready=lambda p: click.echo(f'listening on {p}', err=True))
+    except OdooGenError as e:
+        raise click.ClickException(str(e))
+
+
+@main.command()
+@click.argument('spec', type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    '--format', 'fmt', type=click.Choice(SPEC_FORMATS),
+    help='spec format, by default from the file extension',
+)
+@click.option('-m', '--menu', is_flag=True, help='create menus for new models')
+@click.option('--menu-parent', help='xml id of the parent menu')
+@click.option('--menu-index', help='position under the parent, or "end"')
+@_project_options
+def watch(spec, fmt, menu, **options):
+    """Apply a spec like `import`, then re-apply what changes in it (or in
+    the templates) on every save, until Ctrl-C.
+
+    Models whose fields changed get their model and view files rewritten,
+    new models everything, removed models keep their files.
+    """
+    from .core.schema import format_of
+    from .errors import OdooGenError
+    from .spec_watch import SpecWatch, load_spec
 
-    click.secho("Done", fg="green")
-     
+    if options['dry_run']:
+        raise click.UsageError('--dry-run does not apply to watch')
+    fmt = fmt or format_of(spec)
+    try:
+        specs = load_spec(Path(spec), fmt)
+    except OdooGenError as e:
+        raise click.UsageError(str(e))
+    if not specs:
+        raise click.UsageError(f'no models in {spec}')
 
-# if __name__ == "__main__":
-#     main()
+    app = _make_app(list(specs), menu=menu, **options)
+    click.echo(f'watching {spec}, Ctrl-C to stop', err=True)
+    SpecWatch(app, Path(spec), fmt, menu=menu or bool(options['menu_parent'])).run()
@@ -1,10 +1,14 @@
 from .chain import ControllerChain
+from .headless import HeadlessController
 from .interactive import InteractiveController
+from .profiling import ProfilingController
 from .verbose import VerboseController
 
 
 __all__ = [
     'ControllerChain',
+    'HeadlessController',
     'InteractiveController',
+    'ProfilingController',
     'VerboseController',
 ]
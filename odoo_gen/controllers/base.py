@@ -21,5 +21,25 @@ class BaseController:
     def on_step(self, name, ctx):
         pass
 
+    def on_step_done(self, name, ctx):
+        pass
+
+    # one iteration of the signal loop: resolve + handling of the signal
+    def before_resolve(self, ctx: ProjectContext):
+        pass
+
+    def after_resolve(self, signal, ctx: ProjectContext):
+        pass
+
+    # planning of one generator (or the optimizer)
+    def before_plan(self, generator, ctx: ProjectContext):
+        pass
+
+    def after_plan(self, generator, ctx: ProjectContext):
+        pass
+
+    def close(self, ctx: ProjectContext):
+        """End of the run, also after an error."""
+
     def on_signal(self, signal, ctx: ProjectContext) -> bool:
         return False
@@ -17,6 +17,30 @@ class ControllerChain:
         for c in self.controllers:
             c.on_step(step, ctx)
 
+    def on_step_done(self, step: str, ctx):
+        for c in self.controllers:
+            c.on_step_done(step, ctx)
+
+    def before_resolve(self, ctx):
+        for c in self.controllers:
+            c.before_resolve(ctx)
+
+    def after_resolve(self, signal, ctx):
+        for c in self.controllers:
+            c.after_resolve(signal, ctx)
+
+    def before_plan(self, generator, ctx):
+        for c in self.controllers:
+            c.before_plan(generator, ctx)
+
+    def after_plan(self, generator, ctx):
+        for c in self.controllers:
+            c.after_plan(generator, ctx)
+
+    def close(self, ctx):
+        for c in self.controllers:
+            c.close(ctx)
+
     def before_generate(self, ctx):
         for c in self.controllers:
             c.before_generate(ctx)
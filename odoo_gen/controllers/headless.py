@@ -0,0 +1,130 @@
+from pathlib import Path
+
+from odoo_gen.core.context import ProjectContext
+from odoo_gen.core.policy import Policy
+from odoo_gen.errors import UnresolvedSignal
+from .base import BaseController
+from ..core.signals import (
+    ChooseAddons,
+    ChooseModule,
+    CreateModule,
+    RequireAddonsPath,
+    RequireModulePath,
+    RequireMenuPlacement,
+)
+
+
+class HeadlessController(BaseController):
+    """Resolves signals from a :class:`Policy` without prompting.
+
+    In ``strict`` mode a signal the policy can't answer raises
+    :class:`UnresolvedSignal`, otherwise it is passed down the chain
+    (e.g. to the interactive controller).
+    """
+
+    def __init__(self, policy: Policy, strict: bool = True):
+        self.policy = policy
+        self.strict = strict
+
+    def on_signal(self, signal, ctx: ProjectContext):
+        if isinstance(signal, RequireAddonsPath):
+            return self._handle_addons_not_found(ctx)
+
+        if isinstance(signal, ChooseAddons):
+            return self._handle_ambiguous_addons(signal.paths, ctx)
+
+        if isinstance(signal, RequireModulePath):
+            return self._handle_missing_module(ctx)
+
+        if isinstance(signal, CreateModule):
+            return self._handle_missing_module(ctx, signal.path)
+
+        if isinstance(signal, ChooseModule):
+            return self._handle_ambiguous_modules(signal.modules, ctx)
+
+        if isinstance(signal, RequireMenuPlacement):
+            return self._handle_menu_placement(ctx)
+
+        return self._fail(
+            'unknown_signal', f'cannot resolve {type(signal).__name__}'
+        )
+
+    def _handle_addons_not_found(self, ctx):
+        if self.policy.addons is not None:
+            ctx.addons_path = self.policy.addons
+            return True
+
+        if self.policy.create_addons:
+            ctx.create_addons = True
+            return True
+
+        return self._fail(
+            'addons_not_found', 'addons directory not found', cwd=ctx.cwd
+        )
+
+    def _handle_ambiguous_addons(self, paths: list[Path], ctx):
+        wanted = self.policy.addons
+        for path in paths:
+            if wanted is not None and path.resolve() == wanted:
+                ctx.addons_path = path
+                return True
+
+        return self._fail(
+            'ambiguous_addons',
+            'several addons directories found, choose one with --addons',
+            candidates=paths,
+        )
+
+    def _handle_missing_module(self, ctx, path: Path | None = None):
+        if path is None and self.policy.module and ctx.addons_path:
+            path = ctx.addons_path / self.policy.module
+
+        if path is not None and self.policy.select_module(ctx, path):
+            return True
+
+        return self._fail(
+            'module_not_found',
+            'module not found, pass --module and --create-module',
+            path=path or '',
+        )
+
+    def _handle_ambiguous_modules(self, modules: list[Path], ctx):
+        for path in modules:
+            if path.name == self.policy.module:
+                ctx.module_path = path
+                ctx.module_name = path.name
+                return True
+
+        if self.policy.module and ctx.addons_path:
+            if self.policy.select_module(ctx, ctx.addons_path / self.policy.module):
+                return True
+
+        return self._fail(
+            'ambiguous_module',
+            'several modules found, choose one with --module',
+            candidates=[p.name for p in modules],
+        )
+
+    def _handle_menu_placement(self, ctx):
+        parent_id = self.policy.menu_parent
+        tree = ctx.menu_tree
+        parent = tree.get(parent_id) if parent_id else None
+
+        if parent is None:
+            return self._fail(
+                'menu_parent_not_found' if parent_id else 'menu_placement_required',
+                'menu parent is required, pass --menu-parent',
+                parent=parent_id or '',
+                available=list(tree.nodes_by_id),
+            )
+
+        index = self.policy.menu_index
+        size = len(parent.children)
+        ctx.menu_parent = parent
+        ctx.menu_index = size if index is None else max(0, min(index, size))
+        return True
+
+    def _fail(self, code: str, message: str, **details) -> bool:
+        if not self.strict:
+            return False
+        raise UnresolvedSignal(code, message, **details)
@@ -1,15 +1,8 @@
-import questionary
-
 from pathlib import Path
-from prompt_toolkit.application import Application
-from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.layout.containers import HSplit
-from prompt_toolkit.layout import Layout
-from prompt_toolkit.widgets import TextArea
 
 from odoo_gen.core.context import ProjectContext
-from odoo_gen.core.menu_tree import MenuNode, MenuTree
 from .base import BaseController
+from ..errors import Cancelled
 from ..core.signals import (
     ChooseAddons,
     ChooseModule,
@@ -73,11 +66,15 @@ class InteractiveController(BaseController):
         return True
 
     def _confirm(self, text: str) -> bool:
+        import questionary
+
         if not questionary.confirm(text).ask():
-            raise SystemExit(1)
+            raise Cancelled('cancelled')
         return True
 
     def _select_from_list(self, items, title):
+        import questionary
+
         choices = [
             questionary.Choice(
                 title=str(p),
@@ -107,194 +104,9 @@ class InteractiveController(BaseController):
         return result
 
     def _handle_menu_placement(self, ctx):
+        # prompt_toolkit is only loaded when the menu UI is really needed
+        from .menu_inserter import InteractiveMenuInserter
+
         ui = InteractiveMenuInserter(ctx)
         ui.run()
         return True
-
-
-class InteractiveMenuInserter:
-    def __init__(self, ctx: ProjectContext):
-        self.ctx = ctx
-        self.tree: MenuTree = ctx.menu_tree
-
-        self.expanded: set[str] = {n.id for n in self.tree.nodes}
-        self.visible: list[MenuNode] = []
-        self.cursor: int = 0
-        self.parent: MenuNode | None = None
-        
-        self.output = TextArea(
-            text="",
-            read_only=True,
-            scrollbar=True,
-            wrap_lines=False,
-        )
-        container = HSplit([self.output])
-        kb = self._bindings()
-        self.app = Application(
-            layout=Layout(container),
-            key_bindings=kb,
-            mouse_support=True,
-            full_screen=True,
-        )
-
-        self._rebuild_visible()
-        self._refresh()
-
-    # ---------------- build visible ----------------
-    def _rebuild_visible(self):
-        self.visible = []
-
-        def walk(node):
-            self.visible.append(node)
-            if node.id in self.expanded:
-                for c in node:
-                    walk(c)
-
-        for n in self.tree.nodes:
-            walk(n)
-
-        self._sync_cursor()
-    
-    def _refresh(self):
-        self._rebuild_visible()
-        self._sync_cursor()
-        self.output.text = self._render()
-
-    # ---------------- render ----------------
-    def _render(self) -> str:
-        lines: list[str] = []
-
-        if self.ctx.debug:
-            lines.append(
-                f'cursor={self.cursor}\n'
-                f'parent={self.parent}\n'
-            )
-
-        if self.parent is None:
-            self._render_parent_selection(lines)
-            lines.append('')
-            lines.append(
-                f'Use ↑ / ↓ to navigate, ← / → to expand or collapse the menu.'
-            )
-            lines.append(
-                'Press Enter to select the parent menu or q to cancel.'
-            )
-        else:
-            self._render_index_selection(lines)
-            lines.append("")
-            lines.append("Press Enter to confirm index")
-
-        return "\n".join(lines)
-
-    def _render_parent_selection(self, lines):
-        for i, node in enumerate(self.visible):
-            lines.append(self._draw_node(node, highlight=(i == self.cursor)))
-
-    def _render_index_selection(self, lines):
-        parent = self.parent
-        idx = self.cursor
-        children = parent.children
-
-        for node in self.visible:
-            if node.parent is parent:
-                pos = children.index(node)
-                if pos == idx:
-                    lines.append(self._draw_preview(node.depth))
-
-            lines.append(self._draw_node(node))
-
-            if node is parent and not children:
-                lines.append(self._draw_preview(node.depth + 1))
-
-            if node.parent is parent:
-                pos = children.index(node) + 1
-                if pos == idx and idx == len(children):
-                    lines.append(self._draw_preview(parent.depth + 1))
-
-    def _draw_node(self, node, highlight=False):
-        pref = "│  " * node.depth
-        mark = "▶ " if highlight else "  "
-        arrow = (
-            "▾" if node.children and node.id in self.expanded
-            else "▸" if node.children
-            else " "
-        )
-        name = node.attrs.get("name", node.id)
-        return f"{mark}{pref}{arrow} {name}"
-
-    def _draw_preview(self, depth):
-        return "  " + "│  " * depth + ">>> INSERT HERE <<<"
-
-    # ---------------- helpers ----------------
-    def _sync_cursor(self):
-        if self.parent is None:
-            self.cursor = max(0, min(self.cursor, len(self.visible) - 1))
-        else:
-            self.cursor = max(0, min(self.cursor, len(self.parent.children)))
-
-    # ---------------- keys ----------------
-    def _bindings(self):
-        kb = KeyBindings()
-
-        @kb.add("up")
-        def _(e):
-            self.cursor -= 1
-            self._refresh()
-
-        @kb.add("down")
-        def _(e):
-            self.cursor += 1
-            self._refresh()
-
-        @kb.add("right")
-        def _(e):
-            if self.parent is None:
-                el = self.visible[self.cursor]
-                if len(el):
-                    self.expanded.add(el.id)
-                    self._refresh()
-
-        @kb.add("left")
-        def _(e):
-            if self.parent is None:
-                el = self.visible[self.cursor]
-                if len(el):
-                    self.expanded.discard(el.id)
-                    self._refresh()
-
-        @kb.add("enter")
-        def _(e):
-            if self.parent is None:
-                self.parent = self.visible[self.cursor]
-                self.expanded.add(self.parent.id)
-                self.cursor = 0
-                self._refresh()
-            else:
-                self._confirm()
-                e.app.exit(True)
-        
-        @kb.add("q")
-        @kb.add("c-c")
-        def _(e):
-            "Quit when control-c or q is pressed."
-            e.app.exit()
-            raise SystemExit
-        
-        @kb.add('d')
-        def _(e):
-            "Delete"
-            el = self.visible[self.cursor]
-            if el.parent:
-                el.parent.remove(el)
-            self._refresh()
-        
-        return kb
-    
-    # ---------------- insert ----------------
-    def _confirm(self):
-        self.ctx.menu_parent = self.parent
-        self.ctx.menu_index = self.cursor
-
-    # ---------------- run ----------------
-    def run(self):
-        self.app.run()
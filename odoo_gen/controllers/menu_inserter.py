@@ -0,0 +1,278 @@
+from prompt_toolkit.application import Application
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.containers import HSplit, Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+from prompt_toolkit.layout import Layout
+
+from odoo_gen.core.context import ProjectContext
+from odoo_gen.core.menu_tree import MenuNode, MenuTree
+
+
+class InteractiveMenuInserter:
+    """Full screen picker for the parent menu and the position under it.
+
+    Only the rows inside the viewport are rendered. Moving the cursor just
+    shifts the viewport; the list of visible nodes is rebuilt on
+    expand/collapse/delete and when the parent is chosen.
+    """
+    FOOTER_LINES = 3
+    DEFAULT_HEIGHT = 40
+
+    def __init__(self, ctx: ProjectContext):
+        self.ctx = ctx
+        self.tree: MenuTree = ctx.menu_tree
+
+        self.expanded: set[str] = {n.id for n in self.tree.nodes}
+        self.visible: list[MenuNode] = []
+        # id(node) -> row in visible / first row after its subtree
+        self.row_of: dict[int, int] = {}
+        self.subtree_end: list[int] = []
+        self.cursor: int = 0
+        self.top: int = 0
+        self.parent: MenuNode | None = None
+
+        self.body = Window(
+            FormattedTextControl(self._render_body),
+            wrap_lines=False,
+        )
+        self.footer = Window(
+            FormattedTextControl(self._render_footer),
+            height=self.FOOTER_LINES,
+        )
+        self.app: Application | None = None
+
+        self._rebuild_visible()
+
+    # ---------------- build visible ----------------
+    def _rebuild_visible(self):
+        self.visible = []
+        self.row_of = {}
+        self.subtree_end = []
+        stack = [(n, False) for n in reversed(self.tree.nodes)]
+
+        # iterative pre-order walk, also records where every subtree ends
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                self.subtree_end[self.row_of[id(node)]] = len(self.visible)
+                continue
+
+            self.row_of[id(node)] = len(self.visible)
+            self.visible.append(node)
+            self.subtree_end.append(0)
+            stack.append((node, True))
+            if node.id in self.expanded:
+                stack.extend((c, False) for c in reversed(node.children))
+
+        self._sync_cursor()
+
+    # ---------------- rows ----------------
+    @property
+    def preview_row(self) -> int | None:
+        """Row of the ``INSERT HERE`` line in index selection mode."""
+        parent = self.parent
+        if parent is None:
+            return None
+
+        children = parent.children
+        if self.cursor < len(children):
+            return self.row_of[id(children[self.cursor])]
+        if children:
+            return self.subtree_end[self.row_of[id(children[-1])]]
+        return self.row_of[id(parent)] + 1
+
+    @property
+    def row_count(self) -> int:
+        return len(self.visible) + (self.parent is not None)
+
+    @property
+    def cursor_row(self) -> int:
+        if self.parent is None:
+            return self.cursor
+        return self.preview_row
+
+    def _row(self, i: int, preview: int | None) -> str:
+        if preview is not None:
+            if i == preview:
+                depth = self.parent.depth + 1
+                return self._draw_preview(depth)
+            if i > preview:
+                i -= 1
+
+        node = self.visible[i]
+        highlight = self.parent is None and i == self.cursor
+        return self._draw_node(node, highlight=highlight)
+
+    # ---------------- render ----------------
+    def _render(self, height: int | None = None) -> str:
+        """Text of the rows inside the viewport."""
+        height = height or self._viewport_height()
+        self._scroll_to_cursor(height)
+
+        preview = self.preview_row
+        end = min(self.row_count, self.top + height)
+        lines = [self._row(i, preview) for i in range(self.top, end)]
+        return "\n".join(lines)
+
+    def _render_body(self):
+        return self._render()
+
+    def _render_footer(self) -> str:
+        lines = []
+        if self.ctx.debug:
+            lines.append(f'cursor={self.cursor} top={self.top} parent={self.parent}')
+
+        if self.parent is None:
+            lines.append(
+                f'Use ↑ / ↓ to navigate, ← / → to expand or collapse the menu.'
+            )
+            lines.append(
+                'Press Enter to select the parent menu or q to cancel.'
+            )
+        else:
+            lines.append("Press Enter to confirm index")
+
+        return "\n".join(lines)
+
+    def _draw_node(self, node, highlight=False):
+        pref = "│  " * node.depth
+        mark = "▶ " if highlight else "  "
+        arrow = (
+            "▾" if node.children and node.id in self.expanded
+            else "▸" if node.children
+            else " "
+        )
+        name = node.attrs.get("name", node.id)
+        return f"{mark}{pref}{arrow} {name}"
+
+    def _draw_preview(self, depth):
+        return "  " + "│  " * depth + ">>> INSERT HERE <<<"
+
+    # ---------------- helpers ----------------
+    def _viewport_height(self) -> int:
+        info = self.body.render_info
+        if info is not None:
+            return max(1, info.window_height)
+        if self.app is not None:
+            rows = self.app.output.get_size().rows
+            return max(1, rows - self.FOOTER_LINES)
+        return self.DEFAULT_HEIGHT
+
+    def _scroll_to_cursor(self, height: int):
+        row = self.cursor_row
+        if row < self.top:
+            self.top = row
+        elif row >= self.top + height:
+            self.top = row - height + 1
+        self.top = max(0, min(self.top, max(0, self.row_count - height)))
+
+    def _sync_cursor(self):
+        if self.parent is None:
+            self.cursor = max(0, min(self.cursor, len(self.visible) - 1))
+        else:
+            self.cursor = max(0, min(self.cursor, len(self.parent.children)))
+
+    def _invalidate(self):
+        if self.app is not None:
+            self.app.invalidate()
+
+    # ---------------- actions ----------------
+    def _move(self, delta: int):
+        # no rebuild: the next render shifts the viewport if needed
+        self.cursor += delta
+        self._sync_cursor()
+        self._invalidate()
+
+    def _toggle(self, expand: bool):
+        if self.parent is not None:
+            return
+        el = self.visible[self.cursor]
+        if not len(el):
+            return
+        if expand:
+            self.expanded.add(el.id)
+        else:
+            self.expanded.discard(el.id)
+        self._rebuild_visible()
+        self._invalidate()
+
+    def _select_parent(self):
+        self.parent = self.visible[self.cursor]
+        if self.parent.id not in self.expanded:
+            self.expanded.add(self.parent.id)
+            self._rebuild_visible()
+        self.cursor = 0
+        self._invalidate()
+
+    def _delete(self):
+        el = self.visible[self.cursor]
+        if el.parent:
+            el.parent.remove(el)
+            self._rebuild_visible()
+            self._invalidate()
+
+    # ---------------- keys ----------------
+    def _bindings(self):
+        kb = KeyBindings()
+
+        @kb.add("up")
+        def _(e):
+            self._move(-1)
+
+        @kb.add("down")
+        def _(e):
+            self._move(1)
+
+        @kb.add("pageup")
+        def _(e):
+            self._move(-self._viewport_height())
+
+        @kb.add("pagedown")
+        def _(e):
+            self._move(self._viewport_height())
+
+        @kb.add("right")
+        def _(e):
+            self._toggle(expand=True)
+
+        @kb.add("left")
+        def _(e):
+            self._toggle(expand=False)
+
+        @kb.add("enter")
+        def _(e):
+            if self.parent is None:
+                self._select_parent()
+            else:
+                self._confirm()
+                e.app.exit(True)
+
+        @kb.add("q")
+        @kb.add("c-c")
+        def _(e):
+            "Quit when control-c or q is pressed."
+            e.app.exit()
+            raise SystemExit
+
+        @kb.add('d')
+        def _(e):
+            "Delete"
+            if self.parent is None:
+                self._delete()
+
+        return kb
+
+    # ---------------- insert ----------------
+    def _confirm(self):
+        self.ctx.menu_parent = self.parent
+        self.ctx.menu_index = self.cursor
+
+    # ---------------- run ----------------
+    def run(self):
+        self.app = Application(
+            layout=Layout(HSplit([self.body, self.footer])),
+            key_bindings=self._bindings(),
+            mouse_support=True,
+            full_screen=True,
+        )
+        self.app.run()
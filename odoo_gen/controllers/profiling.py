@@ -0,0 +1,189 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from pathlib import Path
+
+from .base import BaseController
+from ..core import stats
+from ..core.context import ProjectContext
+
+
+class ProfilingController(BaseController):
+    """Wall time of the resolver steps, signal-loop iterations, generators
+    and plan steps, with the filesystem/parse counters of every span.
+
+    ``trace`` gets Chrome trace-event JSON (chrome://tracing, Perfetto),
+    ``summary`` prints a per-span table to stderr when the run ends.
+    Counters are process wide, so a step that overlapped another one (with
+    ``--jobs``) gets none, only the execute span totals them; a step span
+    lasts from submit to completion, steps that overlap go on extra lanes
+    (tids).
+    """
+
+    def __init__(self, trace: Path | None = None, summary: bool = True):
+        self.trace = trace
+        self.summary = summary
+        self.pid = os.getpid()
+        self.t0 = time.perf_counter_ns()
+        self.events: list[dict] = []
+        # key -> (name, cat, start ns, counters, lane)
+        self.open: dict = {}
+        self.lanes: set[int] = set()
+        # keys of step spans that ran alongside another step
+        self.overlapped: set = set()
+        self.iteration = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    # ---------- spans ----------
+
+    def _begin(self, key, name: str, cat: str, lane: int = 0):
+        self.open[key] = (
+            name, cat, time.perf_counter_ns(), stats.snapshot(), lane
+        )
+
+    def _end(self, key, counted: bool = True, **args):
+        entry = self.open.pop(key, None)
+        if entry is None:
+            return
+        name, cat, start, before, lane = entry
+        end = time.perf_counter_ns()
+        counters = stats.snapshot()
+        if counted:
+            args.update(stats.delta(before, counters))
+        with self.lock:
+            self.events.append({
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': (start - self.t0) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': self.pid,
+                'tid': lane,
+                'args': args,
+            })
+            if lane == 0 and cat != 'step':
+                # totals so far, drawn as counter tracks
+                self.events.append({
+                    'name': 'counters',
+                    'ph': 'C',
+                    'ts': (end - self.t0) / 1000,
+                    'pid': self.pid,
+                    'tid': 0,
+                    'args': counters,
+                })
+
+    def _lane(self) -> int:
+        # a step runs alone on the main lane, inside the execute span
+        lane = 0
+        while lane in self.lanes:
+            lane += 1
+        self.lanes.add(lane)
+        return lane
+
+    # ---------- hooks ----------
+
+    def before_resolve(self, ctx: ProjectContext):
+        self.iteration += 1
+        self._begin('resolve', f'resolve #{self.iteration}', 'resolve')
+
+    def after_resolve(self, signal, ctx: ProjectContext):
+        args = {'signal': type(signal).__name__} if signal is not None else {}
+        self._end('resolve', **args)
+
+    def on_step(self, name, ctx: ProjectContext):
+        self._begin(('resolver', name), name.lstrip('_'), 'resolver')
+
+    def on_step_done(self, name, ctx: ProjectContext):
+        self._end(('resolver', name))
+
+    def before_plan(self, generator, ctx: ProjectContext):
+        self._begin(('plan', id(generator)), type(generator).__name__, 'plan')
+
+    def after_plan(self, generator, ctx: ProjectContext):
+        self._end(('plan', id(generator)))
+
+    def before_generate(self, ctx: ProjectContext):
+        self._begin('generate', 'execute', 'execute')
+
+    def after_generate(self, ctx: ProjectContext):
+        self._end('generate', steps=len(ctx.plan or ()))
+
+    def before_step(self, step, ctx: ProjectContext):
+        key = ('step', id(step))
+        running = [k for k in self.open if isinstance(k, tuple) and k[0] == 'step']
+        if running:
+            # the counters would hold the I/O of the other steps too
+            self.overlapped.update(running, [key])
+        name = f'{step.action.value} {step.path.name}'
+        self._begin(key, name, 'step', self._lane())
+
+    def after_step(self, step, ctx: ProjectContext):
+        key = ('step', id(step))
+        entry = self.open.get(key)
+        if entry is not None:
+            self.lanes.discard(entry[4])
+        if key in self.overlapped:
+            self.overlapped.discard(key)
+            self._end(key, counted=False, path=str(step.path), overlapped=True)
+        else:
+            self._end(key, path=str(step.path))
+
+    def close(self, ctx: ProjectContext):
+        if self.closed:
+            return
+        self.closed = True
+        if self.trace is not None:
+            self.write_trace(self.trace)
+        if self.summary:
+            print(self.table(), file=sys.stderr)
+
+    # ---------- output ----------
+
+    def write_trace(self, path: Path):
+        meta = [
+            {
+                'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': lane,
+                'args': {'name': 'main' if not lane else f'step lane {lane}'},
+            }
+            for lane in sorted({e['tid'] for e in self.events})
+        ]
+        data = {'traceEvents': meta + self.events, 'displayTimeUnit': 'ms'}
+        path.write_text(json.dumps(data))
+
+    def table(self) -> str:
+        """Spans grouped by category and name, slowest first."""
+        rows: dict[tuple[str, str], list] = {}
+        for e in self.events:
+            if e['ph'] != 'X':
+                continue
+            name = e['name']
+            if e['cat'] == 'step':
+                # one row per kind of step, not per file
+                name = name.split(' ', 1)[0] + ' ' + Path(e['args']['path']).suffix
+            elif e['cat'] == 'resolve':
+                name = 'iteration'
+            row = rows.setdefault((e['cat'], name), [0, 0.0, 0.0, {}])
+            row[0] += 1
+            row[1] += e['dur'] / 1000
+            row[2] = max(row[2], e['dur'] / 1000)
+            for k, v in e['args'].items():
+                if isinstance(v, int) and not isinstance(v, bool):
+                    row[3][k] = row[3].get(k, 0) + v
+
+        lines = [
+            f'{"category":<9} {"span":<32} {"n":>5} {"total ms":>10} '
+            f'{"max ms":>9}  counters'
+        ]
+        for (cat, name), (n, total, worst, counters) in sorted(
+            rows.items(), key=lambda r: -r[1][1]
+        ):
+            shown = ' '.join(f'{k}={v}' for k, v in sorted(counters.items()))
+            lines.append(
+                f'{cat:<9} {name[:32]:<32} {n:>5} {total:>10.2f} '
+                f'{worst:>9.2f}  {shown}'
+            )
+        return '\n'.join(lines)
@@ -1,11 +1,32 @@
 from .base import BaseController
+from ..core import stats
 from ..core.context import ProjectContext
 
 
+# calls, not sizes (read_bytes/write_bytes)
+FS_CALLS = ('stat', 'listdir', 'open', 'read', 'write')
+
+
 class VerboseController(BaseController):
+    def __init__(self):
+        self.before = None
+
     def on_step(self, step, ctx: ProjectContext):
         print(f"[resolve] {step}")
 
+    def before_generate(self, ctx: ProjectContext):
+        if ctx.plan_stats:
+            print(f"[plan] {ctx.plan_stats}")
+        self.before = stats.snapshot()
+
+    def after_generate(self, ctx: ProjectContext):
+        if self.before is None:
+            return
+        calls = stats.delta(self.before, stats.snapshot())
+        measured = ', '.join(f'{calls[k]} {k}' for k in FS_CALLS if k in calls)
+        print(f"[exec] {sum(calls.get(k, 0) for k in FS_CALLS)} fs calls ({measured})")
+        self.before = None
+
     def before_step(self, step, ctx: ProjectContext):
         if step.details:
             print(f"→ {step.details}")
@@ -0,0 +1,106 @@
+import json
+import os
+
+from functools import cache
+from pathlib import Path
+
+
+@cache
+def version() -> str:
+    # importlib.metadata is slow to import, keep it off the startup path
+    from importlib import metadata
+
+    try:
+        return metadata.version('odoo-gen')
+    except metadata.PackageNotFoundError:
+        return '0+unknown'
+
+
+def cache_root() -> Path | None:
+    """Per-user cache directory, ``None`` when caching is disabled.
+
+    ``ODOO_GEN_CACHE_DIR`` overrides the location, ``ODOO_GEN_NO_CACHE=1``
+    disables on-disk caches entirely.
+    """
+    if os.environ.get('ODOO_GEN_NO_CACHE'):
+        return None
+
+    if custom := os.environ.get('ODOO_GEN_CACHE_DIR'):
+        return Path(custom)
+
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'odoo-gen'
+
+
+def cache_dir(*parts: str) -> Path | None:
+    """Versioned cache subdirectory, created on demand."""
+    root = cache_root()
+    if root is None:
+        return None
+
+    path = root.joinpath(version(), *parts)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+class PersistedIndex:
+    """An index kept as versioned JSON in the cache directory.
+
+    Subclasses name the file and list the dict attributes making up their
+    payload in ``FIELDS``; a file of another ``VERSION`` is ignored. The
+    file is read on first use (lookups call ``_load()``) and written by
+    ``save()`` only when something changed.
+    """
+    FILE = ''
+    VERSION = 1
+    FIELDS: tuple[str, ...] = ()
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.dirty = False
+        self.loaded = False
+
+    @classmethod
+    def cache_file(cls, storage=None) -> Path | None:
+        """Where the index of ``storage`` persists, only the real disk does."""
+        from .storage import DiskStorage
+
+        directory = cache_dir('index')
+        if directory and (storage is None or isinstance(storage, DiskStorage)):
+            return directory / cls.FILE
+        return None
+
+    def save(self) -> None:
+        if not self.dirty or self.path is None:
+            return
+
+        data = {'version': self.VERSION}
+        data.update((name, getattr(self, name)) for name in self.FIELDS)
+        # written aside and renamed, concurrent runs never see half a file
+        tmp = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, self.path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        self.dirty = False
+
+    def _load(self) -> None:
+        if self.loaded:
+            return
+        self.loaded = True
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return
+        for name in self.FIELDS:
+            setattr(self, name, data.get(name, {}))
@@ -1,20 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from odoo_gen.core.manifest import ManifestEditor
 from odoo_gen.plan.steps import PlanStep
-from .menu_tree import MenuTree, MenuNode
 from ..enums import MenuState
 from .manifest import ManifestEditor
 
+if TYPE_CHECKING:
+    # lxml is loaded only when a menu is actually resolved
+    from .menu_tree import MenuTree, MenuNode
+    from .schema import ModelSpec
+    from ..plan.optimizer import OptimizeStats
+
 
 @dataclass(slots=True)
 class ProjectContext:
     cwd: Path
     model: str
+    models: list[str] | None = None
+    # fields of the models, from an imported spec
+    specs: 'dict[str, ModelSpec] | None' = None
+    # models of the whole spec, when it comes in batches: a relation may
+    # point to a later batch
+    spec_models: set[str] | None = None
     
     inherit: bool = False
-    
+    # --force / --skip-existing
+    force: bool = False
+    skip_existing: bool = False
+
     debug: bool = False
     
     root: Path | None = None
@@ -32,14 +46,41 @@ class ProjectContext:
 
     #menu
     menu_file: Path | None = None
-    menu_tree: MenuTree | None = None
-    menu_parent: MenuNode | None = None
+    menu_tree: 'MenuTree | None' = None
+    menu_parent: 'MenuNode | None' = None
+    menu_parent_id: str | None = None
     menu_index: int = 0
     menu_state: MenuState = MenuState.SKIP
 
     manifest: ManifestEditor | None = None
+    # modules to add to depends
+    depends: list[str] | None = None
+    # modules defining the models extended in inherit mode
+    inherit_modules: list[str] | None = None
+    # extended models no module of the project defines, e.g. of odoo
+    # itself when it isn't on the addons paths: no depends added for them
+    unindexed_models: list[str] | None = None
+    # _name of the models the target module defines, the spec included
+    local_models: set[str] | None = None
     
     plan: list[PlanStep] | None = None
+    plan_stats: 'OptimizeStats | None' = None
+
+    # -------- batch --------
+    @property
+    def all_models(self) -> list[str]:
+        return self.models or [self.model]
+
+    def for_model(self, model: str) -> 'ProjectContext':
+        """Shallow copy bound to another model of the batch.
+
+        Resolved state (paths, manifest, menu tree, plan) is shared.
+        """
+        return replace(self, model=model)
+
+    @property
+    def model_spec(self) -> 'ModelSpec | None':
+        return self.specs.get(self.model) if self.specs else None
 
     # -------- naming --------
     @property
@@ -55,12 +96,26 @@ class ProjectContext:
 
     @property
     def model_underscore(self) -> str:
-        return f'{self.model.replace('.', '_')}'
+        return self.model.replace('.', '_')
 
     @property
     def module_model(self) -> str:
         return f'{self.module_name}.{self.model}'
 
+    def relation(self, model: str) -> str:
+        """``_name`` a relation of a spec points to: models of the target
+        module may be named without the module prefix, as in the spec."""
+        local = self.local_models or ()
+        qualified = f'{self.module_name}.{model}'
+        if model not in local and qualified in local:
+            return qualified
+        return model
+
+    @property
+    def model_name(self) -> str:
+        """``_name`` of a new model, ``_inherit`` of an extension."""
+        return self.model if self.inherit else self.module_model
+
     @property
     def action_xml_id(self):
         return f'action_{self.model_underscore}'
@@ -84,12 +139,21 @@ class ProjectContext:
 
     @property
     def model_path(self) -> Path:
+        if self.inherit:
+            # models/res_partner.py, as odoo names extensions
+            return self.models_dir / f'{self.model_underscore}.py'
         return self.models_dir / f'{self.module_name}_{self.model_underscore}.py'
 
     @property
     def view_file_name(self) -> str:
         return f'{self.module_name}_{self.model_underscore}.xml'
 
+    @property
+    def view_file_names(self) -> list[str]:
+        if self.no_views:
+            return []
+        return [self.for_model(m).view_file_name for m in self.all_models]
+
     @property
     def view_path(self) -> Path:
         return self.views_dir / self.view_file_name
@@ -0,0 +1,228 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser, Error as ConfigError
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .storage import DiskStorage, Storage
+
+
+CONF_FILES = ('odoo.conf', 'odoo.cfg', '.odoorc')
+# probing is latency bound (NFS, bind mounts), not CPU bound
+SCAN_WORKERS = 16
+
+
+def scan_workers() -> int:
+    """Threads of a scan: ``ODOO_GEN_SCAN_WORKERS``, read at every call,
+    or :data:`SCAN_WORKERS` when unset or not a number."""
+    try:
+        return max(1, int(os.environ['ODOO_GEN_SCAN_WORKERS']))
+    except (KeyError, ValueError):
+        return SCAN_WORKERS
+
+
+@dataclass(slots=True)
+class RootInfo:
+    """Result of walking up from the cwd to the project root.
+
+    ``stamps`` holds the mtime of every file/dir the walk depended on,
+    the result stays valid while none of them changed.
+    """
+    root: Path | None = None
+    module_path: Path | None = None
+    candidates: list[Path] = field(default_factory=list)
+    stamps: dict[str, int | None] = field(default_factory=dict)
+
+
+def read_addons_path(conf: Path, storage: Storage) -> list[Path]:
+    """``addons_path`` of an odoo config, relative entries from its dir."""
+    parser = ConfigParser(interpolation=None)
+    try:
+        parser.read_string(storage.read_text(conf))
+    except (OSError, ConfigError):
+        return []
+
+    raw = parser.get('options', 'addons_path', fallback='')
+    paths = []
+    for item in raw.split(','):
+        item = item.strip()
+        if item:
+            paths.append((conf.parent / Path(item).expanduser()).resolve())
+    return paths
+
+
+# never hold python models or xml records odoo loads
+SKIP_DIRS = {
+    'static', 'i18n', 'i18n_extra', 'tests', 'migrations', 'upgrades',
+    'node_modules',
+}
+
+
+def module_files(
+    module: Path,
+    suffix: str,
+    storage: Storage,
+    listings: dict[str, dict],
+) -> tuple[list[str], dict[str, dict]]:
+    """Paths of the ``suffix`` files under a module.
+
+    ``listings`` caches directories as ``{'mtime', 'dirs', 'files'}``, a
+    directory is listed again only when its mtime changed. The new
+    listings are returned for the caller to merge into its cache.
+    """
+    files = []
+    fresh = {}
+    stack = [module]
+    while stack:
+        d = stack.pop()
+        mtime = storage.mtime(d)
+        entry = listings.get(str(d))
+        if entry is None or entry['mtime'] != mtime:
+            entry = {
+                'mtime': mtime,
+                'dirs': [
+                    name for name in map(os.path.basename, storage.list_dirs(d))
+                    if name not in SKIP_DIRS and not name.startswith('.')
+                ],
+                'files': [
+                    name for name in storage.list_files(d)
+                    if name.endswith(suffix)
+                ],
+            }
+            fresh[str(d)] = entry
+
+        files.extend(str(d / name) for name in entry['files'])
+        stack.extend(d / name for name in reversed(entry['dirs']))
+    return files, fresh
+
+
+def conf_addons_paths(root: Path, storage: Storage | None = None) -> list[Path]:
+    """Existing ``addons_path`` entries of the odoo configs in ``root``,
+    including the ones outside of it (odoo's own addons)."""
+    storage = storage or DiskStorage()
+    paths = []
+    for name in CONF_FILES:
+        conf = root / name
+        if storage.is_file(conf):
+            for path in read_addons_path(conf, storage):
+                if path not in paths and storage.is_dir(path):
+                    paths.append(path)
+    return paths
+
+
+def find_root(
+    cwd: Path, addons_dirs, max_depth: int, storage: Storage | None = None
+) -> RootInfo:
+    storage = storage or DiskStorage()
+    info = RootInfo()
+    p = cwd
+    depth = 0
+
+    while p != p.parent and depth < max_depth:
+        info.stamps[str(p)] = storage.mtime(p)
+
+        # inside module
+        if storage.exists(p / "__manifest__.py"):
+            info.module_path = p
+            info.root = p.parent.parent
+            info.candidates = [p.parent]
+            break
+
+        # inside addons
+        if p.name in addons_dirs:
+            info.root = p.parent
+            info.candidates = [p]
+            break
+
+        # root containing addons dirs
+        found = [
+            p / name for name in sorted(addons_dirs)
+            if storage.exists(p / name)
+        ]
+        # and addons listed by an odoo config living in the project
+        for name in CONF_FILES:
+            conf = p / name
+            if not storage.is_file(conf):
+                continue
+            info.stamps[str(conf)] = storage.mtime(conf)
+            for path in read_addons_path(conf, storage):
+                if (
+                    path.is_relative_to(p)
+                    and storage.is_dir(path)
+                    and path not in found
+                ):
+                    found.append(path)
+
+        if found:
+            info.root = p
+            info.candidates = found
+            break
+
+        p = p.parent
+        depth += 1
+
+    return info
+
+
+def scan_modules(
+    addons_path: Path,
+    workers: int | None = None,
+    storage: Storage | None = None,
+) -> list[str]:
+    """Names of module directories, in directory listing order."""
+    return scan_addons([addons_path], workers, storage)[addons_path]
+
+
+def scan_addons(
+    paths: list[Path],
+    workers: int | None = None,
+    storage: Storage | None = None,
+) -> dict[Path, list[str]]:
+    """Cold scan of several addons dirs at once.
+
+    Listings and ``__manifest__.py`` probes run on a bounded thread pool,
+    the result keeps the listing order of every directory.
+    """
+    return {
+        path: [name for name, _, is_module in entries if is_module]
+        for path, entries in scan_addons_dirs(paths, workers, storage).items()
+    }
+
+
+def scan_addons_dirs(
+    paths: list[Path],
+    workers: int | None = None,
+    storage: Storage | None = None,
+) -> dict[Path, list[list]]:
+    """``[name, mtime, is_module]`` of every subdirectory of the addons
+    dirs, in listing order, see :func:`scan_addons`."""
+    storage = storage or DiskStorage()
+    if workers is None:
+        workers = scan_workers()
+
+    def probe(path: str) -> list:
+        return probe_module_dir(Path(path), storage)
+
+    if workers <= 1:
+        listings = [storage.list_dirs(p) for p in paths]
+        probes = [probe(d) for listing in listings for d in listing]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            listings = list(pool.map(storage.list_dirs, paths))
+            probes = list(pool.map(probe, [d for l in listings for d in l]))
+
+    result = {}
+    it = iter(probes)
+    for path, listing in zip(paths, listings):
+        result[path] = [next(it) for _ in listing]
+    return result
+
+
+def probe_module_dir(path: Path, storage: Storage) -> list:
+    """``[name, mtime, is_module]`` of a subdirectory of an addons dir.
+
+    The mtime is taken first: a manifest created after the probe moves it.
+    """
+    mtime = storage.mtime(path)
+    return [path.name, mtime, storage.exists(path / '__manifest__.py')]
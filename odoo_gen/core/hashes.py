@@ -0,0 +1,65 @@
+import hashlib
+import threading
+
+from pathlib import Path
+
+from .cache import PersistedIndex
+from .storage import Storage
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class HashStore(PersistedIndex):
+    """Content hashes of files keyed by path, valid for a (size, mtime).
+
+    Lets the executor tell whether a write would change a file without
+    reading it back, as long as nobody touched the file since.
+    """
+    FILE = 'hashes.json'
+    FIELDS = ('entries',)
+
+    def __init__(self, path: Path | None = None):
+        super().__init__(path)
+        self.entries: dict[str, list] = {}
+        self.lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def default(cls, storage: Storage | None = None) -> 'HashStore':
+        return cls(cls.cache_file(storage))
+
+    def same_content(self, storage: Storage, path: Path, data: bytes) -> bool:
+        """Whether the file at ``path`` already holds exactly ``data``."""
+        stat = storage.stat(path)
+        if stat is None:
+            return False
+
+        size, mtime = stat
+        if size != len(data):
+            return False
+
+        new = digest(data)
+        entry = self.entries.get(str(path))
+        if entry is not None and entry[:2] == [size, mtime]:
+            return entry[2] == new
+
+        old = digest(storage.read_bytes(path))
+        self._put(path, size, mtime, old)
+        return old == new
+
+    def remember(self, storage: Storage, path: Path, data: bytes) -> None:
+        """Record the hash of ``data`` just written to ``path``."""
+        self.remember_digest(storage, path, digest(data))
+
+    def remember_digest(self, storage: Storage, path: Path, value: str) -> None:
+        """The same for content streamed to ``path``, hashed on the way."""
+        stat = storage.stat(path)
+        if stat is not None:
+            self._put(path, *stat, value)
+
+    def _put(self, path: Path, size: int, mtime: int, value: str):
+        with self.lock:
+            self.entries[str(path)] = [size, mtime, value]
+            self.dirty = True
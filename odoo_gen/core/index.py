@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .cache import PersistedIndex
+from .discovery import (
+    RootInfo, find_root, probe_module_dir, scan_addons_dirs, scan_workers,
+)
+from .storage import DiskStorage, Storage
+
+
+class DiscoveryIndex(PersistedIndex):
+    """On-disk index of project roots, addons paths and modules.
+
+    Entries are validated by directory mtimes: a root lookup re-stats only
+    the directories the original walk looked at, a module listing its
+    addons directory and every subdirectory of it (adding ``__manifest__.py``
+    to an existing directory doesn't change the mtime of the addons dir).
+    """
+    FILE = 'discovery.json'
+    VERSION = 2
+    FIELDS = ('roots', 'addons')
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        workers: int | None = None,
+        storage: Storage | None = None,
+    ):
+        super().__init__(path)
+        self.workers = scan_workers() if workers is None else workers
+        self.storage = storage or DiskStorage()
+        self.roots: dict[str, dict] = {}
+        self.addons: dict[str, dict] = {}
+        self._load()
+
+    @classmethod
+    def default(
+        cls, workers: int | None = None, storage: Storage | None = None
+    ) -> 'DiscoveryIndex':
+        return cls(cls.cache_file(storage), workers=workers, storage=storage)
+
+    # ---------- lookups ----------
+
+    def find_root(self, cwd: Path, addons_dirs, max_depth: int) -> RootInfo:
+        key = str(cwd)
+        entry = self.roots.get(key)
+        if entry is not None and self._fresh(entry['stamps']):
+            return RootInfo(
+                root=_path(entry['root']),
+                module_path=_path(entry['module_path']),
+                candidates=[Path(p) for p in entry['candidates']],
+                stamps=entry['stamps'],
+            )
+
+        info = find_root(cwd, addons_dirs, max_depth, self.storage)
+        self.roots[key] = {
+            'root': _str(info.root),
+            'module_path': _str(info.module_path),
+            'candidates': [str(p) for p in info.candidates],
+            'stamps': info.stamps,
+        }
+        self.dirty = True
+        return info
+
+    def modules(self, addons_path: Path) -> list[Path]:
+        return self.modules_many([addons_path])[addons_path]
+
+    def modules_many(self, paths: list[Path]) -> dict[Path, list[Path]]:
+        """Modules of several addons dirs, stale ones are scanned together."""
+        stamps = {p: self.storage.mtime(p) for p in paths}
+        stale = [
+            p for p in paths
+            if self.addons.get(str(p), {}).get('mtime', -1) != stamps[p]
+        ]
+
+        if stale:
+            scanned = scan_addons_dirs(stale, self.workers, self.storage)
+            for path, dirs in scanned.items():
+                self.addons[str(path)] = {'mtime': stamps[path], 'dirs': dirs}
+            self.dirty = True
+
+        # a manifest added to (or removed from) an existing directory moves
+        # the mtime of that directory only
+        kept = [
+            (p, entry) for p in paths if p not in stale
+            for entry in self.addons[str(p)]['dirs']
+        ]
+        changed = [
+            (p, entry) for (p, entry), mtime in zip(kept, self._map(
+                lambda item: self.storage.mtime(item[0] / item[1][0]), kept,
+            ))
+            if mtime != entry[1]
+        ]
+        if changed:
+            probes = self._map(
+                lambda item: probe_module_dir(item[0] / item[1][0], self.storage),
+                changed,
+            )
+            for (_, entry), probe in zip(changed, probes):
+                entry[:] = probe
+            self.dirty = True
+
+        return {
+            p: [
+                p / name
+                for name, _, is_module in self.addons[str(p)]['dirs']
+                if is_module
+            ]
+            for p in paths
+        }
+
+    def _map(self, fn, items: list) -> list:
+        if self.workers <= 1 or len(items) < 2:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(fn, items))
+
+    def _fresh(self, stamps: dict[str, int | None]) -> bool:
+        return all(self.storage.mtime(Path(p)) == m for p, m in stamps.items())
+
+
+def _path(value: str | None) -> Path | None:
+    return Path(value) if value is not None else None
+
+
+def _str(value: Path | None) -> str | None:
+    return str(value) if value is not None else None
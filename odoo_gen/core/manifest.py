@@ -3,20 +3,35 @@ import ast
 from pathlib import Path
 
 from odoo_gen.errors import ManifestParseError
+from .stats import count
+from .storage import DiskStorage, Storage
 
 
 class ManifestEditor:
-    def __init__(self, path: Path):
-        self.path = path
-        self.raw = path.read_text()
-        self.tree = ast.parse(self.raw)
+    """Edits ``__manifest__.py`` without touching the rest of the file.
 
-        if len(self.tree.body) != 1 or not isinstance(self.tree.body[0], ast.Expr):
-            raise ManifestParseError("Manifest must be a single dict expression")
+    The source is parsed once. Edits (``data`` entries, ``depends``,
+    version bumps) are queued as insertions/replacements at exact offsets
+    and applied together in one pass when ``raw`` is read, so comments and
+    formatting stay as they are.
+    """
 
-        expr = self.tree.body[0].value
-        if not isinstance(expr, ast.Dict):
-            raise ManifestParseError("Manifest is not a dict")
+    def __init__(self, path: Path, storage: Storage | None = None):
+        self.path = path
+        self._text = (storage or DiskStorage()).read_text(path)
+        # (start, order, end, text)
+        self._edits: list[tuple[int, int, int, str]] = []
+        self._added: dict[str, list[str]] = {}
+        self._new_keys: dict[str, list[str]] = {}
+        self._commas: set[int] = set()
+        self._tails: dict[int, int] = {}
+        self._parse()
+
+    @property
+    def raw(self) -> str:
+        if self._edits or self._new_keys:
+            self._apply()
+        return self._text
 
     # ---------- public API ----------
     def ensure_data_item(
@@ -26,61 +41,257 @@ class ManifestEditor:
         after: str | None = None,
         before: str | None = None,
     ):
-        data_node = self._find_data_node()
-        if not data_node:
-            raise ManifestParseError("data key not found in manifest")
+        self._ensure_item('data', value, after=after, before=before)
 
-        data_src = ast.get_source_segment(self.raw, data_node)
-        if not data_src:
-            raise ManifestParseError("cannot extract data source")
+    def ensure_depends(self, *names: str):
+        for name in names:
+            self._ensure_item('depends', name)
 
-        lines = data_src.splitlines()
+    def bump_version(self) -> str | None:
+        """Increment the last number of ``version``, e.g. 19.0.1.0 -> 19.0.1.1."""
+        node = self._value('version')
+        if not isinstance(node, ast.Constant) or not isinstance(node.value, str):
+            return None
 
-        if any(value in line for line in lines):
+        parts = node.value.split('.')
+        if not parts[-1].isdigit():
+            return None
+        parts[-1] = str(int(parts[-1]) + 1)
+        return self.set_version('.'.join(parts))
+
+    def set_version(self, version: str) -> str | None:
+        node = self._value('version')
+        if not isinstance(node, ast.Constant):
+            return None
+        start, end = self._span(node)
+        self._edit(start, self._quote(version, self._text[start]), end)
+        return version
+
+    # ---------- lists ----------
+    def _ensure_item(self, key, value, *, after=None, before=None):
+        node = self._value(key)
+        if node is None:
+            pending = self._new_keys.setdefault(key, [])
+            if value not in pending:
+                pending.append(value)
+            return
+        if not isinstance(node, ast.List):
+            raise ManifestParseError(f'"{key}" is not a list')
+
+        items = [
+            e.value for e in node.elts
+            if isinstance(e, ast.Constant) and isinstance(e.value, str)
+        ]
+        added = self._added.setdefault(key, [])
+        if value in items or value in added:
             return  # already exists
+        added.append(value)
+
+        elts = node.elts
+        if before in items:
+            self._insert_before(node, elts[items.index(before)], value)
+        elif after in items:
+            self._insert_after(node, elts[items.index(after)], value)
+        elif elts:
+            self._insert_after(node, elts[-1], value)
+        else:
+            self._insert_empty(node, value)
 
-        new_line = self._format_item(value, lines)
+    def _insert_before(self, lst: ast.List, elt: ast.expr, value: str):
+        start, _ = self._span(elt)
+        item = self._quote(value, self._text[start])
+        line_start = self._text.rfind('\n', 0, start) + 1
 
-        if before:
-            lines = self._insert_before(lines, before, new_line)
-        elif after:
-            lines = self._insert_after(lines, after, new_line)
+        if self._multiline(lst) and not self._text[line_start:start].strip():
+            indent = self._text[line_start:start]
+            self._edit(line_start, f'{indent}{item},\n')
         else:
-            lines.insert(-1, new_line)
-
-        new_data_src = "\n".join(lines)
-        self.raw = self.raw.replace(data_src, new_data_src)
-
-    # ---------- internals ----------
-    def _find_data_node(self):
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Dict):
-                for k, v in zip(node.keys, node.values):
-                    if isinstance(k, ast.Constant) and k.value == "data":
-                        return v
-        return None
-
-    def _format_item(self, value: str, lines: list[str]) -> str:
-        indent = self._detect_indent(lines)
-        return f'{indent}"{value}",'
-
-    def _detect_indent(self, lines: list[str]) -> str:
-        for line in lines[1:]:
-            stripped = line.lstrip()
-            if stripped and stripped.startswith(("'", '"')):
-                return line[: len(line) - len(stripped)]
-        return "    "
-
-    def _insert_after(self, lines: list[str], after: str, new_line: str):
-        for i, line in enumerate(lines):
-            if after in line:
-                return lines[: i + 1] + [new_line] + lines[i + 1 :]
-        return lines[:-1] + [new_line] + [lines[-1]]
-
-    def _insert_before(self, lines: list[str], before: str, new_line: str) -> list[str]:
-        for i, line in enumerate(lines):
-            if before in line:
-                return lines[:i] + [new_line] + lines[i:]
-
-        lines.insert(-1, new_line)
-        return lines
+            self._edit(start, f'{item}, ')
+
+    def _insert_after(self, lst: ast.List, elt: ast.expr, value: str):
+        start, end = self._span(elt)
+        item = self._quote(value, self._text[start])
+        nxt = self._next_start(lst, elt)
+        has_comma = ',' in self._strip_comments(self._text[end:nxt])
+
+        if not self._multiline(lst):
+            if has_comma:
+                comma = self._text.index(',', end)
+                self._edit(comma + 1, f' {item},')
+            else:
+                self._edit(end, f', {item}')
+            return
+
+        if not has_comma and end not in self._commas:
+            self._commas.add(end)
+            self._edit(end, ',')
+        line_start = self._text.rfind('\n', 0, start) + 1
+        indent = self._text[line_start:start]
+        indent = indent if not indent.strip() else self._indent_of(lst) + '    '
+        eol = self._text.find('\n', end)
+        eol = len(self._text) if eol == -1 else eol
+        # a last item without a trailing comma keeps the style, only the
+        # item appended last goes without one
+        comma = ',' if has_comma or nxt != self._list_end(lst) else ''
+        if not comma:
+            prev = self._tails.get(eol)
+            if prev is not None:
+                start, order, end, text = self._edits[prev]
+                self._edits[prev] = (start, order, end, text + ',')
+            self._tails[eol] = len(self._edits)
+        self._edit(eol, f'\n{indent}{item}{comma}')
+
+    def _insert_empty(self, lst: ast.List, value: str):
+        start, end = self._span(lst)
+        item = self._quote(value, self._quote_char())
+        if self._multiline(lst):
+            indent = self._indent_of(lst)
+            close = end - 1
+            line_start = self._text.rfind('\n', 0, close) + 1
+            self._edit(line_start, f'{indent}    {item},\n')
+        elif end - 1 in self._commas:
+            self._edit(end - 1, f', {item}')
+        else:
+            # the first item goes alone, the following ones after a comma
+            self._commas.add(end - 1)
+            self._edit(end - 1, item)
+
+    # ---------- new keys ----------
+    def _key_edits(self):
+        for key, values in self._new_keys.items():
+            q = self._quote_char()
+            items = ', '.join(self._quote(v, q) for v in values)
+            anchor = self._keys.get('data') if key != 'data' else None
+
+            entry = f'{self._quote(key, q)}: [{items}]'
+            if anchor is not None:
+                k, _ = anchor
+                start, _ = self._span(k)
+                line_start = self._text.rfind('\n', 0, start) + 1
+                indent = self._text[line_start:start]
+                if indent.strip():
+                    self._edit(start, f'{entry}, ')
+                else:
+                    self._edit(line_start, f'{indent}{entry},\n')
+                continue
+
+            _, dict_end = self._span(self._dict)
+            last = self._dict.values[-1] if self._dict.values else None
+            if last is None:
+                self._edit(dict_end - 1, entry)
+                continue
+
+            kstart, _ = self._span(self._dict.keys[-1])
+            _, end = self._span(last)
+            has_comma = ',' in self._strip_comments(self._text[end:dict_end - 1])
+            line_start = self._text.rfind('\n', 0, kstart) + 1
+            indent = self._text[line_start:kstart]
+
+            if self._dict.lineno == self._dict.end_lineno or indent.strip():
+                self._edit(end, f' {entry},' if has_comma else f', {entry}')
+                continue
+            if not has_comma and end not in self._commas:
+                self._commas.add(end)
+                self._edit(end, ',')
+            eol = self._text.find('\n', end)
+            eol = len(self._text) if eol == -1 else eol
+            self._edit(eol, f'\n{indent}{entry},')
+        self._new_keys = {}
+
+    # ---------- apply ----------
+    def _edit(self, start: int, text: str, end: int | None = None):
+        self._edits.append((start, len(self._edits), start if end is None else end, text))
+
+    def _apply(self):
+        self._key_edits()
+        out = []
+        pos = 0
+        for start, _, end, text in sorted(self._edits):
+            out.append(self._text[pos:start])
+            out.append(text)
+            pos = max(pos, end)
+        out.append(self._text[pos:])
+
+        self._text = ''.join(out)
+        self._edits = []
+        self._commas = set()
+        self._tails = {}
+        # offsets are stale now, parse again only if more edits come
+        self._stale = True
+
+    # ---------- parsing ----------
+    def _parse(self):
+        try:
+            tree = ast.parse(self._text)
+            count('ast_parse')
+        except SyntaxError as e:
+            raise ManifestParseError(f"Manifest is not valid python: {e}")
+
+        if len(tree.body) != 1 or not isinstance(tree.body[0], ast.Expr):
+            raise ManifestParseError("Manifest must be a single dict expression")
+
+        expr = tree.body[0].value
+        if not isinstance(expr, ast.Dict):
+            raise ManifestParseError("Manifest is not a dict")
+
+        self._dict = expr
+        self._keys = {
+            k.value: (k, v) for k, v in zip(expr.keys, expr.values)
+            if isinstance(k, ast.Constant)
+        }
+        self._added = {}
+        self._stale = False
+
+        # ast columns are utf-8 byte offsets
+        self._lines = self._text.splitlines(True)
+        self._starts = [0]
+        for line in self._lines:
+            self._starts.append(self._starts[-1] + len(line))
+
+    def _value(self, key: str):
+        if self._stale:
+            self._parse()
+        entry = self._keys.get(key)
+        return entry[1] if entry else None
+
+    def _offset(self, lineno: int, col: int) -> int:
+        line = self._lines[lineno - 1]
+        return self._starts[lineno - 1] + len(line.encode()[:col].decode())
+
+    def _span(self, node: ast.AST) -> tuple[int, int]:
+        return (
+            self._offset(node.lineno, node.col_offset),
+            self._offset(node.end_lineno, node.end_col_offset),
+        )
+
+    def _multiline(self, lst: ast.List) -> bool:
+        return lst.lineno != lst.end_lineno
+
+    def _list_end(self, lst: ast.List) -> int:
+        return self._span(lst)[1] - 1
+
+    def _next_start(self, lst: ast.List, elt: ast.expr) -> int:
+        i = lst.elts.index(elt)
+        if i + 1 < len(lst.elts):
+            return self._span(lst.elts[i + 1])[0]
+        return self._list_end(lst)
+
+    def _indent_of(self, node: ast.AST) -> str:
+        line = self._lines[node.lineno - 1]
+        return line[: len(line) - len(line.lstrip())]
+
+    def _quote_char(self) -> str:
+        """Quote used by the keys of the manifest."""
+        for k in self._dict.keys:
+            if isinstance(k, ast.Constant):
+                return self._text[self._span(k)[0]]
+        return '"'
+
+    @staticmethod
+    def _strip_comments(src: str) -> str:
+        return '\n'.join(line.split('#', 1)[0] for line in src.split('\n'))
+
+    @staticmethod
+    def _quote(value: str, like: str) -> str:
+        q = "'" if like == "'" else '"'
+        return q + value.replace('\\', '\\\\').replace(q, '\\' + q) + q
@@ -0,0 +1,203 @@
+import ast
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..errors import DependencyCycle
+from .cache import PersistedIndex
+from .discovery import scan_workers
+from .stats import count
+from .storage import DiskStorage, Storage
+
+
+class ModuleGraph:
+    """Dependency graph of the modules of a project.
+
+    ``depends`` maps a module to its direct dependencies as written in the
+    manifest. Dependencies that aren't part of the project (odoo core
+    outside the addons paths) stay in the lists but have no node.
+    """
+
+    def __init__(self, depends: dict[str, list[str]]):
+        self.depends = depends
+        self._reverse: dict[str, list[str]] | None = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.depends
+
+    def closure(self, name: str) -> set[str]:
+        """All modules ``name`` depends on, directly or not, ``base`` included."""
+        seen = {'base'}
+        stack = list(self.depends.get(name, ()))
+        while stack:
+            dep = stack.pop()
+            if dep in seen:
+                continue
+            seen.add(dep)
+            stack.extend(self.depends.get(dep, ()))
+        seen.discard(name)
+        return seen
+
+    def missing(self, name: str, needed) -> list[str]:
+        """The modules of ``needed`` that ``name`` doesn't depend on yet."""
+        have = self.closure(name)
+        return [m for m in needed if m != name and m not in have]
+
+    def reverse(self, name: str, transitive: bool = False) -> list[str]:
+        """Modules depending on ``name``."""
+        if self._reverse is None:
+            self._reverse = {}
+            for mod, deps in self.depends.items():
+                for dep in deps:
+                    self._reverse.setdefault(dep, []).append(mod)
+
+        if not transitive:
+            return list(self._reverse.get(name, ()))
+
+        out = []
+        seen = {name}
+        queue = deque([name])
+        while queue:
+            for mod in self._reverse.get(queue.popleft(), ()):
+                if mod not in seen:
+                    seen.add(mod)
+                    out.append(mod)
+                    queue.append(mod)
+        return out
+
+    def topo_order(self, names=None) -> list[str]:
+        """Dependencies first. ``names`` limits the result to those modules
+        (their dependencies are still taken into account)."""
+        nodes = list(self.depends)
+        pending = {
+            mod: sum(1 for d in self.depends[mod] if d in self.depends)
+            for mod in nodes
+        }
+        queue = deque(mod for mod in nodes if not pending[mod])
+        order = []
+        while queue:
+            mod = queue.popleft()
+            order.append(mod)
+            for user in self.reverse(mod):
+                pending[user] -= 1
+                if not pending[user]:
+                    queue.append(user)
+
+        if len(order) != len(nodes):
+            raise DependencyCycle(self.cycles()[0])
+
+        if names is None:
+            return order
+        wanted = set(names)
+        return [mod for mod in order if mod in wanted]
+
+    def cycles(self) -> list[list[str]]:
+        """One path per dependency cycle, first module repeated at the end."""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = dict.fromkeys(self.depends, WHITE)
+        found = []
+
+        for start in self.depends:
+            if color[start] != WHITE:
+                continue
+            path = [start]
+            stack = [iter(self.depends[start])]
+            color[start] = GREY
+            while stack:
+                dep = next(stack[-1], None)
+                if dep is None:
+                    color[path.pop()] = BLACK
+                    stack.pop()
+                elif dep not in color:
+                    continue
+                elif color[dep] == GREY:
+                    found.append(path[path.index(dep):] + [dep])
+                elif color[dep] == WHITE:
+                    color[dep] = GREY
+                    path.append(dep)
+                    stack.append(iter(self.depends[dep]))
+        return found
+
+
+class ManifestIndex(PersistedIndex):
+    """On-disk index of the ``__manifest__.py`` files of all modules.
+
+    Manifests are read with ``ast.literal_eval`` on a thread pool and kept
+    per file while its mtime is unchanged.
+    """
+    FILE = 'manifests.json'
+    FIELDS = ('manifests',)
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        workers: int | None = None,
+        storage: Storage | None = None,
+    ):
+        super().__init__(path)
+        self.workers = scan_workers() if workers is None else workers
+        self.storage = storage or DiskStorage()
+        # manifest path -> {'mtime', 'depends', 'version'}
+        self.manifests: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def default(
+        cls, workers: int | None = None, storage: Storage | None = None
+    ) -> 'ManifestIndex':
+        return cls(cls.cache_file(storage), workers=workers, storage=storage)
+
+    # ---------- lookups ----------
+
+    def graph(self, modules: list[Path]) -> ModuleGraph:
+        """Graph of ``modules``, the first module of a name wins like in
+        odoo's addons_path lookup."""
+        self._load()
+
+        if self.workers <= 1 or len(modules) < 2:
+            entries = [self._manifest(m) for m in modules]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                entries = list(pool.map(self._manifest, modules))
+
+        depends = {}
+        for module, entry in zip(modules, entries):
+            if entry is not None:
+                depends.setdefault(module.name, entry['depends'])
+        return ModuleGraph(depends)
+
+    def _manifest(self, module: Path) -> dict | None:
+        path = module / '__manifest__.py'
+        mtime = self.storage.mtime(path)
+        if mtime is None:
+            return None
+
+        entry = self.manifests.get(str(path))
+        if entry is not None and entry['mtime'] == mtime:
+            return entry
+
+        entry = {'mtime': mtime, **read_manifest(self.storage, path)}
+        with self.lock:
+            self.manifests[str(path)] = entry
+            self.dirty = True
+        return entry
+
+
+def read_manifest(storage: Storage, path: Path) -> dict:
+    """``depends`` and ``version`` of a manifest, empty when unreadable."""
+    try:
+        data = ast.literal_eval(storage.read_text(path))
+        count('ast_parse')
+    except (OSError, ValueError, SyntaxError):
+        data = None
+    if not isinstance(data, dict):
+        data = {}
+
+    depends = data.get('depends')
+    return {
+        'depends': [d for d in depends if isinstance(d, str)]
+        if isinstance(depends, (list, tuple)) else [],
+        'version': str(data.get('version', '')),
+    }
@@ -0,0 +1,147 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+
+from .cache import PersistedIndex
+from .discovery import module_files, scan_workers
+from .stats import count
+from .storage import DiskStorage, Storage
+
+
+DEFAULT_SEQUENCE = 10
+
+
+@dataclass(slots=True)
+class MenuEntry:
+    """A ``<menuitem>`` of some module, ids are full ``module.xml_id``."""
+    id: str
+    parent: str | None
+    sequence: int
+    name: str | None
+    file: str
+
+
+class MenuIndex(PersistedIndex):
+    """On-disk index of the ``<menuitem>`` records of all modules.
+
+    Directory listings are reused while the directory mtime is unchanged,
+    xml files are re-parsed only when their own mtime changes. Modules are
+    scanned on a thread pool. The cache file is read on first use, so runs
+    that never look at menus don't pay for it.
+    """
+    FILE = 'menus.json'
+    FIELDS = ('dirs', 'files')
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        workers: int | None = None,
+        storage: Storage | None = None,
+    ):
+        super().__init__(path)
+        self.workers = scan_workers() if workers is None else workers
+        self.storage = storage or DiskStorage()
+        # dir -> {'mtime', 'dirs', 'files'}, xml file -> {'mtime', 'menus'}
+        self.dirs: dict[str, dict] = {}
+        self.files: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def default(
+        cls, workers: int | None = None, storage: Storage | None = None
+    ) -> 'MenuIndex':
+        return cls(cls.cache_file(storage), workers=workers, storage=storage)
+
+    # ---------- lookups ----------
+
+    def menus(self, modules: list[Path]) -> dict[str, MenuEntry]:
+        """Menus of ``modules`` by xml id, the first definition of an id wins."""
+        self._load()
+
+        if self.workers <= 1 or len(modules) < 2:
+            results = [self._module_menus(m) for m in modules]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(self._module_menus, modules))
+
+        out = {}
+        for entries in results:
+            for entry in entries:
+                out.setdefault(entry.id, entry)
+        return out
+
+    def _module_menus(self, module: Path) -> list[MenuEntry]:
+        out = []
+        for file in self._xml_files(module):
+            rows = self._file_menus(Path(file), module.name)
+            out.extend(MenuEntry(*row, file=file) for row in rows)
+        return out
+
+    def _xml_files(self, module: Path) -> list[str]:
+        files, fresh = module_files(module, '.xml', self.storage, self.dirs)
+        if fresh:
+            with self.lock:
+                self.dirs.update(fresh)
+                self.dirty = True
+        return files
+
+    def _file_menus(self, path: Path, module: str) -> list[list]:
+        mtime = self.storage.mtime(path)
+        entry = self.files.get(str(path))
+        if entry is not None and entry['mtime'] == mtime:
+            return entry['menus']
+
+        try:
+            menus = read_menus(self.storage.read_bytes(path), module)
+        except OSError:
+            menus = []
+        with self.lock:
+            self.files[str(path)] = {'mtime': mtime, 'menus': menus}
+            self.dirty = True
+        return menus
+
+
+def read_menus(data: bytes, module: str) -> list[list]:
+    """``[id, parent, sequence, name]`` of every menuitem in an xml file."""
+    if b'<menuitem' not in data:
+        return []
+
+    from lxml import etree as ET
+
+    count('xml_parse')
+    menus = []
+    events = ET.iterparse(BytesIO(data), events=('start',), tag='menuitem')
+    try:
+        for _, el in events:
+            menu_id = el.get('id')
+            if not menu_id:
+                continue
+
+            parent = el.get('parent')
+            if parent is None:
+                outer = el.getparent()
+                if outer is not None and outer.tag == 'menuitem':
+                    parent = outer.get('id')
+
+            try:
+                sequence = int(el.get('sequence', DEFAULT_SEQUENCE))
+            except ValueError:
+                sequence = DEFAULT_SEQUENCE
+
+            menus.append([
+                qualify(menu_id, module),
+                qualify(parent, module) if parent else None,
+                sequence,
+                el.get('name'),
+            ])
+    except ET.XMLSyntaxError:
+        # keep what was read before the broken part
+        pass
+    return menus
+
+
+def qualify(xml_id: str, module: str) -> str:
+    return xml_id if '.' in xml_id else f'{module}.{xml_id}'
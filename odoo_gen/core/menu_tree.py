@@ -1,47 +1,149 @@
-from dataclasses import dataclass, field
+from io import BytesIO
 from typing import Optional
 from pathlib import Path
 from lxml import etree as ET
 
+from .menu_index import DEFAULT_SEQUENCE, MenuEntry
+from .stats import count
+from .storage import DiskStorage, Storage
+
 
-@dataclass
 class MenuNode:
-    id: str
-    attrs: dict
-    parent: Optional['MenuNode'] = None
-    parent_id: Optional[str] = None
-    children: list['MenuNode'] = field(default_factory=list)
-    el: Optional[ET._Element] = None
-    comments_before: list[ET._Comment] = field(default_factory=list)
+    """Menu item with cached depth and sibling positions.
+
+    ``children`` must only be changed through ``insert``/``append``/``remove``
+    so that the caches stay valid.
+    """
+    __slots__ = (
+        'id', 'attrs', 'parent', 'parent_id', 'children', 'el',
+        'comments_before', 'linked', '_depth', '_positions',
+    )
 
-    def index(self, node: 'MenuNode'):
-        return self.children.index(node)
+    def __init__(
+        self,
+        id: str,
+        attrs: dict,
+        parent: Optional['MenuNode'] = None,
+        parent_id: Optional[str] = None,
+        children: list['MenuNode'] | None = None,
+        el: Optional[ET._Element] = None,
+        comments_before: list | None = None,
+        linked: bool = False,
+    ):
+        self.id = id
+        self.attrs = attrs
+        self.parent = parent
+        self.parent_id = parent_id
+        self.children = children if children is not None else []
+        self.el = el
+        self.comments_before = comments_before if comments_before is not None else []
+        # a menu of another file added by ``MenuTree.link``, never written
+        self.linked = linked
+        self._depth: int | None = None
+        # id(child) -> index in children, rebuilt lazily after changes
+        self._positions: dict[int, int] | None = None
+
+    def index(self, node: 'MenuNode') -> int:
+        if self._positions is None:
+            self._positions = {id(c): i for i, c in enumerate(self.children)}
+        try:
+            return self._positions[id(node)]
+        except KeyError:
+            raise ValueError(f'{node!r} is not a child of {self!r}')
+
+    @property
+    def position(self) -> int:
+        return self.parent.index(self) if self.parent else 0
 
     def insert(self, index: int, node: 'MenuNode'):
-        node.parent = self
+        self._attach(node)
         self.children.insert(index, node)
-        self._recompute_seq()
+        self._positions = None
+        self._fit_sequence(self.index(node))
 
-    def remove(self, node):
-        if node in self.children:
-            self.children.remove(node)
-            node.parent = None
+    def append(self, node: 'MenuNode'):
+        self._attach(node)
+        self.children.append(node)
+        if self._positions is not None:
+            self._positions[id(node)] = len(self.children) - 1
 
-    def _recompute_seq(self):
-        seq = 10
-        for node in self.children:
-            node.attrs['sequence'] = str(seq)
-            seq += 10
+    def remove(self, node):
+        try:
+            i = self.index(node)
+        except ValueError:
+            return
+        del self.children[i]
+        self._positions = None
+        node.parent = None
+        node._invalidate_depth()
+        if node.el is not None:
+            _detach(node.el)
+
+    def sort_children(self):
+        self.children.sort(key=lambda n: n.sequence)
+        self._positions = None
+
+    def _attach(self, node: 'MenuNode'):
+        node.parent = self
+        node._invalidate_depth()
+
+    def _invalidate_depth(self):
+        stack = [self]
+        while stack:
+            n = stack.pop()
+            n._depth = None
+            stack.extend(n.children)
+
+    def _fit_sequence(self, index: int):
+        """Give the child at ``index`` a sequence between its neighbours.
+
+        Siblings are renumbered only when there is no gap, and only as far
+        as needed, so a patched file changes as few attributes as possible.
+        Linked siblings live in other files and keep their sequence: when
+        one is in the way the child moves after it.
+        """
+        children = self.children
+        lo = children[index - 1].sequence if index else None
+        nxt = children[index + 1] if index + 1 < len(children) else None
+
+        if nxt is None:
+            seq = lo + DEFAULT_SEQUENCE if lo is not None else DEFAULT_SEQUENCE
+        elif nxt.sequence - (lo if lo is not None else -1) > 1:
+            lo = lo if lo is not None else -1
+            seq = lo + (nxt.sequence - lo) // 2
+        else:
+            seq = lo + 1 if lo is not None else nxt.sequence
+
+        # push the following siblings up until there is room again
+        pushed = []
+        for i, node in enumerate(children[index + 1:], index + 1):
+            if node.sequence > seq + len(pushed):
+                break
+            if node.linked:
+                children.insert(i, children.pop(index))
+                self._positions = None
+                return self._fit_sequence(i)
+            pushed.append(node)
+
+        children[index].sequence = seq
+        for node in pushed:
+            seq += 1
+            node.sequence = seq
 
     @property
     def sequence(self) -> int:
-        return int(self.attrs.get("sequence", 0))
+        # menuitems without a sequence get the ir.ui.menu default
+        return int(self.attrs.get("sequence", DEFAULT_SEQUENCE))
+
+    @sequence.setter
+    def sequence(self, value: int):
+        self.attrs['sequence'] = str(value)
 
     @property
     def depth(self) -> int:
-        if self.parent:
-            return self.parent.depth + 1
-        return 0
+        if self._depth is None:
+            self._depth = self.parent.depth + 1 if self.parent else 0
+        return self._depth
 
     def __str__(self):
         name = self.__repr__()
@@ -63,54 +165,195 @@ class MenuTree:
     def __init__(
         self,
         path: Path,
-        remove_blank_text=True,
-        remove_comments=False
+        remove_blank_text=False,
+        remove_comments=False,
+        storage: Storage | None = None,
     ):
-        parser = ET.XMLParser(
+        data = (storage or DiskStorage()).read_bytes(path)
+        self._load(data, remove_blank_text, remove_comments)
+
+    @classmethod
+    def parse(cls, data: bytes) -> 'MenuTree':
+        self = cls.__new__(cls)
+        self._load(data)
+        return self
+
+    def _load(self, data: bytes, remove_blank_text=False, remove_comments=False):
+        count('xml_parse')
+        # only menuitems and comments come up to python, the rest of the
+        # document stays in libxml2
+        events = ET.iterparse(
+            BytesIO(data),
+            events=('start', 'comment'),
+            tag=('menuitem', ET.Comment),
             remove_blank_text=remove_blank_text,
-            remove_comments=remove_comments
+            remove_comments=remove_comments,
         )
-        self.xml_tree = ET.parse(path, parser)
-        self.root = self.xml_tree.getroot()
 
         self.nodes_by_id = {}
         self.nodes = []
+        self.module = None
 
-        self._parse()
+        self._parse(events)
+        self.root = events.root
+        self.xml_tree = self.root.getroottree()
+        self.prolog, self.epilog = _outer_text(data, self.root.tag)
 
     @classmethod
     def empty(cls):
         self = cls.__new__(cls)
         self.xml_tree = None
+        self.prolog = self.epilog = b''
         self.root = ET.Element("odoo")
         self.nodes_by_id = {}
         self.nodes = []
+        self.module = None
         return self
 
     def is_empty(self) -> bool:
         return not self.nodes
 
+    # ---------- other modules ----------
+    def link(self, menus: dict[str, MenuEntry], module: str) -> None:
+        """Merge the menus of other modules (and other files of this one)
+        into the tree, so new items can go under them.
+
+        They are added without an element and are never written; menus of
+        this file hanging under them are moved below their parent.
+        """
+        self.module = module
+        added = []
+        for entry in menus.values():
+            key = self._key(entry.id)
+            if key in self.nodes_by_id:
+                continue
+            attrs = {'id': key, 'name': entry.name or key}
+            attrs['sequence'] = str(entry.sequence)
+            node = MenuNode(
+                id=key,
+                attrs=attrs,
+                parent_id=self._key(entry.parent) if entry.parent else None,
+                linked=True,
+            )
+            self.nodes_by_id[key] = node
+            added.append(node)
+
+        if not added:
+            return
+
+        roots = []
+        for node in self.nodes + added:
+            parent = self.get(node.parent_id) if node.parent_id else None
+            if parent is None or _is_ancestor(node, parent):
+                roots.append(node)
+            else:
+                parent.append(node)
+
+        for node in self.nodes_by_id.values():
+            if len(node.children) > 1:
+                node.sort_children()
+        roots.sort(key=lambda n: n.sequence)
+        self.nodes = roots
+
+    def get(self, xml_id: str) -> MenuNode | None:
+        """Node by id, ids of this module may be given with its prefix."""
+        return self.nodes_by_id.get(self._key(xml_id))
+
+    def _key(self, xml_id: str) -> str:
+        prefix = f'{self.module}.' if self.module else None
+        if prefix and xml_id.startswith(prefix):
+            return xml_id[len(prefix):]
+        return xml_id
+
     def add_root(self, node: MenuNode):
         self.nodes.append(node)
+        if self.xml_tree is not None:
+            self._place(node)
 
     def add_child(self, parent: MenuNode, node: MenuNode):
-        parent.children.append(node)
-        node.parent = parent
+        parent.append(node)
 
     def insert(self, parent: MenuNode, index: int, node: MenuNode):
         parent.insert(index, node)
+        if self.xml_tree is not None:
+            self._place(node)
+
+    # ---------- in-place patching ----------
+    def _place(self, node: MenuNode):
+        """Put a ``<menuitem>`` for ``node`` into the parsed document,
+        next to its closest sibling, indented like it."""
+        parent = node.parent
+        if parent is None:
+            container = self._records()
+            for c in node.comments_before:
+                _append(container, ET.Comment(c if isinstance(c, str) else c.text))
+            _append(container, ET.Element('menuitem', node.attrs))
+            self._bind(node, container[-1])
+            return
+
+        i = parent.index(node)
+        prev = parent.children[i - 1] if i else None
+        nxt = parent.children[i + 1] if i + 1 < len(parent.children) else None
+
+        if prev is not None and prev.el is not None:
+            anchor, after = prev.el, True
+        elif nxt is not None and nxt.el is not None:
+            anchor, after = nxt.el, False
+            first = nxt.comments_before[0] if nxt.comments_before else None
+            if isinstance(first, ET._Comment) and first.getparent() is anchor.getparent():
+                anchor = first
+        elif parent.el is not None:
+            anchor, after = parent.el, True
+        else:
+            anchor, after = None, True
+
+        container = anchor.getparent() if anchor is not None else self._records()
+        nested = (
+            container.tag == 'menuitem' and container.get('id') == parent.id
+        )
 
-    def _parse(self) -> None:
+        attrs = {'id': node.id}
+        if 'name' in node.attrs:
+            attrs['name'] = node.attrs['name']
+        if not nested:
+            attrs['parent'] = parent.id
+        attrs.update(node.attrs)
+        el = ET.Element('menuitem', attrs)
+
+        if anchor is None:
+            _append(container, el)
+        elif after:
+            _insert_after(anchor, el)
+        else:
+            _insert_before(anchor, el)
+
+        self._bind(node, el)
+
+    def _bind(self, node: MenuNode, el: ET._Element):
+        node.el = el
+        node.attrs = el.attrib
+        self.nodes_by_id.setdefault(node.id, node)
+
+    def _records(self) -> ET._Element:
+        data = self.root.find('data')
+        return data if data is not None else self.root
+
+    def dump(self) -> str:
+        """The file content: the patched original document when the tree
+        was parsed from a file, a freshly built one otherwise."""
+        if self.xml_tree is None:
+            return self.serialize()
+        body = ET.tostring(self.root, encoding='utf-8', with_tail=False)
+        return (self.prolog + body + self.epilog).decode('utf-8')
+
+    def _parse(self, events) -> None:
         pending_comments = []
 
-        for el in self.root.iter():
+        for _, el in events:
             if isinstance(el, ET._Comment):
                 pending_comments.append(el)
                 continue
 
-            if el.tag != "menuitem":
-                continue
-
             menu_id = el.get("id")
             if not menu_id:
                 continue
@@ -144,14 +387,13 @@ class MenuTree:
     def _build_tree(self):
         for node in self.nodes_by_id.values():
             if node.parent_id and node.parent_id in self.nodes_by_id:
-                parent = self.nodes_by_id[node.parent_id]
-                node.parent = parent
-                parent.children.append(node)
+                self.nodes_by_id[node.parent_id].append(node)
             else:
                 self.nodes.append(node)
 
         for node in self.nodes_by_id.values():
-            node.children.sort(key=lambda n: n.sequence)
+            if len(node.children) > 1:
+                node.sort_children()
 
         self.nodes.sort(key=lambda n: n.sequence)
 
@@ -199,3 +441,94 @@ class MenuTree:
     def __iter__(self):
         for el in self.getchildren():
             yield el
+
+
+def _is_ancestor(node: MenuNode, of: MenuNode) -> bool:
+    """Whether ``node`` is ``of`` or above it, i.e. linking would loop."""
+    p = of
+    while p is not None:
+        if p is node:
+            return True
+        p = p.parent
+    return False
+
+
+# ---------- lxml helpers ----------
+
+def _outer_text(data: bytes, tag: str) -> tuple[bytes, bytes]:
+    """The bytes before and after the root element: declaration, comments
+    and the whitespace between them, which lxml doesn't keep as written,
+    so a patched file round-trips byte for byte."""
+    start = _root_start(data)
+    if start is None:
+        return b'', b''
+    end = data.rfind(b'</' + tag.encode())
+    if end > start:
+        stop = data.index(b'>', end) + 1
+    else:
+        # <odoo/>
+        stop = data.index(b'>', start) + 1
+    return data[:start], data[stop:]
+
+
+def _root_start(data: bytes) -> int | None:
+    """Offset of the root start tag, past declarations, PIs and comments."""
+    i = 0
+    while (i := data.find(b'<', i)) != -1:
+        if data.startswith(b'<?', i):
+            i = data.index(b'?>', i) + 2
+        elif data.startswith(b'<!--', i):
+            i = data.index(b'-->', i) + 3
+        elif data.startswith(b'<!', i):
+            # doctype, an internal subset ends with ]>
+            close = b']>' if data.find(b'[', i, data.find(b'>', i)) != -1 else b'>'
+            i = data.index(close, i) + len(close)
+        else:
+            return i
+    return None
+
+
+def _indent(el: ET._Element) -> str | None:
+    """Line break and indentation in front of ``el``, blank lines dropped."""
+    prev = el.getprevious()
+    parent = el.getparent()
+    ws = prev.tail if prev is not None else parent.text if parent is not None else None
+    if ws and '\n' in ws:
+        return '\n' + ws.rsplit('\n', 1)[1]
+    return ws
+
+
+def _insert_after(anchor: ET._Element, el: ET._Element):
+    el.tail = anchor.tail
+    anchor.tail = _indent(anchor)
+    anchor.addnext(el)
+
+
+def _insert_before(anchor: ET._Element, el: ET._Element):
+    el.tail = _indent(anchor)
+    anchor.addprevious(el)
+
+
+def _append(container: ET._Element, el: ET._Element):
+    last = container[-1] if len(container) else None
+    if last is not None:
+        _insert_after(last, el)
+        return
+    outer = _indent(container) or '\n'
+    container.text = outer + '    '
+    el.tail = outer
+    container.append(el)
+
+
+def _detach(el: ET._Element):
+    parent = el.getparent()
+    if parent is None:
+        return
+    if el.getnext() is None:
+        # the closing tag keeps its indentation
+        prev = el.getprevious()
+        if prev is not None:
+            prev.tail = el.tail
+        else:
+            parent.text = el.tail
+    parent.remove(el)
@@ -0,0 +1,207 @@
+import ast
+import difflib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .cache import PersistedIndex
+from .discovery import module_files, scan_workers
+from .stats import count
+from .storage import DiskStorage, Storage
+
+
+@dataclass(slots=True)
+class ModelEntry:
+    """An odoo model class: defines ``model`` or, with ``extends``, adds to it."""
+    model: str
+    extends: bool
+    inherit: list[str]
+    description: str | None
+    fields: list[list[str]]
+    class_name: str
+    module: str
+    file: str
+    line: int
+
+
+@dataclass(slots=True)
+class ModelCatalog:
+    """Model classes of the project by model name."""
+    entries: dict[str, list[ModelEntry]] = field(default_factory=dict)
+
+    def __contains__(self, model: str) -> bool:
+        return self.definition(model) is not None
+
+    def definition(self, model: str) -> ModelEntry | None:
+        for entry in self.entries.get(model, ()):
+            if not entry.extends:
+                return entry
+        return None
+
+    def extensions(self, model: str) -> list[ModelEntry]:
+        return [e for e in self.entries.get(model, ()) if e.extends]
+
+    def fields(self, model: str) -> dict[str, str]:
+        """Field name -> type over the definition and all extensions."""
+        out = {}
+        for entry in self.entries.get(model, ()):
+            out.update(entry.fields)
+        return out
+
+    def suggest(self, model: str, n: int = 5, cutoff: float = 0.6) -> list[str]:
+        names = [m for m in self.entries if m in self]
+        return difflib.get_close_matches(model, names, n=n, cutoff=cutoff)
+
+
+class ModelIndex(PersistedIndex):
+    """On-disk index of the model classes of all modules.
+
+    Python files are parsed with ``ast`` (nothing is imported) and kept per
+    file while its mtime is unchanged; only changed files are parsed again.
+    """
+    FILE = 'models.json'
+    FIELDS = ('dirs', 'files')
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        workers: int | None = None,
+        storage: Storage | None = None,
+    ):
+        super().__init__(path)
+        self.workers = scan_workers() if workers is None else workers
+        self.storage = storage or DiskStorage()
+        # dir -> {'mtime', 'dirs', 'files'}, py file -> {'mtime', 'models'}
+        self.dirs: dict[str, dict] = {}
+        self.files: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def default(
+        cls, workers: int | None = None, storage: Storage | None = None
+    ) -> 'ModelIndex':
+        return cls(cls.cache_file(storage), workers=workers, storage=storage)
+
+    # ---------- lookups ----------
+
+    def catalog(self, modules: list[Path]) -> ModelCatalog:
+        self._load()
+
+        if self.workers <= 1 or len(modules) < 2:
+            results = [self._module_models(m) for m in modules]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(self._module_models, modules))
+
+        catalog = ModelCatalog()
+        for entries in results:
+            for entry in entries:
+                catalog.entries.setdefault(entry.model, []).append(entry)
+        return catalog
+
+    def _module_models(self, module: Path) -> list[ModelEntry]:
+        files, fresh = module_files(module, '.py', self.storage, self.dirs)
+        if fresh:
+            with self.lock:
+                self.dirs.update(fresh)
+                self.dirty = True
+
+        out = []
+        for file in files:
+            for *row, line in self._file_models(Path(file)):
+                out.append(ModelEntry(*row, module=module.name, file=file, line=line))
+        return out
+
+    def _file_models(self, path: Path) -> list[list]:
+        mtime = self.storage.mtime(path)
+        entry = self.files.get(str(path))
+        if entry is not None and entry['mtime'] == mtime:
+            return entry['models']
+
+        try:
+            models = read_models(self.storage.read_text(path))
+        except (OSError, UnicodeDecodeError):
+            models = []
+        with self.lock:
+            self.files[str(path)] = {'mtime': mtime, 'models': models}
+            self.dirty = True
+        return models
+
+
+def read_models(source: str) -> list[list]:
+    """``[model, extends, inherit, description, fields, class_name, line]``
+    of every model class in a python file."""
+    if '_name' not in source and '_inherit' not in source:
+        return []
+    try:
+        tree = ast.parse(source)
+        count('ast_parse')
+    except (SyntaxError, ValueError):
+        return []
+
+    out = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        attrs = {}
+        fields = []
+        for stmt in node.body:
+            if not isinstance(stmt, ast.Assign) or len(stmt.targets) != 1:
+                continue
+            target = stmt.targets[0]
+            if not isinstance(target, ast.Name):
+                continue
+            if target.id in ('_name', '_inherit', '_description'):
+                attrs[target.id] = _literal(stmt.value)
+                continue
+            kind = _field_type(stmt.value)
+            if kind:
+                fields.append([target.id, kind])
+
+        name = attrs.get('_name')
+        inherit = attrs.get('_inherit')
+        if isinstance(inherit, str):
+            inherit = [inherit]
+        elif isinstance(inherit, (list, tuple)):
+            inherit = [i for i in inherit if isinstance(i, str)]
+        else:
+            inherit = []
+        if not isinstance(name, str):
+            if not inherit:
+                continue
+            # without _name the class extends its first parent
+            name = inherit[0]
+
+        description = attrs.get('_description')
+        out.append([
+            name,
+            name in inherit,
+            inherit,
+            description if isinstance(description, str) else None,
+            fields,
+            node.name,
+            node.lineno,
+        ])
+    return out
+
+
+def _literal(node: ast.expr):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, RecursionError):
+        return None
+
+
+def _field_type(node: ast.expr) -> str | None:
+    """``Char`` for ``fields.Char(...)``."""
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == 'fields'
+    ):
+        return node.func.attr
+    return None
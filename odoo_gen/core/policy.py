@@ -0,0 +1,96 @@
+import tomllib
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+from ..errors import OdooGenError
+from .context import ProjectContext
+
+
+@dataclass(slots=True)
+class Policy:
+    """Answers to resolver signals for runs without a TTY.
+
+    Loaded from a TOML file and/or CLI flags::
+
+        addons = "custom_addons"
+        module = "my_module"
+        create_module = true
+
+        [menu]
+        parent = "my_module_root"
+        index = "end"
+    """
+    addons: Path | None = None
+    create_addons: bool = False
+    module: str | None = None
+    create_module: bool = False
+    menu_parent: str | None = None
+    menu_index: int | None = None   # None -> append at the end
+
+    @classmethod
+    def load(cls, path: Path) -> 'Policy':
+        try:
+            data = tomllib.loads(path.read_text())
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            raise OdooGenError(f'cannot read policy {path}: {e}')
+
+        menu = data.pop('menu', {})
+        policy = cls(
+            **{f.name: data[f.name] for f in fields(cls) if f.name in data}
+        )
+        policy.menu_parent = menu.get('parent', policy.menu_parent)
+        policy.menu_index = cls.parse_index(menu.get('index', policy.menu_index))
+
+        if policy.addons is not None:
+            # relative to the policy file, not to the cwd of the run
+            policy.addons = (path.parent / policy.addons).resolve()
+        return policy
+
+    @staticmethod
+    def parse_index(value) -> int | None:
+        if value is None or value == 'end':
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise OdooGenError(f'invalid menu index: {value!r}')
+
+    def merge(self, **overrides) -> 'Policy':
+        """Return a copy with non-empty overrides (CLI flags) applied."""
+        values = {f.name: getattr(self, f.name) for f in fields(self)}
+        values.update({
+            k: v for k, v in overrides.items()
+            if v is not None and v is not False
+        })
+        return Policy(**values)
+
+    def apply(self, ctx: ProjectContext) -> None:
+        """Pre-seed the context so the resolver doesn't emit known signals."""
+        if self.addons is not None and not ctx.has_addons:
+            ctx.addons_path = self.addons
+            ctx.create_addons = self.create_addons and not self.addons.exists()
+
+        if self.module and not ctx.has_module:
+            # the resolver looks the requested module up once addons are known
+            ctx.module_name = self.module
+            if ctx.has_addons:
+                self.select_module(ctx, ctx.addons_path / self.module)
+
+        if self.menu_parent:
+            # lets the resolver place menus even when this module has none
+            ctx.menu_parent_id = self.menu_parent
+
+    def select_module(self, ctx: ProjectContext, path: Path) -> bool:
+        if (path / '__manifest__.py').exists():
+            ctx.module_path = path
+            ctx.module_name = path.name
+            return True
+
+        if self.create_module:
+            ctx.module_path = path
+            ctx.module_name = path.name
+            ctx.create_module = True
+            return True
+
+        return False
@@ -1,7 +1,8 @@
-from ..errors import AddonsPathNotFound
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..errors import AddonsPathNotFound, DuplicateModel, ModelNotFound, SpecError
 from .context import ProjectContext
-from ..controllers import ControllerChain
-from .menu_tree import MenuTree, MenuNode
 from ..enums import MenuState
 from .signals import (
     Signal,
@@ -14,18 +15,51 @@ from .signals import (
 )
 from .types import Result, Ok, Err
 from .manifest import ManifestEditor
+from .discovery import conf_addons_paths
+from .index import DiscoveryIndex
+from .manifest_index import ManifestIndex
+from .menu_index import MenuIndex
+from .model_index import ModelIndex
+from .storage import DiskStorage, Storage
+
+
+if TYPE_CHECKING:
+    from ..controllers import ControllerChain
+    from .menu_tree import MenuNode
+
+
+# closer than this to a model of the project is a typo, not a model of
+# odoo outside the project
+TYPO_CUTOFF = 0.85
+
+
+EMPTY_MENU = b'<?xml version="1.0" encoding="utf-8"?>\n<odoo>\n</odoo>\n'
 
 
 class ContextResolver:
     ADDONS_DIRS = {'addons', 'custom_addons'}
     MAX_ROOT_DEPTH = 4
 
-    def __init__(self, controllers: ControllerChain | None = None):
+    def __init__(
+        self,
+        controllers: 'ControllerChain | None' = None,
+        index: DiscoveryIndex | None = None,
+        storage: Storage | None = None,
+        menus: MenuIndex | None = None,
+        manifests: ManifestIndex | None = None,
+        models: ModelIndex | None = None,
+    ):
         self.controllers = controllers
+        self.storage = storage or DiskStorage()
+        self.index = index or DiscoveryIndex(None, storage=self.storage)
+        self.menus = menus or MenuIndex(None, storage=self.storage)
+        self.manifests = manifests or ManifestIndex(None, storage=self.storage)
+        self.models = models or ModelIndex(None, storage=self.storage)
         self.steps = [
             '_resolve_addons',
             '_resolve_missing_module_intent',
             '_resolve_module',
+            '_resolve_models',
             '_resolve_menu',
             '_resolve_manifest',
             '_validate'
@@ -37,12 +71,24 @@ class ContextResolver:
             if not step:
                 continue
 
-            res = step(ctx)
+            self._step(step_name, ctx)
+            try:
+                res = step(ctx)
+            finally:
+                self._step_done(step_name, ctx)
             if isinstance(res, Err):
+                self._save()
                 return res
 
+        self._save()
         return Ok(ctx)
 
+    def _save(self):
+        self.index.save()
+        self.menus.save()
+        self.manifests.save()
+        self.models.save()
+
     def _resolve_addons(self, ctx: ProjectContext):
         
         if ctx.has_addons:
@@ -52,37 +98,17 @@ class ContextResolver:
             ctx.addons_path = ctx.cwd / 'addons'
             return
 
-        p = ctx.cwd
-        depth = 0
-        addons_candidates = []
-
-        while p != p.parent and depth < self.MAX_ROOT_DEPTH:
-            # inside module
-            if (p / "__manifest__.py").exists():
-                ctx.module_path = p
-                ctx.module_name = p.name
-                ctx.root = p.parent.parent
-                addons_candidates = [p.parent]
-                break
-
-            # inside addons
-            if p.name in self.ADDONS_DIRS:
-                ctx.root = p.parent
-                addons_candidates = [p]
-                break
-
-            # root containing addons dirs
-            found = [
-                p / name for name in self.ADDONS_DIRS
-                if (p / name).exists()
-            ]
-            if found:
-                ctx.root = p
-                addons_candidates = found
-                break
-
-            p = p.parent
-            depth += 1
+        info = self.index.find_root(
+            ctx.cwd, self.ADDONS_DIRS, self.MAX_ROOT_DEPTH
+        )
+        if info.module_path is not None and ctx.module_name in (
+            None, info.module_path.name
+        ):
+            ctx.module_path = info.module_path
+            ctx.module_name = info.module_path.name
+        ctx.root = info.root
+        addons_candidates = info.candidates
+        ctx.addons_candidates = addons_candidates
 
         if not addons_candidates:
             return Err(RequireAddonsPath())
@@ -90,6 +116,9 @@ class ContextResolver:
         if len(addons_candidates) == 1:  # todo auto in signals?
             ctx.addons_path = addons_candidates[0]
         else:
+            # scan all candidates in one concurrent pass, the chosen one is
+            # then served from the index
+            self.index.modules_many(addons_candidates)
             return Err(ChooseAddons(paths=addons_candidates))
 
     def _resolve_missing_module_intent(self, ctx: ProjectContext):
@@ -98,7 +127,7 @@ class ContextResolver:
 
         p = ctx.cwd
 
-        if p.exists():
+        if self.storage.exists(p):
             return
 
         if ctx.addons_path is None:
@@ -115,12 +144,15 @@ class ContextResolver:
         if ctx.addons_path is None:
             raise AddonsPathNotFound 
 
-        modules = []
-        if ctx.addons_path.exists():
-            modules = [
-                p for p in ctx.addons_path.iterdir()
-                if p.is_dir() and (p / "__manifest__.py").exists()
-            ]
+        if ctx.module_name:
+            # module requested by name (--module)
+            path = ctx.addons_path / ctx.module_name
+            if not self.storage.exists(path / '__manifest__.py'):
+                return Err(CreateModule(path=path))
+            ctx.module_path = path
+            return
+
+        modules = self.index.modules(ctx.addons_path)
 
         if not modules:
             return Err(RequireModulePath())
@@ -131,35 +163,115 @@ class ContextResolver:
             return
         return Err(ChooseModule(modules=modules))
 
+    def _resolve_models(self, ctx: ProjectContext):
+        if ctx.inherit_modules is not None:
+            return Ok(None)
+
+        catalog = self.models.catalog(self._project_modules(ctx))
+        owners = []
+        unindexed = []
+        for model in ctx.all_models:
+            model_ctx = ctx.for_model(model)
+            entry = catalog.definition(model_ctx.model_name)
+
+            if ctx.inherit:
+                if entry is not None:
+                    owners.append(entry.module)
+                elif catalog.suggest(model, cutoff=TYPO_CUTOFF):
+                    raise ModelNotFound(model, catalog.suggest(model))
+                else:
+                    # odoo itself is rarely on the addons paths of a project
+                    unindexed.append(model)
+            elif entry is not None and Path(entry.file) != model_ctx.model_path:
+                # the file of the model itself is handled by --force/--skip-existing
+                raise DuplicateModel(
+                    model_ctx.model_name, f'{entry.file}:{entry.line}'
+                )
+
+        local = {
+            model for model, entries in catalog.entries.items()
+            if any(e.module == ctx.module_name and not e.extends for e in entries)
+        }
+        if not ctx.inherit:
+            local.update(
+                ctx.for_model(m).model_name
+                for m in {*ctx.all_models, *(ctx.spec_models or ())}
+            )
+        ctx.local_models = local
+        ctx.unindexed_models = unindexed
+        self._check_relations(ctx)
+        ctx.inherit_modules = owners
+
+    def _check_relations(self, ctx: ProjectContext):
+        """Relations of the spec left without a module are typos or models
+        the spec doesn't have, odoo would not load the module."""
+        for spec in (ctx.specs or {}).values():
+            for f in spec.fields:
+                if f.relation and '.' not in ctx.relation(f.relation):
+                    raise SpecError(
+                        f'relation {f.relation!r} of {spec.model}.{f.name} '
+                        f'is not a model of the spec or of {ctx.module_name}'
+                    )
+
     def _resolve_menu(self, ctx: ProjectContext):
         if ctx.has_menu:
             return Ok(None)
 
         # insert node
         if ctx.menu_tree and ctx.menu_parent is not None:
-            ctx.menu_tree.insert(
-                parent=ctx.menu_parent,
-                index=ctx.menu_index,
-                node=self._menu_node(ctx)
-            )
+            index = ctx.menu_index
+            for model in ctx.all_models:
+                node = self._menu_node(ctx.for_model(model))
+                ctx.menu_tree.insert(parent=ctx.menu_parent, index=index, node=node)
+                # after the previous item, which may have moved past a
+                # menu of another module
+                index = ctx.menu_parent.index(node) + 1
             ctx.menu_state = MenuState.READY
             return Ok(ctx)
 
+        from .menu_tree import MenuTree
+
         # parse
+        tree = None
         path = ctx.menu_xml_path
-        if path and path.exists():
-            tree = MenuTree(path)
-            if not tree.is_empty():
-                ctx.menu_tree = tree
-                return Err(RequireMenuPlacement())
-
-        # new menu
-        self._create_default_menu(ctx)
+        if path and self.storage.exists(path):
+            tree = MenuTree(path, storage=self.storage)
+
+        # an explicit parent may be a menu of another module
+        if ctx.menu_parent_id or tree is not None and not tree.is_empty():
+            if tree is None:
+                tree = MenuTree.parse(EMPTY_MENU)
+            tree.link(self._other_menus(ctx), ctx.module_name)
+            ctx.menu_tree = tree
+            return Err(RequireMenuPlacement())
+
+        # new menu, in the existing file if there is one
+        self._create_default_menu(ctx, tree)
         ctx.menu_state = MenuState.READY
         return Ok(None)
 
-    def _create_default_menu(self, ctx: ProjectContext) -> None:
-        tree = MenuTree.empty()
+    def _other_menus(self, ctx: ProjectContext) -> dict:
+        """Menus of every module of the project, served from the index."""
+        return self.menus.menus(self._project_modules(ctx))
+
+    def _project_modules(self, ctx: ProjectContext) -> list[Path]:
+        """Modules of all addons dirs of the project, odoo.conf included."""
+        paths = list(ctx.addons_candidates or [])
+        if ctx.addons_path and ctx.addons_path not in paths:
+            paths.append(ctx.addons_path)
+        if ctx.root:
+            paths.extend(
+                p for p in conf_addons_paths(ctx.root, self.storage)
+                if p not in paths
+            )
+
+        modules = self.index.modules_many(paths)
+        return [m for p in paths for m in modules[p]]
+
+    def _create_default_menu(self, ctx: ProjectContext, tree=None) -> None:
+        from .menu_tree import MenuTree, MenuNode
+
+        tree = tree or MenuTree.empty()
         root_menu = MenuNode(
             id=f'{ctx.module_name}_root',
             attrs={
@@ -169,12 +281,15 @@ class ContextResolver:
             comments_before=['Top menu item']
         )
 
-        model_menu = self._menu_node(ctx, root_menu)
-        root_menu.insert(0, model_menu)
         tree.add_root(root_menu)
+        for index, model in enumerate(ctx.all_models):
+            model_menu = self._menu_node(ctx.for_model(model), root_menu)
+            tree.insert(root_menu, index, model_menu)
         ctx.menu_tree = tree
 
-    def _menu_node(self, ctx: ProjectContext, parent=None) -> MenuNode:
+    def _menu_node(self, ctx: ProjectContext, parent=None) -> 'MenuNode':
+        from .menu_tree import MenuNode
+
         return MenuNode(
             id=ctx.menu_id,
             attrs={
@@ -196,13 +311,42 @@ class ContextResolver:
         if self.controllers:
             self.controllers.on_step(name, ctx)
 
+    def _step_done(self, name: str, ctx: ProjectContext):
+        if self.controllers:
+            self.controllers.on_step_done(name, ctx)
+
     def _resolve_manifest(self, ctx: ProjectContext):
+        ctx.depends = self._missing_depends(ctx)
+
         path = ctx.manifest_path
-        if not path.exists():
+        if not self.storage.exists(path):
             return
 
-        ctx.manifest = ManifestEditor(path)
-        ctx.manifest.ensure_data_item(
-            f'views/{ctx.view_file_name}',
-            before="views/menu.xml",
-        )
+        ctx.manifest = ManifestEditor(path, self.storage)
+        for file_name in ctx.view_file_names:
+            ctx.manifest.ensure_data_item(
+                f'views/{file_name}',
+                before="views/menu.xml",
+            )
+        if ctx.depends:
+            ctx.manifest.ensure_depends(*ctx.depends)
+
+    def _required_modules(self, ctx: ProjectContext) -> list[str]:
+        """Modules the generated code refers to."""
+        required = list(ctx.inherit_modules or ())
+        parent = ctx.menu_parent
+        if parent is not None and '.' in parent.id:
+            # menu of another module
+            required.append(parent.id.split('.', 1)[0])
+        return list(dict.fromkeys(required))
+
+    def _missing_depends(self, ctx: ProjectContext) -> list[str]:
+        required = self._required_modules(ctx)
+        if not required:
+            return []
+
+        graph = self.manifests.graph(self._project_modules(ctx))
+        if ctx.module_name in graph:
+            return graph.missing(ctx.module_name, required)
+        # a new module depends on nothing yet
+        return [m for m in required if m not in ('base', ctx.module_name)]
@@ -0,0 +1,346 @@
+import csv
+import json
+import keyword
+
+from dataclasses import dataclass, field
+from itertools import groupby, islice
+from typing import Iterable, Iterator, TextIO
+
+from ..errors import SpecError
+
+
+FIELD_TYPES = {
+    name.lower(): name for name in (
+        'Char', 'Text', 'Html', 'Integer', 'Float', 'Monetary', 'Boolean',
+        'Date', 'Datetime', 'Binary', 'Image', 'Selection',
+        'Many2one', 'One2many', 'Many2many',
+    )
+}
+RELATIONAL = {'Many2one', 'One2many', 'Many2many'}
+# too wide or multi-valued for a list view
+NOT_IN_LIST = {'Text', 'Html', 'Binary', 'Image', 'One2many', 'Many2many'}
+
+# spreadsheet headers -> FieldSpec attributes
+ALIASES = {
+    'field': 'name',
+    'label': 'string',
+    'comodel': 'relation',
+    'comodel_name': 'relation',
+    'inverse_name': 'inverse',
+    'model_name': 'model',
+}
+TRUE = {'1', 'true', 'yes', 'y', 'x'}
+
+
+@dataclass(slots=True)
+class FieldSpec:
+    name: str
+    type: str
+    string: str | None = None
+    required: bool = False
+    readonly: bool = False
+    index: bool = False
+    relation: str | None = None
+    inverse: str | None = None
+    selection: list[tuple[str, str]] | None = None
+    help: str | None = None
+
+    @property
+    def in_list(self) -> bool:
+        return self.type not in NOT_IN_LIST
+
+    @property
+    def args(self) -> str:
+        """Arguments of the ``fields.X(...)`` call."""
+        args = []
+        if self.type in RELATIONAL:
+            args.append(_str(self.relation))
+            if self.type == 'One2many':
+                args.append(_str(self.inverse))
+        elif self.type == 'Selection':
+            args.append('[{}]'.format(', '.join(
+                f'({_str(k)}, {_str(v)})' for k, v in self.selection
+            )))
+
+        if self.string:
+            args.append(f'string={_str(self.string)}')
+        for flag in ('required', 'readonly', 'index'):
+            if getattr(self, flag):
+                args.append(f'{flag}=True')
+        if self.help:
+            args.append(f'help={_str(self.help)}')
+        return ', '.join(args)
+
+
+@dataclass(slots=True)
+class ModelSpec:
+    model: str
+    description: str | None = None
+    fields: list[FieldSpec] = field(default_factory=list)
+
+    @property
+    def field_names(self) -> set[str]:
+        return {f.name for f in self.fields}
+
+
+# ---------- reading ----------
+
+def iter_models(fp: TextIO, fmt: str) -> Iterator[ModelSpec]:
+    """Models of a field-level spec, one at a time.
+
+    Rows are read lazily and grouped while the model stays the same, so only
+    the model being built is held in memory. The rows of a model therefore
+    have to be contiguous, as they are in a spreadsheet sorted by model.
+    """
+    rows = _ROWS[fmt](fp)
+    seen = set()
+    for model, group in groupby(rows, key=lambda r: r[1].get('model')):
+        if model in seen:
+            where = next(group)[0]
+            raise SpecError(f'rows of model {model} are not contiguous', where)
+        seen.add(model)
+
+        spec = None
+        names = set()
+        for where, row in group:
+            if spec is None:
+                spec = _model(row, where)
+            fields = row.get('fields')
+            if fields is None:
+                fields = [row] if row.get('name') else []
+            elif not isinstance(fields, list):
+                raise SpecError('"fields" must be a list', where)
+
+            for data in fields:
+                spec_field = _field(data, where)
+                if spec_field.name in names:
+                    raise SpecError(
+                        f'duplicate field {model}.{spec_field.name}', where
+                    )
+                names.add(spec_field.name)
+                spec.fields.append(spec_field)
+        yield spec
+
+
+def model_names(fp: TextIO, fmt: str) -> set[str]:
+    """``_name`` of every model of a spec, without building its fields.
+
+    A first pass before batching: relations to models of later batches get
+    the module prefix just like relations within a batch.
+    """
+    return {
+        _model(row, where).model for where, row in _ROWS[fmt](fp)
+    }
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def format_of(filename: str) -> str:
+    suffix = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if suffix in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if suffix in ('yaml', 'yml'):
+        return 'yaml'
+    return 'json' if suffix == 'json' else 'csv'
+
+
+def _csv_rows(fp: TextIO):
+    reader = csv.reader(fp)
+    header = next(reader, None)
+    if header is None:
+        return
+    keys = [_key(h) for h in header]
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        row = {k: v.strip() for k, v in zip(keys, values) if v.strip()}
+        yield f'line {reader.line_num}', row
+
+
+def _jsonl_rows(fp: TextIO):
+    for lineno, line in enumerate(fp, 1):
+        if line.strip():
+            yield _object(line, f'line {lineno}')
+
+
+def _json_rows(fp: TextIO, chunk: int = 1 << 16):
+    """Elements of a top-level JSON array, decoded one by one."""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    n = 0
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = fp.read(chunk)
+        eof = not data
+        buf = buf[pos:] + data
+        pos = 0
+
+    def skip() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            fill()
+
+    if skip() != '[':
+        raise SpecError('expected a JSON array of fields or models')
+    pos += 1
+    first = True
+    while True:
+        char = skip()
+        if char == ']':
+            return
+        if not first:
+            if char != ',':
+                raise SpecError('expected "," or "]"', f'element {n}')
+            pos += 1
+            skip()
+        first = False
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise SpecError(f'invalid JSON: {e.msg}', f'element {n + 1}')
+                fill()
+        pos = end
+        n += 1
+        if not isinstance(value, dict):
+            raise SpecError('expected an object', f'element {n}')
+        yield f'element {n}', {_key(k): v for k, v in value.items()}
+
+
+def _object(text: str, where: str):
+    try:
+        value = json.loads(text)
+    except ValueError as e:
+        raise SpecError(f'invalid JSON: {e}', where)
+    if not isinstance(value, dict):
+        raise SpecError('expected an object', where)
+    return where, {_key(k): v for k, v in value.items()}
+
+
+def _yaml_rows(fp: TextIO):
+    """The same list as in JSON, loaded whole: PyYAML can't hand out the
+    elements of a sequence one by one."""
+    try:
+        import yaml
+    except ImportError:
+        raise SpecError('YAML specs need PyYAML: pip install "odoo-gen[yaml]"')
+
+    try:
+        data = yaml.safe_load(fp)
+    except yaml.YAMLError as e:
+        raise SpecError(f'invalid YAML: {e}')
+    if data is None:
+        return
+    if not isinstance(data, list):
+        raise SpecError('expected a YAML list of fields or models')
+    for n, value in enumerate(data, 1):
+        if not isinstance(value, dict):
+            raise SpecError('expected a mapping', f'element {n}')
+        yield f'element {n}', {_key(k): v for k, v in value.items()}
+
+
+_ROWS = {
+    'csv': _csv_rows,
+    'json': _json_rows,
+    'jsonl': _jsonl_rows,
+    'yaml': _yaml_rows,
+}
+
+
+# ---------- validation ----------
+
+def _model(row: dict, where: str) -> ModelSpec:
+    model = row.get('model')
+    if not isinstance(model, str) or not model.strip():
+        raise SpecError('missing model', where)
+    description = _text(row.get('description') or row.get('model_description'))
+    return ModelSpec(model.strip(), description)
+
+
+def _field(data, where: str) -> FieldSpec:
+    if not isinstance(data, dict):
+        raise SpecError('a field must be an object', where)
+    data = {_key(k): v for k, v in data.items()}
+
+    name = data.get('name')
+    if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name):
+        raise SpecError(f'invalid field name {name!r}', where)
+
+    kind = FIELD_TYPES.get(str(data.get('type', '')).strip().lower())
+    if kind is None:
+        raise SpecError(f'unknown type {data.get("type")!r} of field {name}', where)
+
+    spec = FieldSpec(
+        name=name,
+        type=kind,
+        string=_text(data.get('string')),
+        required=_bool(data.get('required')),
+        readonly=_bool(data.get('readonly')),
+        index=_bool(data.get('index')),
+        relation=_text(data.get('relation')),
+        inverse=_text(data.get('inverse')),
+        help=_text(data.get('help')),
+    )
+    if kind in RELATIONAL and not spec.relation:
+        raise SpecError(f'{kind} field {name} needs a relation', where)
+    if kind == 'One2many' and not spec.inverse:
+        raise SpecError(f'One2many field {name} needs an inverse', where)
+    if kind == 'Selection':
+        spec.selection = _selection(data.get('selection'))
+        if not spec.selection:
+            raise SpecError(f'Selection field {name} needs values', where)
+    return spec
+
+
+def _selection(value) -> list[tuple[str, str]]:
+    """``draft:Draft;done:Done`` in csv, a list or a mapping in json."""
+    if isinstance(value, dict):
+        return [(str(k), str(v)) for k, v in value.items()]
+    if isinstance(value, str):
+        sep = ';' if ';' in value else ','
+        value = [v.strip() for v in value.split(sep) if v.strip()]
+    out = []
+    for item in value or ():
+        if isinstance(item, (list, tuple)) and len(item) == 2:
+            key, label = item
+        else:
+            key, _, label = str(item).partition(':')
+            label = label or key.replace('_', ' ').capitalize()
+        out.append((str(key).strip(), str(label).strip()))
+    return out
+
+
+def _key(header: str) -> str:
+    key = str(header).strip().lower().replace(' ', '_')
+    return ALIASES.get(key, key)
+
+
+def _bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE
+    return bool(value)
+
+
+def _text(value) -> str | None:
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _str(value: str) -> str:
+    # json strings are valid python literals
+    return json.dumps(value, ensure_ascii=False)
@@ -0,0 +1,28 @@
+import threading
+
+from collections import Counter
+
+
+# stat, listdir, open, read, read_bytes, write, write_bytes, xml_parse,
+# ast_parse. Always counted, an increment is cheaper than asking whether
+# a profiler is listening.
+_counters: Counter = Counter()
+_lock = threading.Lock()
+
+
+def count(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+
+def snapshot() -> dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def delta(before: dict[str, int], after: dict[str, int]) -> dict[str, int]:
+    return {
+        k: v - before.get(k, 0)
+        for k, v in after.items()
+        if v != before.get(k, 0)
+    }
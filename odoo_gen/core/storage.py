@@ -0,0 +1,488 @@
+import difflib
+import io
+import os
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from .stats import count
+
+
+class Storage(ABC):
+    """Filesystem operations used by the resolver and the executor."""
+
+    def exists(self, path: Path) -> bool:
+        return self.is_file(path) or self.is_dir(path)
+
+    @abstractmethod
+    def is_file(self, path: Path) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_dir(self, path: Path) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def mtime(self, path: Path) -> int | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stat(self, path: Path) -> tuple[int, int] | None:
+        """``(size, mtime_ns)`` of a file, ``None`` when missing."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_dirs(self, path: Path) -> list[str]:
+        """Full paths of the subdirectories, in listing order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_files(self, path: Path) -> list[str]:
+        """Names of the regular files, in listing order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def mkdir(self, path: Path) -> None:
+        """``mkdir -p``"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_text(self, path: Path) -> str:
+        raise NotImplementedError
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self.read_text(path).encode()
+
+    @abstractmethod
+    def write_text(self, path: Path, text: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def open(self, path: Path, mode: str = 'r', newline: str | None = None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def replace(self, src: Path, dst: Path) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def unlink(self, path: Path) -> None:
+        raise NotImplementedError
+
+
+class DiskStorage(Storage):
+    """The real filesystem, calls are counted in ``stats`` (text sizes are
+    counted in characters, a file opened for writing counts as one write)."""
+
+    def exists(self, path):
+        count('stat')
+        return os.path.exists(path)
+
+    def is_file(self, path):
+        count('stat')
+        return os.path.isfile(path)
+
+    def is_dir(self, path):
+        count('stat')
+        return os.path.isdir(path)
+
+    def mtime(self, path):
+        count('stat')
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def stat(self, path):
+        count('stat')
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def list_dirs(self, path):
+        count('listdir')
+        try:
+            with os.scandir(path) as it:
+                # d_type from the listing, no stat per entry
+                return [e.path for e in it if e.is_dir()]
+        except OSError:
+            return []
+
+    def list_files(self, path):
+        count('listdir')
+        try:
+            with os.scandir(path) as it:
+                return [e.name for e in it if e.is_file()]
+        except OSError:
+            return []
+
+    def mkdir(self, path):
+        path.mkdir(parents=True, exist_ok=True)
+
+    def read_text(self, path):
+        text = path.read_text()
+        count('read')
+        count('read_bytes', len(text))
+        return text
+
+    def read_bytes(self, path):
+        data = path.read_bytes()
+        count('read')
+        count('read_bytes', len(data))
+        return data
+
+    def write_text(self, path, text):
+        path.write_text(text)
+        count('write')
+        count('write_bytes', len(text))
+
+    def open(self, path, mode='r', newline=None):
+        count('open')
+        fp = path.open(mode, newline=newline)
+        if mode == 'r':
+            return fp
+        count('write')
+        return _CountedWriter(fp)
+
+    def replace(self, src, dst):
+        os.replace(src, dst)
+
+    def unlink(self, path):
+        path.unlink(missing_ok=True)
+
+
+class _CountedWriter:
+    """A file of ``DiskStorage.open``, written sizes counted like
+    ``write_text`` counts them."""
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def write(self, text: str) -> int:
+        count('write_bytes', len(text))
+        return self.fp.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.fp, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return self.fp.__exit__(*exc)
+
+
+class CachedDiskStorage(DiskStorage):
+    """The real filesystem with stats and listings kept in memory.
+
+    Only paths ``covers`` accepts are cached, the owner (the daemon with a
+    file watcher) calls ``invalidate`` when they change on disk. Writes made
+    through this storage invalidate themselves. Contents are never cached,
+    the indexes keep what they parsed.
+    """
+
+    def __init__(self, covers=lambda path: False):
+        self.covers = covers
+        # str path -> {'stat' | 'is_file' | ... : value}; keyed by strings,
+        # building a Path per lookup would cost more than the stat it saves
+        self.entries: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def _cached(self, kind: str, path, load):
+        key = os.fspath(path)
+        entry = self.entries.get(key)
+        if entry is not None and kind in entry:
+            return entry[kind]
+        value = load(path)
+        if self.covers(Path(key)):
+            with self.lock:
+                self.entries.setdefault(key, {})[kind] = value
+        return value
+
+    def invalidate(self, path: Path, tree: bool = False):
+        """Forget ``path`` and the listing of its dir, with ``tree`` also
+        everything below it."""
+        key = os.fspath(path)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries.pop(os.path.dirname(key), None)
+            if tree:
+                prefix = os.path.join(key, '')
+                for p in [p for p in self.entries if p.startswith(prefix)]:
+                    del self.entries[p]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    # ---------- queries ----------
+
+    def exists(self, path):
+        return self._cached('exists', path, super().exists)
+
+    def is_file(self, path):
+        return self._cached('is_file', path, super().is_file)
+
+    def is_dir(self, path):
+        return self._cached('is_dir', path, super().is_dir)
+
+    def mtime(self, path):
+        return self._cached('mtime', path, super().mtime)
+
+    def stat(self, path):
+        return self._cached('stat', path, super().stat)
+
+    def list_dirs(self, path):
+        return list(self._cached('list_dirs', path, super().list_dirs))
+
+    def list_files(self, path):
+        return list(self._cached('list_files', path, super().list_files))
+
+    # ---------- changes ----------
+
+    def mkdir(self, path):
+        super().mkdir(path)
+        # any missing ancestor may have been created too
+        for p in (path, *path.parents):
+            self.invalidate(p)
+
+    def write_text(self, path, text):
+        super().write_text(path, text)
+        self.invalidate(path)
+
+    def open(self, path, mode='r', newline=None):
+        if mode != 'r':
+            self.invalidate(path)
+        return super().open(path, mode, newline)
+
+    def replace(self, src, dst):
+        super().replace(src, dst)
+        self.invalidate(src)
+        self.invalidate(dst)
+
+    def unlink(self, path):
+        super().unlink(path)
+        self.invalidate(path)
+
+
+class MemoryStorage(Storage):
+    """Files kept in RAM.
+
+    With a ``base`` storage it works as an overlay: reads fall through to
+    the base until a path is written or removed in memory, nothing is ever
+    written to the base. ``from_directory`` seeds a standalone copy of a
+    real directory. ``diff`` lists changes against the base,
+    ``diff_directory`` against a real directory tree.
+    """
+
+    def __init__(self, base: Storage | None = None):
+        self.base = base
+        self.files: dict[Path, str] = {}
+        self.dirs: set[Path] = set()
+        self.removed: set[Path] = set()
+        self.mtimes: dict[Path, int] = {}
+        self.children: dict[Path, dict[str, None]] = {}
+        # the executor may write from several threads
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_directory(cls, root: Path) -> 'MemoryStorage':
+        self = cls()
+        root = root.resolve()
+        self.mkdir(root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            base = Path(dirpath)
+            for name in dirnames:
+                self.mkdir(base / name)
+            for name in filenames:
+                path = base / name
+                data = path.read_bytes()
+                self.write_text(path, data.decode(errors='surrogateescape'))
+        return self
+
+    # ---------- queries ----------
+
+    def is_file(self, path):
+        if path in self.files:
+            return True
+        return self._in_base(path) and self.base.is_file(path)
+
+    def is_dir(self, path):
+        if path in self.dirs:
+            return True
+        return self._in_base(path) and self.base.is_dir(path)
+
+    def mtime(self, path):
+        if path in self.mtimes:
+            return self.mtimes[path]
+        if self._in_base(path):
+            return self.base.mtime(path)
+        return None
+
+    def stat(self, path):
+        if path in self.files:
+            size = len(self.files[path].encode(errors='surrogateescape'))
+            return size, self.mtimes[path]
+        if self._in_base(path):
+            return self.base.stat(path)
+        return None
+
+    def list_dirs(self, path):
+        out = []
+        if self._in_base(path):
+            out = [
+                p for p in self.base.list_dirs(path)
+                if Path(p) not in self.removed
+            ]
+        seen = set(out)
+        for name in self.children.get(path, ()):
+            child = path / name
+            if child in self.dirs and str(child) not in seen:
+                out.append(str(child))
+        return out
+
+    def list_files(self, path):
+        out = []
+        if self._in_base(path):
+            out = [
+                name for name in self.base.list_files(path)
+                if path / name not in self.removed
+            ]
+        seen = set(out)
+        for name in self.children.get(path, ()):
+            if path / name in self.files and name not in seen:
+                out.append(name)
+        return out
+
+    def read_text(self, path):
+        if path in self.files:
+            return self.files[path]
+        if self._in_base(path):
+            return self.base.read_text(path)
+        raise FileNotFoundError(str(path))
+
+    def read_bytes(self, path):
+        return self.read_text(path).encode(errors='surrogateescape')
+
+    # ---------- changes ----------
+
+    def mkdir(self, path):
+        with self.lock:
+            for p in (path, *path.parents):
+                if self.is_dir(p):
+                    break
+                self.dirs.add(p)
+                self.removed.discard(p)
+                self._link(p)
+
+    def write_text(self, path, text):
+        with self.lock:
+            if not self.is_dir(path.parent):
+                raise FileNotFoundError(str(path.parent))
+            if not self.is_file(path):
+                self._link(path)
+            self.files[path] = text
+            self.removed.discard(path)
+            self._touch(path)
+
+    def open(self, path, mode='r', newline=None):
+        if 'w' in mode:
+            if not self.is_dir(path.parent):
+                raise FileNotFoundError(str(path.parent))
+            return _MemoryWriter(self, path)
+        return io.StringIO(self.read_text(path), newline='')
+
+    def replace(self, src, dst):
+        with self.lock:
+            self.write_text(dst, self.read_text(src))
+            self.unlink(src)
+
+    def unlink(self, path):
+        with self.lock:
+            self.files.pop(path, None)
+            self.mtimes.pop(path, None)
+            self.children.get(path.parent, {}).pop(path.name, None)
+            if self.base is not None and self.base.is_file(path):
+                self.removed.add(path)
+            self._touch(path.parent)
+
+    # ---------- diff ----------
+
+    def changed_paths(self) -> list[Path]:
+        """Files written or removed in memory."""
+        return sorted(set(self.files) | self.removed)
+
+    def diff(self):
+        """Yield ``(path, old, new)`` for files changed against the base."""
+        base = self.base or DiskStorage()
+        for path in self.changed_paths():
+            new = None if path in self.removed else self.files[path]
+            old = base.read_text(path) if base.is_file(path) else None
+            if old != new:
+                yield path, old, new
+
+    def diff_directory(self, root: Path):
+        """Yield ``(path, old, new)`` comparing the tree under ``root``
+        with the real directory, files missing on either side included."""
+        root = root.resolve()
+        disk = DiskStorage()
+        paths = {p for p in self.files if p.is_relative_to(root)}
+        paths.update(_walk_files(root))
+
+        for path in sorted(paths):
+            new = self.files.get(path)
+            old = disk.read_text(path) if disk.is_file(path) else None
+            if old != new:
+                yield path, old, new
+
+    def unified_diff(self, root: Path | None = None) -> str:
+        changes = self.diff() if root is None else self.diff_directory(root)
+        out = []
+        for path, old, new in changes:
+            out.extend(difflib.unified_diff(
+                (old or '').splitlines(True),
+                (new or '').splitlines(True),
+                fromfile=str(path) if old is not None else '/dev/null',
+                tofile=str(path) if new is not None else '/dev/null',
+            ))
+        return ''.join(
+            line if line.endswith('\n') else line + '\n' for line in out
+        )
+
+    # ---------- internals ----------
+
+    def _in_base(self, path: Path) -> bool:
+        return (
+            self.base is not None
+            and path not in self.removed
+            and not any(p in self.removed for p in path.parents)
+        )
+
+    def _link(self, path: Path):
+        self.children.setdefault(path.parent, {})[path.name] = None
+        self._touch(path.parent)
+
+    def _touch(self, path: Path):
+        self.mtimes[path] = time.time_ns()
+
+
+class _MemoryWriter(io.StringIO):
+    def __init__(self, storage: MemoryStorage, path: Path):
+        super().__init__(newline='')
+        self.storage = storage
+        self.path = path
+
+    def close(self):
+        if not self.closed:
+            self.storage.write_text(self.path, self.getvalue())
+        super().close()
+
+
+def _walk_files(root: Path):
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            yield Path(dirpath) / name
@@ -0,0 +1,26 @@
+from functools import cache
+from typing import TYPE_CHECKING
+
+from .cache import cache_dir
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
+
+
+@cache
+def get_env() -> 'Environment':
+    """Process-wide jinja environment shared by all generators.
+
+    Compiled templates are kept in an on-disk bytecode cache. Jinja checks
+    the source checksum of every bucket and the cache directory is versioned,
+    so templates are compiled once per install.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader
+
+    directory = cache_dir('jinja')
+    return Environment(
+        loader=PackageLoader("odoo_gen", "templates"),
+        bytecode_cache=(
+            FileSystemBytecodeCache(str(directory)) if directory else None
+        ),
+    )
@@ -0,0 +1,251 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+
+from .discovery import SKIP_DIRS
+
+
+# <sys/inotify.h>
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x1000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_EVENT = struct.Struct('iIII')
+
+
+def _skip(name: str) -> bool:
+    return name in SKIP_DIRS or name.startswith('.') or name == '__pycache__'
+
+
+@dataclass(slots=True)
+class Change:
+    """A changed path, ``tree`` when everything below it may be stale too
+    (a directory created, removed or moved)."""
+    path: Path
+    tree: bool = False
+
+
+class Watcher(ABC):
+    """Recursive watch of directory trees.
+
+    ``read`` returns the changes since the previous call, or ``None`` when
+    some were lost and everything has to be considered changed. Directories
+    odoo never loads from (static, i18n, tests, hidden ones) are skipped.
+    ``notifies`` is false when ``read`` has to walk the trees to find out.
+    """
+    notifies = True
+
+    @abstractmethod
+    def add(self, root: Path, recursive: bool = True) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def covers(self, path: Path) -> bool:
+        """Whether changes of ``path`` (a watched dir or a file in one) are
+        reported."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read(self, timeout: float | None = 0) -> list[Change] | None:
+        """Wait up to ``timeout`` seconds (``None``: forever) for changes."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher(Watcher):
+    """Linux inotify through ctypes, one watch per directory."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # wd -> dir, dir -> wd
+        self.dirs: dict[int, Path] = {}
+        self.wds: dict[Path, int] = {}
+        self.full = False
+
+    def add(self, root: Path, recursive: bool = True):
+        stack = [Path(root)]
+        while stack:
+            d = stack.pop()
+            if d in self.wds or not self._watch(d):
+                continue
+            if not recursive:
+                continue
+            try:
+                with os.scandir(d) as it:
+                    stack.extend(
+                        Path(e.path) for e in it
+                        if e.is_dir(follow_symlinks=False) and not _skip(e.name)
+                    )
+            except OSError:
+                pass
+
+    def _watch(self, d: Path) -> bool:
+        if self.full:
+            return False
+        wd = self._add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+        if wd < 0:
+            # ENOSPC: out of watches, the rest stays uncovered
+            self.full = ctypes.get_errno() == 28
+            return False
+        self.dirs[wd] = d
+        self.wds[d] = wd
+        return True
+
+    def covers(self, path: Path) -> bool:
+        return path in self.wds or path.parent in self.wds
+
+    def read(self, timeout=0):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        return self._parse(data)
+
+    def _parse(self, data: bytes) -> list[Change] | None:
+        changes = []
+        lost = False
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, size = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = os.fsdecode(data[pos:pos + size].rstrip(b'\0'))
+            pos += size
+
+            if mask & IN_Q_OVERFLOW:
+                lost = True
+                continue
+            d = self.dirs.get(wd)
+            if d is None:
+                continue
+            if mask & IN_IGNORED:
+                # the watched dir is gone
+                del self.dirs[wd]
+                self.wds.pop(d, None)
+                changes.append(Change(d, tree=True))
+                continue
+
+            path = d / name if name else d
+            is_dir = bool(mask & IN_ISDIR)
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO) and not _skip(name):
+                # contents may have appeared before the watch did
+                self.add(path)
+            changes.append(Change(path, tree=is_dir or not name))
+        return None if lost else changes
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher(Watcher):
+    """Fallback without inotify: compares mtimes of all watched dirs and
+    files on every ``read``."""
+    notifies = False
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.roots: dict[Path, bool] = {}
+        self.snapshot: dict[Path, int] = {}
+        self.dirs: set[Path] = set()
+
+    def add(self, root: Path, recursive: bool = True):
+        self.roots[Path(root)] = recursive
+        self.snapshot.update(self._scan(Path(root), recursive))
+
+    def covers(self, path: Path) -> bool:
+        return path in self.dirs or path.parent in self.dirs
+
+    def _scan(self, root: Path, recursive: bool) -> dict[Path, int]:
+        out = {}
+        stack = [root]
+        while stack:
+            d = stack.pop()
+            try:
+                out[d] = os.stat(d).st_mtime_ns
+                it = os.scandir(d)
+            except OSError:
+                continue
+            self.dirs.add(d)
+            with it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            if recursive and not _skip(e.name):
+                                stack.append(Path(e.path))
+                        else:
+                            out[Path(e.path)] = e.stat().st_mtime_ns
+                    except OSError:
+                        pass
+        return out
+
+    def read(self, timeout=0):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = {}
+            self.dirs = set()
+            for root, recursive in self.roots.items():
+                current.update(self._scan(root, recursive))
+
+            changes = [
+                Change(p, tree=p in self.snapshot and p not in current)
+                for p in current.keys() | self.snapshot.keys()
+                if current.get(p) != self.snapshot.get(p)
+            ]
+            self.snapshot = current
+            if changes or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+
+def make_watcher() -> Watcher:
+    """inotify on linux, polling elsewhere or when it's not available."""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher()
@@ -0,0 +1,268 @@
+"""Library API: generate from your own tooling, many times in one process.
+
+    from odoo_gen.engine import Engine, GenRequest
+    from odoo_gen.core.types import Err
+
+    engine = Engine()
+    res = engine.resolve(GenRequest(['sale.thing'], path='addons/sale_ext'))
+    if isinstance(res, Err):
+        print(res.error.to_dict())      # {'error': 'module_not_found', ...}
+    else:
+        ctx = res.value
+        steps = engine.plan(ctx).value
+        report = engine.apply(ctx).value
+
+Nothing prompts, prints or exits: failures come back as ``Err`` holding
+an :class:`OdooGenError` (``code`` and ``to_dict()`` for machines), bugs
+still raise. Generators, indexes and compiled templates are built once
+per engine. A dry run is an ``apply`` into ``MemoryStorage(engine.storage)``.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .core.context import ProjectContext
+from .core.hashes import HashStore
+from .core.index import DiscoveryIndex
+from .core.manifest_index import ManifestIndex
+from .core.menu_index import MenuEntry, MenuIndex
+from .core.model_index import ModelIndex
+from .core.policy import Policy
+from .core.resolver import ContextResolver
+from .core.storage import DiskStorage, Storage
+from .core.types import Err, Ok, Result
+from .controllers import ControllerChain, HeadlessController
+from .enums import MenuState
+from .errors import OdooGenError
+from .plan.executor import ExecReport, PlanExecutor
+from .plan.optimizer import PlanOptimizer
+from .plan.steps import PlanStep
+from .plan.strategies import WriteStrategy
+from . import generators as gn
+
+if TYPE_CHECKING:
+    from .core.schema import ModelSpec
+
+
+@dataclass(slots=True)
+class GenRequest:
+    """What to generate, the CLI flags as fields."""
+    models: list[str]
+    path: Path | str | None = None
+    # models with fields, from a spec; ``models`` follows their order
+    specs: 'list[ModelSpec] | None' = None
+    # every model of a spec generated in batches, see ProjectContext
+    spec_models: set[str] | None = None
+    policy: Policy = field(default_factory=Policy)
+    menu: bool = False
+    no_views: bool = False
+    inherit: bool = False
+    force: bool = False
+    skip_existing: bool = False
+    debug: bool = False
+
+
+class Engine:
+    def __init__(
+        self,
+        storage: Storage | None = None,
+        scan_workers: int | None = None,
+        indexes: dict | None = None,
+    ):
+        self.storage = storage or DiskStorage()
+        if indexes is None:
+            workers = {'workers': scan_workers} if scan_workers else {}
+            indexes = dict(
+                index=DiscoveryIndex.default(storage=self.storage, **workers),
+                menus=MenuIndex.default(storage=self.storage, **workers),
+                manifests=ManifestIndex.default(storage=self.storage, **workers),
+                models=ModelIndex.default(storage=self.storage, **workers),
+            )
+        self.indexes = indexes
+        self.generators = [
+            gn.ModuleScaffoldGenerator(),
+            gn.ModelGenerator(),
+            gn.AccessGenerator(),
+            gn.ViewGenerator(),
+            gn.MenuGenerator(),
+            gn.ManifestGenerator(),
+        ]
+        self.hashes: HashStore | None = None
+
+    def context(self, request: GenRequest) -> ProjectContext:
+        """A fresh context for ``request``, with its policy applied."""
+        models = list(request.models)
+        if request.specs:
+            models = [spec.model for spec in request.specs]
+        ctx = ProjectContext(
+            cwd=Path(request.path).resolve() if request.path else Path.cwd(),
+            model=models[0],
+            models=models,
+            specs={spec.model: spec for spec in request.specs or ()} or None,
+            spec_models=request.spec_models,
+            # extensions of existing models get no views, menu or access
+            menu_state=(
+                MenuState.NEED
+                if (request.menu or request.policy.menu_parent) and not request.inherit
+                else MenuState.SKIP
+            ),
+            no_views=request.no_views or request.inherit,
+            inherit=request.inherit,
+            force=request.force,
+            skip_existing=request.skip_existing,
+            debug=request.debug,
+        )
+        request.policy.apply(ctx)
+        return ctx
+
+    # ---------- pipeline ----------
+
+    def resolve(
+        self,
+        request: GenRequest | ProjectContext,
+        controllers: ControllerChain | None = None,
+    ) -> Result[ProjectContext, OdooGenError]:
+        """Find addons, module, menu and manifest for the request.
+
+        A context (e.g. of a previous batch) is resolved again in place.
+        Without ``controllers`` the request policy answers the signals and
+        whatever it can't answer is an ``UnresolvedSignal``.
+        """
+        if isinstance(request, GenRequest):
+            ctx = self.context(request)
+            policy = request.policy
+        else:
+            ctx = request
+            policy = Policy()
+        controllers = controllers or ControllerChain([HeadlessController(policy)])
+        return self._run(self._resolve, ctx, controllers)
+
+    def plan(
+        self,
+        ctx: ProjectContext,
+        controllers: ControllerChain | None = None,
+    ) -> Result[list[PlanStep], OdooGenError]:
+        """The optimized steps for a resolved context, also kept on it."""
+        return self._run(self._plan, ctx, controllers or ControllerChain([]))
+
+    def apply(
+        self,
+        ctx: ProjectContext,
+        *,
+        storage: Storage | None = None,
+        jobs: int = 1,
+        controllers: ControllerChain | None = None,
+    ) -> Result[ExecReport, OdooGenError]:
+        """Execute the plan of ``ctx`` into ``storage`` (the engine's)."""
+        if ctx.plan is None:
+            return Err(OdooGenError('context has no plan, call plan() first'))
+        return self._run(
+            self._apply, ctx, controllers or ControllerChain([]),
+            storage or self.storage, jobs,
+        )
+
+    def close(self):
+        """Persist the indexes, e.g. at exit of a long-running process."""
+        for index in self.indexes.values():
+            index.save()
+
+    # ---------- project ----------
+
+    def project(self, path: Path | str) -> ProjectContext:
+        """The project around ``path``: root and addons dirs, nothing asked."""
+        ctx = ProjectContext(cwd=Path(path).resolve(), model='')
+        self._resolver(ControllerChain([]))._resolve_addons(ctx)
+        return ctx
+
+    def modules(self, ctx: ProjectContext) -> list[Path]:
+        """Modules of every addons dir of the project."""
+        return self._resolver(ControllerChain([]))._project_modules(ctx)
+
+    def menus(self, ctx: ProjectContext) -> dict[str, MenuEntry]:
+        """Menus of every module of the project by xml id."""
+        return self._resolver(ControllerChain([]))._other_menus(ctx)
+
+    # ---------- internals ----------
+
+    def _run(self, fn, ctx, controllers, *args) -> Result:
+        try:
+            return Ok(fn(ctx, controllers, *args))
+        except OdooGenError as e:
+            return Err(e)
+
+    def _resolver(self, controllers) -> ContextResolver:
+        return ContextResolver(controllers, storage=self.storage, **self.indexes)
+
+    def _resolve(self, ctx: ProjectContext, controllers) -> ProjectContext:
+        resolver = self._resolver(controllers)
+        while True:
+            signal = None
+            controllers.before_resolve(ctx)
+            try:
+                match resolver.resolve(ctx):
+                    case Ok(value=ctx):
+                        return ctx
+
+                    case Err(error=signal):
+                        if signal.can_auto_resolve(ctx) and signal.auto_resolve(ctx):
+                            continue
+
+                        if controllers.handle_signal(signal, ctx):
+                            continue
+
+                        raise OdooGenError(str(signal))
+            finally:
+                controllers.after_resolve(signal, ctx)
+
+    def _plan(self, ctx: ProjectContext, controllers) -> list[PlanStep]:
+        gens = [
+            (i, g)
+            for i, g in enumerate(self.generators)
+            if g.is_applicable(ctx)
+        ]
+        gens.sort(key=lambda x: (x[1].priority, x[0]))
+
+        plan = []
+        for _, gen in gens:
+            controllers.before_plan(gen, ctx)
+            if not gen.per_model:
+                plan.extend(gen.plan(ctx))
+            else:
+                for model in ctx.all_models:
+                    plan.extend(gen.plan(ctx.for_model(model)))
+            controllers.after_plan(gen, ctx)
+
+        optimizer = PlanOptimizer(_write_strategy(ctx))
+        controllers.before_plan(optimizer, ctx)
+        plan, ctx.plan_stats = optimizer.optimize(plan)
+        controllers.after_plan(optimizer, ctx)
+        ctx.plan = plan
+        return plan
+
+    def _apply(self, ctx: ProjectContext, controllers, storage, jobs) -> ExecReport:
+        if storage is self.storage:
+            if self.hashes is None:
+                self.hashes = HashStore.default(self.storage)
+            hashes = self.hashes
+        else:
+            hashes = HashStore.default(storage)
+
+        executor = PlanExecutor(
+            controllers=controllers,
+            write_strategy=_write_strategy(ctx),
+            storage=storage,
+            jobs=jobs,
+            hashes=hashes,
+        )
+        controllers.before_generate(ctx)
+        executor.execute(ctx)
+        controllers.after_generate(ctx)
+
+        # created by this pass, the next one goes into the existing module
+        ctx.create_addons = False
+        ctx.create_module = False
+        return executor.report
+
+
+def _write_strategy(ctx: ProjectContext) -> WriteStrategy:
+    return WriteStrategy(force=ctx.force, skip=ctx.skip_existing)
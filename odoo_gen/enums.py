@@ -6,6 +6,7 @@ class WriteMode(Enum):
     OVERWRITE = "overwrite"
     MODIFY = "modify"
     APPEND = "append"
+    UPSERT = "upsert"       # CSV rows merged by id
     SKIP = "skip"
 
 
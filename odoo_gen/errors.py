@@ -1,14 +1,89 @@
 class OdooGenError(Exception):
-    pass
+    code = 'error'
+
+    def to_dict(self) -> dict:
+        return {'error': self.code, 'message': str(self)}
 
 
 class ModulesNotFound(OdooGenError):
-    pass
+    code = 'modules_not_found'
 
 
 class AddonsPathNotFound(OdooGenError):
-    pass
+    code = 'addons_not_found'
 
 
 class ManifestParseError(OdooGenError):
-    pass
+    code = 'manifest_parse_error'
+
+
+class Cancelled(OdooGenError):
+    """The user answered "no"."""
+    code = 'cancelled'
+
+
+class FileExists(OdooGenError, FileExistsError):
+    code = 'file_exists'
+
+    def __init__(self, path):
+        super().__init__(f'file {path} already exists')
+        self.path = path
+
+    def to_dict(self) -> dict:
+        return {**super().to_dict(), 'path': str(self.path)}
+
+
+class ModelNotFound(OdooGenError):
+    code = 'model_not_found'
+
+    def __init__(self, model: str, suggestions: list[str]):
+        message = f'model {model} not found'
+        if suggestions:
+            message += ', did you mean: ' + ', '.join(suggestions)
+        super().__init__(message)
+
+
+class DuplicateModel(OdooGenError):
+    code = 'duplicate_model'
+
+    def __init__(self, model: str, where: str):
+        super().__init__(
+            f'model {model} already exists in {where}, '
+            'use --inherit to extend it'
+        )
+
+
+class DependencyCycle(OdooGenError):
+    code = 'dependency_cycle'
+
+    def __init__(self, cycle: list[str]):
+        super().__init__('dependency cycle: ' + ' -> '.join(cycle))
+        self.cycle = cycle
+
+
+class SpecError(OdooGenError):
+    code = 'spec_error'
+
+    def __init__(self, message: str, where: str | None = None):
+        super().__init__(f'{where}: {message}' if where else message)
+
+
+class UnresolvedSignal(OdooGenError):
+    """A signal the non-interactive policy cannot answer."""
+
+    def __init__(self, code: str, message: str, **details):
+        super().__init__(message)
+        self.code = code
+        self.details = details
+
+    def to_dict(self) -> dict:
+        return {
+            **super().to_dict(),
+            **{k: _plain(v) for k, v in self.details.items()},
+        }
+
+
+def _plain(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return str(value)
@@ -3,6 +3,7 @@ from .scaffolding import ModuleScaffoldGenerator
 from .view import ViewGenerator
 from .menu import MenuGenerator
 from .access import AccessGenerator
+from .manifest import ManifestGenerator
 
 
 __all__ = [
@@ -10,5 +11,6 @@ __all__ = [
     'ModuleScaffoldGenerator',
     'ViewGenerator',
     'MenuGenerator',
-    'AccessGenerator'
+    'AccessGenerator',
+    'ManifestGenerator',
 ]
@@ -4,6 +4,12 @@ from odoo_gen.core.context import ProjectContext
 from odoo_gen.plan.steps import PlanStep
 
 
+ACCESS_HEADER = (
+    'id,name,model_id:id,group_id:id,'
+    'perm_read,perm_write,perm_create,perm_unlink\n'
+)
+
+
 class AccessGenerator(BaseGenerator):
     priority = 30
 
@@ -14,14 +20,15 @@ class AccessGenerator(BaseGenerator):
             return bool(ctx.model)
 
     def plan(self, ctx: ProjectContext) -> list[PlanStep]:
-        if not ctx.module_path:
+        if not ctx.module_path or ctx.inherit:
+            # extended models already have their access rules
             return []
 
         return [
             self._write(
                 ctx.security_dir / 'ir.model.access.csv',
-                self._render_access(ctx),
-                mode=WriteMode.APPEND,
+                ACCESS_HEADER + self._render_access(ctx),
+                mode=WriteMode.UPSERT,
                 details='Update access.csv'
             ),
         ]
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from jinja2 import Environment, PackageLoader
+from dataclasses import replace
 
-from odoo_gen.core import manifest
 from odoo_gen.core.context import ProjectContext
-from odoo_gen.plan.steps import PlanStep
+from odoo_gen.core.templating import get_env
+from odoo_gen.plan.steps import Content, PlanStep
 from odoo_gen.enums import WriteMode, StepAction
 
 
@@ -23,11 +23,12 @@ class AbstractGenerator(ABC):
 
 class BaseGenerator(AbstractGenerator):
     priority = 100
+    # planned once per model of the batch, otherwise once per project
+    per_model = True
     
-    def __init__(self):
-        self.env = Environment(
-            loader=PackageLoader("odoo_gen", "templates")
-        )
+    @property
+    def env(self):
+        return get_env()
 
     def is_applicable(self, ctx: ProjectContext) -> bool:
         return True
@@ -48,14 +49,23 @@ class BaseGenerator(AbstractGenerator):
             details=details,
         )
 
-    def _render_manifest(self, ctx: ProjectContext) -> str:
+    def _template(self, name: str, **params) -> Content:
+        """Rendered when the step is written, streamed chunk by chunk;
+        skipped and folded-away steps never render."""
+        tpl = self.env.get_template(name)
+        return lambda: tpl.generate(**params)
+
+    def _render_manifest(self, ctx: ProjectContext) -> Content:
         if ctx.manifest is not None:
-            return ctx.manifest.raw
+            # the edits are applied to the text on first access
+            manifest = ctx.manifest
+            return lambda: manifest.raw
 
-        tpl = self.env.get_template("__manifest__.py.j2")
-        return tpl.render(
+        return self._template(
+            "__manifest__.py.j2",
             module_name=ctx.module_name,
-            file_name=ctx.view_file_name,
+            file_names=ctx.view_file_names,
+            depends=ctx.depends,
         )
 
     def _render_access(self, ctx: ProjectContext) -> str:
@@ -66,19 +76,29 @@ class BaseGenerator(AbstractGenerator):
             f"base.group_user,1,1,1,1\n"
         )
 
-    def _render_model(self, ctx: ProjectContext) -> str:
-        tpl = self.env.get_template("model.py.j2")
-        return tpl.render(
-            model=ctx.module_model,
+    def _render_model(self, ctx: ProjectContext) -> Content:
+        name = "model_inherit.py.j2" if ctx.inherit else "model.py.j2"
+        spec = ctx.model_spec
+        return self._template(
+            name,
+            model=ctx.model_name,
             class_name=ctx.model_class_name,
-            description=ctx.model_str
+            description=(
+                spec.description.replace('"', '\\"')
+                if spec and spec.description else ctx.model_str
+            ),
+            fields=[
+                replace(f, relation=ctx.relation(f.relation)) if f.relation else f
+                for f in spec.fields
+            ] if spec else [],
         )
 
-    def _render_view(self, ctx: ProjectContext) -> str:
-        tpl = self.env.get_template("view.xml.j2")
-        return tpl.render(
+    def _render_view(self, ctx: ProjectContext) -> Content:
+        return self._template(
+            "view.xml.j2",
             model=ctx.module_model,
             model_underscore=ctx.model_underscore,
             model_str=ctx.model,
             action_id=ctx.action_xml_id,
+            fields=ctx.model_spec.fields if ctx.model_spec else [],
         )
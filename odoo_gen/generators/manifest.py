@@ -0,0 +1,25 @@
+from .base import BaseGenerator
+from odoo_gen.core.context import ProjectContext
+from odoo_gen.enums import WriteMode
+
+
+class ManifestGenerator(BaseGenerator):
+    """Writes the edits queued on an existing manifest (data, depends)."""
+    priority = 50
+    per_model = False
+
+    def is_applicable(self, ctx: ProjectContext) -> bool:
+        return ctx.manifest is not None
+
+    def plan(self, ctx: ProjectContext):
+        if ctx.manifest is None:
+            return []
+
+        return [
+            self._write(
+                ctx.manifest_path,
+                self._render_manifest(ctx),
+                mode=WriteMode.MODIFY,
+                details="Update __manifest__.py"
+            ),
+        ]
@@ -6,6 +6,7 @@ from odoo_gen.enums import MenuState
 
 class MenuGenerator(BaseGenerator):
     priority = 40
+    per_model = False
 
     def is_applicable(self, ctx: ProjectContext) -> bool:
         return ctx.menu_state != MenuState.SKIP
@@ -17,7 +18,8 @@ class MenuGenerator(BaseGenerator):
         return [
             self._write(
                 path=ctx.menu_xml_path,
-                content=ctx.menu_tree.serialize(),
+                # serialized when written
+                content=ctx.menu_tree.dump,
                 mode=WriteMode.MODIFY,
                 details=f"Create menu item"
             ),
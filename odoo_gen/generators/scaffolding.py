@@ -5,6 +5,7 @@ from odoo_gen.core.context import ProjectContext
 
 class ModuleScaffoldGenerator(BaseGenerator):
     priority = 10
+    per_model = False
     
     def is_applicable(self, ctx: ProjectContext) -> bool:
         return ctx.create_module is True
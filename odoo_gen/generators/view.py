@@ -21,10 +21,4 @@ class ViewGenerator(BaseGenerator):
                 mode=WriteMode.CREATE,
                 details=f"Create view {ctx.view_file_name}"
             ),
-            self._write(
-                ctx.manifest_path,
-                self._render_manifest(ctx),
-                mode=WriteMode.MODIFY,
-                details="Update __manifest__.py (data section)"
-            )
         ]
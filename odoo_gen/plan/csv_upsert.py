@@ -0,0 +1,82 @@
+import csv
+import io
+import os
+
+from pathlib import Path
+
+from odoo_gen.core.storage import DiskStorage, Storage
+
+
+def parse_rows(content: str) -> tuple[list[str], dict[str, list[str]]]:
+    """Split an UPSERT payload into its header and rows keyed by ``id``."""
+    reader = csv.reader(io.StringIO(content))
+    header = next(reader, [])
+    rows = {}
+    for row in reader:
+        row = [field.strip() for field in row]
+        if row and row[0]:
+            rows[row[0]] = row
+    return header, rows
+
+
+def upsert_csv(
+    path: Path, content: str, storage: Storage | None = None
+) -> bool:
+    """Merge rows of ``content`` into the CSV file at ``path`` by first column.
+
+    ``content`` is a CSV document with a header line. Existing rows with the
+    same id are replaced in place, new ones are appended, the header and all
+    other lines are copied byte for byte. The file is streamed line by line
+    into a temporary file, so memory doesn't grow with its size; rows must
+    not span several lines. Returns whether the file changed.
+    """
+    storage = storage or DiskStorage()
+    header, rows = parse_rows(content)
+    pending = dict(rows)
+    changed = False
+    newline = '\n'
+
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with (
+        storage.open(path, newline='') as src,
+        storage.open(tmp, 'w', newline='') as dst,
+    ):
+        writer = None
+        last = ''
+        for i, line in enumerate(src):
+            if i == 0:
+                newline = '\r\n' if line.endswith('\r\n') else '\n'
+                writer = csv.writer(dst, lineterminator=newline)
+
+            last = line
+            row = next(csv.reader([line]), [])
+            key = row[0].strip() if row else ''
+            # files written by older versions have no header line
+            is_header = i == 0 and bool(header) and key == header[0]
+            new = None if is_header else pending.pop(key, None)
+
+            if new is None or [f.strip() for f in row] == new:
+                dst.write(line)
+                continue
+
+            writer.writerow(new)
+            changed = True
+
+        if writer is None:
+            # empty file: write the whole payload, header included
+            writer = csv.writer(dst, lineterminator=newline)
+            if header:
+                writer.writerow(header)
+                changed = True
+        elif pending and last and not last.endswith('\n'):
+            dst.write(newline)
+
+        for row in pending.values():
+            writer.writerow(row)
+            changed = True
+
+    if changed:
+        storage.replace(tmp, path)
+    else:
+        storage.unlink(tmp)
+    return changed
@@ -1,20 +1,137 @@
+import hashlib
+import heapq
+import threading
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
 from .steps import PlanStep
+from .csv_upsert import upsert_csv
+from odoo_gen.core.hashes import HashStore
+from odoo_gen.core.storage import DiskStorage, Storage
 from odoo_gen.enums import WriteMode, StepAction
+from odoo_gen.errors import FileExists
+
+
+@dataclass(slots=True)
+class ExecReport:
+    written: int = 0
+    elided: int = 0     # identical content already on disk
+    skipped: int = 0    # --skip-existing
+
+    def __add__(self, other: 'ExecReport') -> 'ExecReport':
+        return ExecReport(
+            self.written + other.written,
+            self.elided + other.elided,
+            self.skipped + other.skipped,
+        )
+
+    def __str__(self):
+        out = f'{self.written} written, {self.elided} unchanged'
+        if self.skipped:
+            out += f', {self.skipped} skipped'
+        return out
+
+
+def step_dependencies(plan: list[PlanStep]) -> list[set[int]]:
+    """Indexes of the earlier steps every step has to wait for.
+
+    A step depends on the MKDIRs of its ancestor dirs and on the previous
+    step with the same path; everything else is independent.
+    """
+    mkdirs: dict = {}
+    last: dict = {}
+    deps = []
+
+    for i, step in enumerate(plan):
+        d = {mkdirs[p] for p in step.path.parents if p in mkdirs}
+        if step.path in last:
+            d.add(last[step.path])
+        deps.append(d)
+
+        last[step.path] = i
+        if step.action == StepAction.MKDIR:
+            mkdirs[step.path] = i
+
+    return deps
 
 
 class PlanExecutor:
-    def __init__(self, controllers=None, write_strategy=None):
+    def __init__(
+        self,
+        controllers=None,
+        write_strategy=None,
+        storage: Storage | None = None,
+        jobs: int = 1,
+        hashes: HashStore | None = None,
+    ):
         self.controllers = controllers
         self.write_strategy = write_strategy
+        self.storage = storage or DiskStorage()
+        self.jobs = jobs
+        self.hashes = hashes or HashStore(None)
+        self.report = ExecReport()
+        self._lock = threading.Lock()
 
     def execute(self, ctx):
         if not ctx.plan:
             return
 
-        for step in ctx.plan:
-            self._before_step(step, ctx)
-            self._execute_step(step)
-            self._after_step(step, ctx)
+        try:
+            if self.jobs > 1:
+                self._execute_parallel(ctx.plan, ctx)
+                return
+
+            for step in ctx.plan:
+                self._before_step(step, ctx)
+                self._execute_step(step)
+                self._after_step(step, ctx)
+        finally:
+            self.hashes.save()
+
+    def _execute_parallel(self, plan: list[PlanStep], ctx):
+        """Run independent steps on a thread pool.
+
+        Steps are submitted in plan order as soon as their dependencies are
+        done. Controller hooks are only called from this thread: before_step
+        on submit, after_step on completion, so they never interleave.
+        """
+        deps = step_dependencies(plan)
+        waiting = [len(d) for d in deps]
+        dependents: list[list[int]] = [[] for _ in plan]
+        for i, d in enumerate(deps):
+            for j in d:
+                dependents[j].append(i)
+
+        ready = [i for i, n in enumerate(waiting) if not n]
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while ready or running:
+                while ready and error is None:
+                    i = heapq.heappop(ready)
+                    self._before_step(plan[i], ctx)
+                    running[pool.submit(self._execute_step, plan[i])] = i
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=running.get):
+                    i = running.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+
+                    self._after_step(plan[i], ctx)
+                    for j in dependents[i]:
+                        waiting[j] -= 1
+                        if not waiting[j]:
+                            heapq.heappush(ready, j)
+
+        if error is not None:
+            raise error
 
     # ---------- hooks ----------
 
@@ -29,37 +146,88 @@ class PlanExecutor:
     # ---------- actions ----------
 
     def _mkdir(self, step: PlanStep):
-        step.path.mkdir(parents=True, exist_ok=True)
+        self.storage.mkdir(step.path)
 
     def _write(self, step: PlanStep):
-        exists = step.path.exists()
-        
-        mode = (
-            self.write_strategy.resolve(step.mode, exists)
-            if self.write_strategy
-            else step.mode
-        )
+        exists = self.storage.exists(step.path)
+
+        try:
+            mode = (
+                self.write_strategy.resolve(step.mode, exists)
+                if self.write_strategy
+                else step.mode
+            )
+        except FileExistsError:
+            raise FileExists(step.path) from None
 
         if mode is None:
+            self._count('skipped')
             return
 
-        step.path.parent.mkdir(parents=True, exist_ok=True)
-
         if mode in (WriteMode.CREATE, WriteMode.OVERWRITE, WriteMode.MODIFY):
-            step.path.write_text(step.content or '')
+            if not exists:
+                # nothing to compare with, stream the content into the file
+                self.storage.mkdir(step.path.parent)
+                self._stream(step)
+                self._count('written')
+                return
+
+            # identical rewrites would only bump mtimes and wake up
+            # odoo's dev-mode reload and file watchers
+            text = step.text()
+            data = text.encode()
+            if self.hashes.same_content(self.storage, step.path, data):
+                self._count('elided')
+                return
+
+            self.storage.mkdir(step.path.parent)
+            self.storage.write_text(step.path, text)
+            self.hashes.remember(self.storage, step.path, data)
+            self._count('written')
             return
 
-        elif mode == WriteMode.APPEND:
-            self._append(step)
+        self.storage.mkdir(step.path.parent)
 
-    def _append(self, step: PlanStep):
-        if step.path.exists():
-            existing = step.path.read_text()
-            if step.content and step.content in existing:
-                return
-            step.path.write_text(existing + (step.content or ""))
+        if mode == WriteMode.UPSERT:
+            changed = upsert_csv(step.path, step.text(), self.storage)
+        else:
+            changed = self._append(step)
+
+        self._count('written' if changed else 'elided')
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self.report, field, getattr(self.report, field) + 1)
+
+    def _stream(self, step: PlanStep):
+        h = hashlib.sha256()
+        try:
+            with self.storage.open(step.path, 'w') as fp:
+                for chunk in step.chunks():
+                    fp.write(chunk)
+                    h.update(chunk.encode())
+        except BaseException:
+            # no half-rendered files
+            self.storage.unlink(step.path)
+            raise
+        self.hashes.remember_digest(self.storage, step.path, h.hexdigest())
+
+    def _append(self, step: PlanStep) -> bool:
+        if self.storage.exists(step.path):
+            existing = self.storage.read_text(step.path)
+            present = set(existing.splitlines())
+            lines = [
+                line for line in step.text().splitlines(True)
+                if line.rstrip('\n') not in present
+            ]
+            if not lines:
+                return False
+            if existing and not existing.endswith('\n'):
+                existing += '\n'
+            self.storage.write_text(step.path, existing + ''.join(lines))
         else:
-            step.path.write_text(step.content or "")
+            self.storage.write_text(step.path, step.text())
+        return True
 
     def _execute_step(self, step: PlanStep):
         if step.action == StepAction.MKDIR:
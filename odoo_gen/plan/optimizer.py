@@ -0,0 +1,177 @@
+from dataclasses import dataclass, replace
+
+from .steps import Content, PlanStep
+from .strategies import WriteStrategy
+from odoo_gen.enums import WriteMode, StepAction
+
+
+# rough syscall cost of executing a step, an estimate for reporting only:
+# the calls actually made show in ``-v`` and ``--profile``
+STEP_COST = {
+    StepAction.MKDIR: 1,
+    WriteMode.CREATE: 5,        # stat, mkdir parent, open, write, close
+    WriteMode.OVERWRITE: 5,
+    WriteMode.MODIFY: 5,
+    WriteMode.APPEND: 8,        # + open, read, close
+    WriteMode.UPSERT: 10,       # + temp file rename
+    WriteMode.SKIP: 0,
+}
+
+
+@dataclass(slots=True)
+class OptimizeStats:
+    steps_before: int = 0
+    steps_after: int = 0
+    syscalls_before: int = 0
+    syscalls_after: int = 0
+
+    @property
+    def syscalls_saved(self) -> int:
+        return self.syscalls_before - self.syscalls_after
+
+    def __str__(self):
+        return (
+            f'{self.steps_before} -> {self.steps_after} steps, '
+            f'~{self.syscalls_saved} syscalls saved (estimated)'
+        )
+
+
+class PlanOptimizer:
+    """Rewrites a plan so every path is touched once.
+
+    - repeated MKDIRs and MKDIRs implied by a write or a deeper MKDIR
+      are dropped (writes create their parent dirs anyway)
+    - writes of one path are folded into the first of them:
+      APPEND/UPSERT payloads are concatenated, MODIFY keeps the last
+      content, CREATE followed by APPEND/MODIFY becomes a single write
+
+    Folding CREATE depends on ``--skip-existing``, so the write strategy
+    of the run is needed to keep the result identical to the plain plan.
+    """
+
+    def __init__(self, write_strategy: WriteStrategy | None = None):
+        self.skip = bool(write_strategy and write_strategy.skip)
+
+    def optimize(self, plan: list[PlanStep]) -> tuple[list[PlanStep], OptimizeStats]:
+        stats = OptimizeStats(
+            steps_before=len(plan), syscalls_before=self._cost(plan)
+        )
+
+        plan = self._fold_writes(plan)
+        plan = self._dedupe_mkdirs(plan)
+
+        stats.steps_after = len(plan)
+        stats.syscalls_after = self._cost(plan)
+        return plan, stats
+
+    # ---------- passes ----------
+
+    def _fold_writes(self, plan: list[PlanStep]) -> list[PlanStep]:
+        out: list[PlanStep] = []
+        slots: dict = {}
+
+        for step in plan:
+            if step.action != StepAction.WRITE:
+                out.append(step)
+                continue
+
+            i = slots.get(step.path)
+            folded = self._fold(out[i], step) if i is not None else None
+            if folded is not None:
+                out[i] = folded
+                continue
+
+            slots[step.path] = len(out)
+            out.append(step)
+
+        return out
+
+    def _dedupe_mkdirs(self, plan: list[PlanStep]) -> list[PlanStep]:
+        implied = set()
+        for step in plan:
+            implied.update(step.path.parents)
+
+        out = []
+        seen = set()
+        for step in plan:
+            if step.action == StepAction.MKDIR:
+                if step.path in seen:
+                    continue
+                seen.add(step.path)
+                # keep described mkdirs, they are what `-v` reports
+                if step.path in implied and not step.details:
+                    continue
+            out.append(step)
+        return out
+
+    # ---------- folding ----------
+
+    def _fold(self, prev: PlanStep, step: PlanStep) -> PlanStep | None:
+        pm, sm = prev.mode, step.mode
+
+        if pm == sm == WriteMode.APPEND:
+            return replace(prev, content=_lazy(_concat, prev, step))
+
+        if pm == sm == WriteMode.UPSERT:
+            # every UPSERT payload starts with the same header line
+            return replace(prev, content=_lazy(_add_rows, prev, step))
+
+        if pm == sm == WriteMode.MODIFY:
+            # MODIFY always carries the full file content, the last one wins
+            return replace(prev, content=step.content)
+
+        if pm == WriteMode.CREATE and self.skip:
+            # an existing file is skipped by CREATE and only gets the later
+            # step applied: same as that step alone, unless CREATE had
+            # content for a new file that APPEND would build upon (a
+            # deferred one counts as content, not folding is always safe)
+            if sm == WriteMode.MODIFY or (
+                sm == WriteMode.APPEND and not prev.content
+            ):
+                return replace(prev, content=step.content, mode=sm)
+            return None
+
+        if pm in (WriteMode.CREATE, WriteMode.OVERWRITE):
+            if sm == WriteMode.APPEND:
+                return replace(prev, content=_lazy(_merge_lines, prev, step))
+            if sm == WriteMode.MODIFY:
+                return replace(prev, content=step.content)
+
+        return None
+
+    @staticmethod
+    def _cost(plan: list[PlanStep]) -> int:
+        return sum(
+            STEP_COST[s.action if s.action == StepAction.MKDIR else s.mode]
+            for s in plan
+        )
+
+
+def _lazy(fold, prev: PlanStep, step: PlanStep) -> Content:
+    """``fold`` of the two contents, deferred while either of them is."""
+    if prev.deferred or step.deferred:
+        return lambda: fold(prev.text(), step.text())
+    return fold(prev.content, step.content)
+
+
+def _concat(a: str | None, b: str | None) -> str:
+    return (a or '') + (b or '')
+
+
+def _add_rows(a: str | None, b: str | None) -> str:
+    _, _, rows = (b or '').partition('\n')
+    return (a or '') + rows
+
+
+def _merge_lines(content: str | None, extra: str | None) -> str:
+    """``content`` followed by the lines of ``extra`` it doesn't have yet,
+    the same result APPEND gives on an existing file."""
+    content = content or ''
+    present = set(content.splitlines())
+    lines = [
+        line for line in (extra or '').splitlines(True)
+        if line.rstrip('\n') not in present
+    ]
+    if content and lines and not content.endswith('\n'):
+        content += '\n'
+    return content + ''.join(lines)
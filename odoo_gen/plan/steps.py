@@ -1,12 +1,35 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterable
+
 from odoo_gen.enums import WriteMode, StepAction
 
 
+# the text, or a producer called only when the step is executed: it returns
+# the text or its chunks (jinja ``Template.generate``)
+Content = str | Callable[[], str | Iterable[str]] | None
+
+
 @dataclass(frozen=True)
 class PlanStep:
     action: StepAction            # "mkdir", "write"
     path: Path
-    content: str | None = None
+    content: Content = None
     details: str | None = None
     mode: WriteMode = WriteMode.CREATE
+
+    @property
+    def deferred(self) -> bool:
+        return callable(self.content)
+
+    def chunks(self) -> Iterable[str]:
+        """The content piece by piece, a producer is called now."""
+        content = self.content() if callable(self.content) else self.content
+        if content is None:
+            return ()
+        if isinstance(content, str):
+            return (content,)
+        return content
+
+    def text(self) -> str:
+        return ''.join(self.chunks())
@@ -27,6 +27,9 @@ class WriteStrategy:
             case WriteMode.APPEND:
                 return WriteMode.APPEND if exists else WriteMode.CREATE
 
+            case WriteMode.UPSERT:
+                return WriteMode.UPSERT if exists else WriteMode.CREATE
+
             case WriteMode.MODIFY:
                 # всегда разрешено
                 return WriteMode.MODIFY
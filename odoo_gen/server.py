@@ -0,0 +1,393 @@
+"""``odoo-gen serve``: a resident generator for editor integrations.
+
+One JSON-RPC 2.0 request per line over a Unix socket, one response line
+back. Templates, lxml and the discovery/menu/manifest/model indexes stay
+loaded between requests; stats and directory listings of the watched
+projects are served from memory until inotify reports a change. Without
+inotify they are not cached: polling would walk every project before
+every request.
+
+Methods (``params`` is an object):
+
+ping                          -> "pong"
+resolve  {models, path, ...}  -> the resolved project
+plan     {models, path, ...}  -> planned steps, with ``diff`` the diff too
+apply    {models, path, ...}  -> {written, elided, skipped}
+modules  {path}               -> modules of the project
+menus    {path}               -> menus of all modules of the project
+shutdown                      -> stops the server
+
+``models``/``path`` and the other generation params mirror the CLI flags:
+module, addons, create_module, create_addons, menu, menu_parent,
+menu_index, no_views, inherit, force, skip_existing, jobs.
+"""
+import inspect
+import json
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+
+from pathlib import Path
+
+from .controllers import ControllerChain, HeadlessController
+from .core.discovery import conf_addons_paths
+from .core.policy import Policy
+from .core.storage import CachedDiskStorage, DiskStorage, MemoryStorage
+from .core.templating import get_env
+from .core.types import Err
+from .core.watch import make_watcher
+from .engine import Engine, GenRequest
+from .errors import OdooGenError, UnresolvedSignal
+
+
+# JSON-RPC error codes, application errors use the CLI exit codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+GENERATION_ERROR = 1
+UNRESOLVED = 2
+
+GENERATION_PARAMS = {
+    'module', 'addons', 'create_module', 'create_addons', 'menu',
+    'menu_parent', 'menu_index', 'no_views', 'inherit', 'force',
+    'skip_existing', 'jobs', 'diff',
+}
+
+
+def default_socket() -> Path:
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return Path(base) / f'odoo-gen-{os.getuid()}.sock'
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class GenServer:
+    """Warm state shared by all requests, which run one at a time."""
+
+    def __init__(self):
+        watcher = make_watcher()
+        if watcher.notifies:
+            self.watcher = watcher
+            self.storage = CachedDiskStorage(watcher.covers)
+        else:
+            watcher.close()
+            self.watcher = None
+            self.storage = DiskStorage()
+        self.engine = Engine(self.storage)
+        self.watched: set[Path] = set()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def warm_up(self):
+        env = get_env()
+        for name in env.list_templates():
+            env.get_template(name)
+        # lxml
+        from .core import menu_tree  # noqa: F401
+
+    # ---------- dispatch ----------
+
+    def handle(self, line: bytes) -> dict | None:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error(None, RpcError(PARSE_ERROR, 'parse error'))
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error(None, RpcError(INVALID_REQUEST, 'invalid request'))
+
+        rid = request.get('id')
+        params = request.get('params') or {}
+        method = getattr(self, 'rpc_' + request['method'], None)
+        try:
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f'no method {request["method"]}')
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, 'params must be an object')
+            try:
+                inspect.signature(method).bind(**params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+            with self.lock:
+                self._refresh()
+                result = method(**params)
+        except RpcError as e:
+            return _error(rid, e)
+        except UnresolvedSignal as e:
+            return _error(rid, RpcError(UNRESOLVED, str(e), e.to_dict()))
+        except OdooGenError as e:
+            return _error(rid, RpcError(GENERATION_ERROR, str(e), e.to_dict()))
+        except Exception as e:
+            return _error(rid, RpcError(INTERNAL_ERROR, f'{type(e).__name__}: {e}'))
+
+        if rid is None:
+            # a notification
+            return None
+        return {'jsonrpc': '2.0', 'id': rid, 'result': result}
+
+    def _refresh(self):
+        """Drop cached stats of everything that changed since the last request."""
+        if self.watcher is None:
+            return
+        changes = self.watcher.read(0)
+        if changes is None:
+            self.storage.clear()
+            return
+        for change in changes:
+            self.storage.invalidate(change.path, tree=change.tree)
+
+    def _watch(self, ctx):
+        """Watch the addons dirs of a resolved project from now on."""
+        if self.watcher is None:
+            return
+        roots = list(ctx.addons_candidates or [])
+        if ctx.addons_path:
+            roots.append(ctx.addons_path)
+        if ctx.root:
+            roots.extend(conf_addons_paths(ctx.root, self.storage))
+        for root in roots:
+            if root not in self.watched and root.is_dir():
+                self.watched.add(root)
+                self.watcher.add(root)
+        if ctx.root and ctx.root not in self.watched:
+            # odoo.conf and the addons dirs themselves
+            self.watched.add(ctx.root)
+            self.watcher.add(ctx.root, recursive=False)
+
+    # ---------- generation ----------
+
+    def _request(self, models, path, params: dict) -> GenRequest:
+        unknown = set(params) - GENERATION_PARAMS
+        if unknown:
+            raise RpcError(INVALID_PARAMS, 'unknown params: ' + ', '.join(sorted(unknown)))
+        if (
+            not isinstance(models, list) or not models
+            or not all(isinstance(m, str) and m for m in models)
+        ):
+            raise RpcError(INVALID_PARAMS, 'models must be a non-empty list of names')
+        if path is None:
+            raise RpcError(INVALID_PARAMS, 'path is required')
+
+        addons = params.get('addons')
+        return GenRequest(
+            models=list(dict.fromkeys(models)),
+            path=path,
+            policy=Policy(
+                addons=(Path(path) / addons).resolve() if addons else None,
+                create_addons=bool(params.get('create_addons')),
+                module=params.get('module'),
+                create_module=bool(params.get('create_module')),
+                menu_parent=params.get('menu_parent'),
+                menu_index=Policy.parse_index(params.get('menu_index')),
+            ),
+            menu=bool(params.get('menu')),
+            no_views=bool(params.get('no_views')),
+            inherit=bool(params.get('inherit')),
+            force=bool(params.get('force')),
+            skip_existing=bool(params.get('skip_existing')),
+        )
+
+    def _resolved(self, models, path, params):
+        request = self._request(models, path, params)
+        # the context, not the request: dirs have to be watched on failure too
+        ctx = self.engine.context(request)
+        controllers = ControllerChain([HeadlessController(request.policy)])
+        try:
+            return _unwrap(self.engine.resolve(ctx, controllers))
+        finally:
+            self._watch(ctx)
+
+    def rpc_ping(self):
+        return 'pong'
+
+    def rpc_resolve(self, models, path=None, **params):
+        ctx = self._resolved(models, path, params)
+        return {
+            'root': _str(ctx.root),
+            'addons_path': _str(ctx.addons_path),
+            'module_name': ctx.module_name,
+            'module_path': _str(ctx.module_path),
+            'create_module': ctx.create_module,
+            'models': ctx.all_models,
+            'model_paths': [str(ctx.for_model(m).model_path) for m in ctx.all_models],
+            'depends': ctx.depends or [],
+            'unindexed_models': ctx.unindexed_models or [],
+            'menu_parent': ctx.menu_parent.id if ctx.menu_parent else None,
+        }
+
+    def rpc_plan(self, models, path=None, **params):
+        ctx = self._resolved(models, path, params)
+        plan = _unwrap(self.engine.plan(ctx))
+        result = {
+            'steps': [
+                {
+                    'action': step.action.value,
+                    'path': str(step.path),
+                    'mode': step.mode.value,
+                    'details': step.details,
+                }
+                for step in plan
+            ],
+            'stats': str(ctx.plan_stats) if ctx.plan_stats else None,
+        }
+        if params.get('diff'):
+            # a dry run into an overlay of the warm storage
+            overlay = MemoryStorage(self.storage)
+            _unwrap(self.engine.apply(ctx, storage=overlay))
+            result['diff'] = overlay.unified_diff()
+        return result
+
+    def rpc_apply(self, models, path=None, **params):
+        ctx = self._resolved(models, path, params)
+        _unwrap(self.engine.plan(ctx))
+        report = _unwrap(self.engine.apply(ctx, jobs=int(params.get('jobs') or 1)))
+        return {
+            'written': report.written,
+            'elided': report.elided,
+            'skipped': report.skipped,
+        }
+
+    def _project(self, path):
+        if path is None:
+            raise RpcError(INVALID_PARAMS, 'path is required')
+        ctx = self.engine.project(path)
+        self._watch(ctx)
+        return ctx
+
+    def rpc_modules(self, path=None):
+        ctx = self._project(path)
+        return [
+            {'name': m.name, 'path': str(m)}
+            for m in self.engine.modules(ctx)
+        ]
+
+    def rpc_menus(self, path=None):
+        ctx = self._project(path)
+        return [
+            {
+                'id': m.id, 'parent': m.parent, 'name': m.name,
+                'sequence': m.sequence, 'file': m.file,
+            }
+            for m in self.engine.menus(ctx).values()
+        ]
+
+    def rpc_shutdown(self):
+        self.stop.set()
+        return 'bye'
+
+    def close(self):
+        self.engine.close()
+        if self.watcher is not None:
+            self.watcher.close()
+
+
+def _unwrap(result):
+    if isinstance(result, Err):
+        raise result.error
+    return result.value
+
+
+def _str(value) -> str | None:
+    return str(value) if value is not None else None
+
+
+def _error(rid, e: RpcError) -> dict:
+    error = {'code': e.code, 'message': str(e)}
+    if e.data is not None:
+        error['data'] = e.data
+    return {'jsonrpc': '2.0', 'id': rid, 'error': error}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        gen = self.server.gen
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = gen.handle(line)
+            if response is not None:
+                self.wfile.write(json.dumps(response).encode() + b'\n')
+                self.wfile.flush()
+            if gen.stop.is_set():
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path: Path, on_ready=None):
+    """Serve until ``shutdown`` or SIGINT/SIGTERM."""
+    if path.exists():
+        if _alive(path):
+            raise OdooGenError(f'a server is already listening on {path}')
+        path.unlink()
+
+    gen = GenServer()
+    gen.warm_up()
+    # the socket is for the current user only
+    umask = os.umask(0o177)
+    try:
+        server = _UnixServer(str(path), _Handler)
+    finally:
+        os.umask(umask)
+    server.gen = gen
+
+    def stop(*_):
+        threading.Thread(target=server.shutdown).start()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, stop)
+
+    if on_ready:
+        on_ready(path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+        gen.close()
+
+
+def _alive(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+class Client:
+    """Minimal client, keeps one connection open."""
+
+    def __init__(self, path: Path | None = None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(path or default_socket()))
+        self.file = self.sock.makefile('rwb')
+        self.next_id = 0
+
+    def call(self, method: str, **params):
+        self.next_id += 1
+        request = {'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params}
+        self.file.write(json.dumps(request).encode() + b'\n')
+        self.file.flush()
+        response = json.loads(self.file.readline())
+        if 'error' in response:
+            error = response['error']
+            raise RpcError(error['code'], error['message'], error.get('data'))
+        return response['result']
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
@@ -0,0 +1,247 @@
+"""``odoo-gen watch``: keep a module in sync with a spec file.
+
+Every save of the spec (or of a template) is diffed against the spec of
+the previous pass, and only what changed goes through the usual
+resolve -> plan -> execute:
+
+- new models get everything ``import`` creates: model, view, access
+  rows, menus, manifest entries
+- models whose fields or description changed get their model and view
+  files rewritten (the spec is the source of truth, edits made to these
+  files by hand are overwritten); rewrites with the same content are
+  elided by the executor
+- models removed from the spec are reported, their files are kept
+
+A template change, or lost file events, re-plan every model.
+"""
+import time
+
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import click
+
+from .app import OdooGenApp
+from .core.context import ProjectContext
+from .core.schema import ModelSpec, iter_models
+from .core.types import Err
+from .core.watch import Change, Watcher, make_watcher
+from .errors import OdooGenError
+from .plan.executor import ExecReport
+
+
+TEMPLATES = Path(__file__).parent / 'templates'
+# editors save in bursts (write, chmod, rename), wait for the last event
+SETTLE = 0.05
+
+
+def load_spec(path: Path, fmt: str) -> dict[str, ModelSpec]:
+    with path.open(encoding='utf-8-sig') as fp:
+        return {spec.model: spec for spec in iter_models(fp, fmt)}
+
+
+@dataclass(slots=True)
+class SpecDiff:
+    added: list[ModelSpec] = field(default_factory=list)
+    changed: list[ModelSpec] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return (
+            f'{len(self.added)} added, {len(self.changed)} changed, '
+            f'{len(self.removed)} removed'
+        )
+
+
+def diff_specs(
+    old: dict[str, ModelSpec] | None, new: dict[str, ModelSpec]
+) -> SpecDiff:
+    """Models of ``new`` that are not in ``old`` or differ from it, all of
+    them added without ``old``."""
+    if old is None:
+        return SpecDiff(added=list(new.values()))
+    return SpecDiff(
+        added=[s for m, s in new.items() if m not in old],
+        changed=[s for m, s in new.items() if m in old and old[m] != s],
+        removed=[m for m in old if m not in new],
+    )
+
+
+def _menu_parent(tree, menu_id: str):
+    # built trees don't index their nodes by id, walk them
+    stack = list(tree.nodes)
+    while stack:
+        node = stack.pop()
+        if node.id == menu_id:
+            return node.parent
+        stack.extend(node.children)
+    return None
+
+
+def _value(result):
+    if isinstance(result, Err):
+        raise result.error
+    return result.value
+
+
+class SpecWatch:
+    """Passes through the :class:`Engine` of ``app``, which answers the
+    signals (its policy and prompts) and prints."""
+
+    def __init__(self, app: OdooGenApp, spec: Path, fmt: str, menu: bool = False):
+        self.app = app
+        self.engine = app.engine
+        self.spec = spec.resolve()
+        self.fmt = fmt
+        self.menu = menu
+        # the spec as of the last successful pass
+        self.specs: dict[str, ModelSpec] | None = None
+        # the module, once known; later passes don't ask for it again
+        self.ctx: ProjectContext | None = None
+
+    # ---------- passes ----------
+
+    def update(self, full: bool = False) -> tuple[SpecDiff, ExecReport]:
+        """Apply what changed since the last pass, everything with ``full``."""
+        specs = load_spec(self.spec, self.fmt)
+        diff = diff_specs(self.specs, specs)
+        if full and self.specs is not None:
+            diff.changed += [
+                s for m, s in specs.items() if m in self.specs and self.specs[m] == s
+            ]
+
+        report = ExecReport()
+        todo = diff.added + diff.changed
+        if todo:
+            if self.ctx is None:
+                # the module has to be known to tell new models from old
+                self._pin(self._resolve(todo, menu=False))
+            exists = {
+                s.model: self.app.storage.exists(
+                    self.ctx.for_model(s.model).model_path
+                )
+                for s in todo
+            }
+            new = [s for s in todo if not exists[s.model]]
+            old = [s for s in todo if exists[s.model]]
+            if new:
+                report += self._create(new)
+            if old:
+                report += self._rewrite(old)
+
+        self.specs = specs
+        return diff, report
+
+    def _resolve(
+        self, specs: list[ModelSpec], menu: bool, force: bool = False
+    ) -> ProjectContext:
+        policy = self.app.policy
+        if not menu:
+            # a menu parent alone asks for menus
+            policy = replace(policy, menu_parent=None)
+        request = replace(
+            self.app.request, models=[], specs=specs, policy=policy,
+            menu=menu, force=force or self.app.request.force,
+        )
+        ctx = _value(self.engine.resolve(request, self.app.controllers))
+        self.ctx = ctx
+        return ctx
+
+    def _pin(self, ctx: ProjectContext):
+        """Answer the addons dir and module of the first pass from now on."""
+        policy = self.app.policy
+        policy.addons = ctx.addons_path
+        policy.create_addons = ctx.create_addons
+        policy.module = ctx.module_name
+        policy.create_module = ctx.create_module
+
+    def _apply(self, ctx: ProjectContext) -> ExecReport:
+        return _value(self.engine.apply(
+            ctx, storage=self.app.storage, jobs=self.app.jobs,
+            controllers=self.app.controllers,
+        ))
+
+    def _create(self, specs: list[ModelSpec]) -> ExecReport:
+        # placed in the menu.xml as written by the previous pass
+        ctx = self._resolve(specs, menu=self.menu)
+        _value(self.engine.plan(ctx, self.app.controllers))
+        report = self._apply(ctx)
+
+        if self.menu and ctx.menu_tree is not None:
+            # later passes append under the same parent without asking, the
+            # one placed or, on a fresh menu.xml, the default root
+            parent = _menu_parent(ctx.menu_tree, ctx.for_model(specs[0].model).menu_id)
+            if parent is not None:
+                self.app.policy.menu_parent = parent.id
+                self.app.policy.menu_index = None
+        return report
+
+    def _rewrite(self, specs: list[ModelSpec]) -> ExecReport:
+        ctx = self._resolve(specs, menu=False, force=True)
+        steps = _value(self.engine.plan(ctx, self.app.controllers))
+        # field changes only show in the model and view files, access
+        # rows, menus and manifest entries depend on the name alone
+        targets = set()
+        for spec in specs:
+            model_ctx = ctx.for_model(spec.model)
+            targets.add(model_ctx.model_path)
+            if not ctx.no_views:
+                targets.add(model_ctx.view_path)
+        ctx.plan = [step for step in steps if step.path in targets]
+        return self._apply(ctx)
+
+    # ---------- loop ----------
+
+    def run(self, watcher: Watcher | None = None):
+        """Apply the spec, then every change of it until Ctrl-C."""
+        watcher = watcher or make_watcher()
+        watcher.add(self.spec.parent, recursive=False)
+        watcher.add(TEMPLATES)
+        try:
+            self._pass(full=True)
+            while True:
+                changes = self._settle(watcher, watcher.read(None))
+                if changes is None or any(self._is_template(c) for c in changes):
+                    self._pass(full=True)
+                elif any(c.path == self.spec for c in changes):
+                    self._pass()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+            self.app.controllers.close(self.ctx or self.app.ctx)
+
+    def _settle(self, watcher, changes: list[Change] | None):
+        while changes is not None:
+            more = watcher.read(SETTLE)
+            if more is None:
+                return None
+            if not more:
+                break
+            changes += more
+        return changes
+
+    def _is_template(self, change: Change) -> bool:
+        return change.path.is_relative_to(TEMPLATES)
+
+    def _pass(self, full: bool = False):
+        start = time.perf_counter()
+        try:
+            diff, report = self.update(full)
+        except FileNotFoundError:
+            # between the unlink and the rename of an atomic save
+            return
+        except OdooGenError as e:
+            click.secho(f'{self.spec.name}: {e}', fg='red')
+            return
+
+        if not diff and not full:
+            # saved without changes
+            return
+        ms = (time.perf_counter() - start) * 1000
+        click.echo(f'{self.spec.name}: {diff}, {report} ({ms:.0f} ms)')
+        for model in diff.removed:
+            click.secho(f'  {model} removed from the spec, its files are kept', fg='yellow')